@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Author : Kenneth Schackart <schackartk1@gmail.com>
+Date   : 2023-03-04
+Purpose: Build lookup tables of the fill volume and squeezing coefficient
+"""
+
+import argparse
+from typing import NamedTuple
+
+from t_junction_model.tables import DEFAULT_AXES, DEFAULT_DIRECTORY, Axis, build_tables
+from formatters.formatter_class import CustomHelpFormatter
+
+
+class Args(NamedTuple):
+    """Command-line arguments"""
+
+    out_dir: str
+    height_points: int
+    inlet_points: int
+    epsilon_points: int
+
+
+# -------------------------------------------------------------------------------------
+def get_args() -> Args:
+    """Get command-line arguments"""
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Tabulate the non-dimensionalized fill volume and squeezing"
+            " coefficient for fast, memory-mapped lookup."
+        ),
+        formatter_class=CustomHelpFormatter,
+    )
+
+    parser.add_argument(
+        "-o",
+        "--out-dir",
+        help="Output directory (default: t_junction_model/tables/)",
+        metavar="DIR",
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        "--height-points",
+        help="Grid points of height/width",
+        metavar="INT",
+        type=int,
+        default=DEFAULT_AXES["height_ratio"].num,
+    )
+    parser.add_argument(
+        "--inlet-points",
+        help="Grid points of inlet width/width",
+        metavar="INT",
+        type=int,
+        default=DEFAULT_AXES["inlet_ratio"].num,
+    )
+    parser.add_argument(
+        "--epsilon-points",
+        help="Grid points of corner roundness/width",
+        metavar="INT",
+        type=int,
+        default=DEFAULT_AXES["epsilon_ratio"].num,
+    )
+
+    args = parser.parse_args()
+
+    for name in ["height_points", "inlet_points", "epsilon_points"]:
+        if getattr(args, name) < 2:
+            parser.error(f'--{name.replace("_", "-")} must be at least 2')
+
+    return Args(
+        args.out_dir or DEFAULT_DIRECTORY,
+        args.height_points,
+        args.inlet_points,
+        args.epsilon_points,
+    )
+
+
+# -------------------------------------------------------------------------------------
+def main() -> None:
+    """Main function"""
+
+    args = get_args()
+
+    points = {
+        "height_ratio": args.height_points,
+        "inlet_ratio": args.inlet_points,
+        "epsilon_ratio": args.epsilon_points,
+    }
+    axes = {
+        name: Axis(DEFAULT_AXES[name].start, DEFAULT_AXES[name].stop, num)
+        for name, num in points.items()
+    }
+
+    print("Building tables...")
+    tables = build_tables(args.out_dir, axes)
+
+    for name, error in tables.max_rel_error.items():
+        print(f"Maximum relative error of {name}: {error:.2e}")
+
+    print(f'Done. See tables in "{args.out_dir}".')
+
+
+# -------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    main()
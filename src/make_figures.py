@@ -5,22 +5,35 @@ Date   : 2023-01-29
 Purpose: Generate figures from van Steijn et al., (https://doi.org/10.1039/c002625e)
 """
 
+from __future__ import annotations
+
 import argparse
-import itertools
+import hashlib
+import inspect
+import json
 import os
-from typing import Callable, NamedTuple
-
-import pandas as pd
-import plotnine as p9
+import sys
+import traceback
+from typing import TYPE_CHECKING, Callable, NamedTuple, Optional
 
-from t_junction_model.filling import (
-    calc_incorrect_nondim_fill_volume,
-    calc_nondim_fill_volume,
-)
-from t_junction_model.squeezing import _calc_2r, _calc_alpha
-from t_junction_model.total import calc_nondim_total_volume
+from t_junction_model import parallel
+from t_junction_model.disk_cache import DiskCache, source_fingerprint
 from formatters.formatter_class import CustomHelpFormatter
 
+# NumPy, pandas, PyArrow, plotnine and the model are imported by the functions
+# using them, so the script starts quickly when no figure needs to be made
+if TYPE_CHECKING:
+    import pandas as pd
+    import plotnine as p9
+
+# pylint: disable=import-outside-toplevel
+
+# Manifest in the output directory, holding the hash each figure was made with
+MANIFEST = "figures.json"
+
+# Width and height of saved figures, in inches
+FIGURE_SIZE = (6.4, 4.8)
+
 # Dictionary mapping inlet width / channel with ratio to color
 COLOR_MAPPING = {
     "0.33": "#CF232B",
@@ -36,6 +49,20 @@ class Args(NamedTuple):
     """Command-line arguments"""
 
     out_dir: str
+    cache: Optional[str]
+    cache_size: int
+    jobs: int
+    force: bool
+    only: list[str]
+    data_only: bool
+
+
+class Rendered(NamedTuple):
+    """Outcome of making one figure"""
+
+    name: str
+    cached: bool  # Data was loaded from the cache
+    error: Optional[str]  # Traceback, if the figure failed
 
 
 # -------------------------------------------------------------------------------------
@@ -58,52 +85,157 @@ def get_args() -> Args:
         type=str,
         default="out/",
     )
+    parser.add_argument(
+        "-c",
+        "--cache",
+        help="Persistent cache of figure data, reused while the model is unchanged",
+        metavar="FILE",
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        "-s",
+        "--cache-size",
+        help="Maximum cache size in MiB",
+        metavar="MIB",
+        type=int,
+        default=256,
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="Number of figures made in parallel processes (default: CPU count)",
+        metavar="INT",
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "-f",
+        "--force",
+        help="Make all figures, even those which are up to date",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-d",
+        "--data-only",
+        help="Only save the data of each figure as Parquet, without plotting",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--only",
+        help="Comma-separated figures to make (default: all), of: "
+        + ", ".join(FIGURES),
+        metavar="NAMES",
+        type=str,
+        default=None,
+    )
 
     args = parser.parse_args()
 
-    return Args(args.out_dir)
+    if args.cache_size < 0:
+        parser.error(f"--cache-size must not be negative, got {args.cache_size}")
+
+    if args.jobs is not None and args.jobs < 1:
+        parser.error(f"--jobs must be positive, got {args.jobs}")
+
+    only = [name.strip() for name in (args.only or ",".join(FIGURES)).split(",")]
+    unknown = [name for name in only if name not in FIGURES]
+    if unknown:
+        parser.error(
+            f"--only must name figures of {', '.join(FIGURES)}, got {args.only!r}"
+        )
+
+    jobs = min(args.jobs or os.cpu_count() or 1, len(FIGURES))
+
+    # Figures are made in the order of FIGURES, each once
+    only = [name for name in FIGURES if name in only]
+
+    return Args(
+        args.out_dir,
+        args.cache,
+        args.cache_size,
+        jobs,
+        args.force,
+        only,
+        args.data_only,
+    )
+
+
+# -------------------------------------------------------------------------------------
+def add_width_ratio_labels(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add categorical columns of the inlet width/width ratio rounded to 2
+    decimals (`width_ratio`, *e.g.* "1.33") and its label (`width_ratio_labs`)
+
+    Arguments:
+    `df`: data with `inlet_width` and `width` columns
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    ratios = np.round(df["inlet_width"].to_numpy() / df["width"].to_numpy(), 2)
+    df["width_ratio"] = pd.Categorical(ratios.astype(str))
+    df["width_ratio_labs"] = df["width_ratio"].cat.rename_categories(
+        lambda ratio: f"w_in/w={ratio}"
+    )
+
+    return df
 
 
 # -------------------------------------------------------------------------------------
-def make_fig_2a(color_mapping: dict[str, str], filling_function: Callable) -> p9.ggplot:
+def make_fig_2a_data(filling_function: str) -> pd.DataFrame:
     """
-    Generate figure 2a: nondimensionalized volume during the filling phase
-    plotted against channel height/width for 5 inlet width/width ratios
+    Calculate the data of figure 2a: nondimensionalized volume during the
+    filling phase against channel height/width for 5 inlet width/width ratios
 
     Arguments:
-    `color_mapping`: Dictionary mapping hex colors to width ratios
-    `filling_function`: Function to use for calculating nondimensionalized
-    filling volume (either t_junction_model.filling.calc_nondim_fill_volume
-    or t_junction_model.filling.calc_incorrect_nondim_fill_volume)
+    `filling_function`: Name of the batch function to use for calculating
+    nondimensionalized filling volume (either "calc_nondim_fill_volume"
+    or "calc_incorrect_nondim_fill_volume" of t_junction_model.batch)
     """
 
-    widths = [1.0]
-    heights = map(lambda x: float(x / 2000), range(1, 1001))
-    inlet_widths = [1, 4 / 3, 2, 3]
+    import numpy as np
+    import pandas as pd
+
+    from t_junction_model import batch
+
+    width = 1.0
+    heights = np.arange(1, 1001) / 2000
+    inlet_widths = np.array([1, 4 / 3, 2, 3])
 
-    width_col = []
-    height_col = []
-    inlet_width_col = []
-    for width, height, inlet_width in itertools.product(widths, heights, inlet_widths):
-        width_col.append(width)
-        height_col.append(height)
-        inlet_width_col.append(inlet_width)
+    height_grid, inlet_width_grid = np.meshgrid(heights, inlet_widths, indexing="ij")
 
-    df = pd.DataFrame()
-    df["width"] = width_col
-    df["height"] = height_col
-    df["inlet_width"] = inlet_width_col
+    df = pd.DataFrame(
+        {
+            "width": width,
+            "height": height_grid.ravel(),
+            "inlet_width": inlet_width_grid.ravel(),
+        }
+    )
 
     df["height_over_width"] = df["height"] / df["width"]
-    df["width_ratio"] = round(df["inlet_width"] / df["width"], 2)
-    df["width_ratio"] = df["width_ratio"].astype(str)
-    df["width_ratio_labs"] = df.apply(lambda row: "w_in/w=" + row.width_ratio, axis=1)
+    add_width_ratio_labels(df)
 
-    df["nondim_vol"] = df.apply(
-        lambda row: filling_function(row.height, row.width, row.inlet_width),
-        axis=1,
+    df["nondim_vol"] = getattr(batch, filling_function)(
+        df["height"], df["width"], df["inlet_width"]
     )
 
+    return df
+
+
+# -------------------------------------------------------------------------------------
+def plot_fig_2a(df: pd.DataFrame, color_mapping: dict[str, str]) -> p9.ggplot:
+    """
+    Plot figure 2a from its data
+
+    Arguments:
+    `df`: data from `make_fig_2a_data()`
+    `color_mapping`: Dictionary mapping hex colors to width ratios
+    """
+
+    import plotnine as p9
+
     plot = (
         p9.ggplot(
             df,
@@ -132,54 +264,63 @@ def make_fig_2a(color_mapping: dict[str, str], filling_function: Callable) -> p9
 
 
 # -------------------------------------------------------------------------------------
-def make_fig_2b(color_mapping: dict[str, str]) -> p9.ggplot:
+def make_fig_2b_data() -> pd.DataFrame:
     """
-    Generate figure 2b: squeezing coefficient alpha
-    plotted against channel height/width for 5 inlet width/width ratios
-
-    Arguments:
-    `color_mapping`: Dictionary mapping hex colors to width ratios
+    Calculate the data of figure 2b: squeezing coefficient alpha
+    against channel height/width for 5 inlet width/width ratios
     """
 
-    widths = [1.0]
+    import numpy as np
+    import pandas as pd
+
+    from t_junction_model.batch import _calc_alpha
+
+    width = 1.0
     flow_ratio = 0.1
     corner_roundness = 0.0
-    heights = map(lambda x: float(x / 2000), range(1, 1001))
-    inlet_widths = [1 / 3, 2 / 3, 1, 4 / 3, 2, 3]
-
-    width_col = []
-    height_col = []
-    inlet_width_col = []
-    for width, height, inlet_width in itertools.product(widths, heights, inlet_widths):
-        width_col.append(width)
-        height_col.append(height)
-        inlet_width_col.append(inlet_width)
-
-    df = pd.DataFrame()
-    df["width"] = width_col
-    df["height"] = height_col
-    df["inlet_width"] = inlet_width_col
-    df["corner_roundness"] = corner_roundness
-    df["flow_cont"] = 1.0
+    heights = np.arange(1, 1001) / 2000
+    inlet_widths = np.array([1 / 3, 2 / 3, 1, 4 / 3, 2, 3])
+
+    height_grid, inlet_width_grid = np.meshgrid(heights, inlet_widths, indexing="ij")
+
+    df = pd.DataFrame(
+        {
+            "width": width,
+            "height": height_grid.ravel(),
+            "inlet_width": inlet_width_grid.ravel(),
+            "corner_roundness": corner_roundness,
+            "flow_cont": 1.0,
+        }
+    )
     df["flow_gutter"] = df["flow_cont"] * flow_ratio
 
     df["height_over_width"] = df["height"] / df["width"]
-    df["width_ratio"] = round(df["inlet_width"] / df["width"], 2)
-    df["width_ratio"] = df["width_ratio"].astype(str)
-    df["width_ratio_labs"] = df.apply(lambda row: "w_in/w=" + row.width_ratio, axis=1)
-
-    df["alpha"] = df.apply(
-        lambda row: _calc_alpha(
-            row.height,
-            row.width,
-            row.inlet_width,
-            row.corner_roundness,
-            row.flow_cont,
-            row.flow_gutter,
-        ),
-        axis=1,
+    add_width_ratio_labels(df)
+
+    df["alpha"] = _calc_alpha(
+        df["height"],
+        df["width"],
+        df["inlet_width"],
+        df["corner_roundness"],
+        df["flow_cont"],
+        df["flow_gutter"],
     )
 
+    return df
+
+
+# -------------------------------------------------------------------------------------
+def plot_fig_2b(df: pd.DataFrame, color_mapping: dict[str, str]) -> p9.ggplot:
+    """
+    Plot figure 2b from its data
+
+    Arguments:
+    `df`: data from `make_fig_2b_data()`
+    `color_mapping`: Dictionary mapping hex colors to width ratios
+    """
+
+    import plotnine as p9
+
     plot = (
         p9.ggplot(df, p9.aes("height_over_width", "alpha", color="width_ratio"))
         + p9.geom_line()
@@ -203,90 +344,84 @@ def make_fig_2b(color_mapping: dict[str, str]) -> p9.ggplot:
 
 
 # -------------------------------------------------------------------------------------
-def make_fig_3(color_mapping: dict[str, str]) -> p9.ggplot:
+def make_fig_3_data() -> pd.DataFrame:
     """
-    Generate figure 3: dimensionless volume of bubbles and droplets
-    against flow rate ratio for 5 width ratios
-
-    Arguments:
-    `color_mapping`: Dictionary mapping hex colors to width ratios
+    Calculate the data of figure 3: dimensionless volume of bubbles and
+    droplets against flow rate ratio for 5 width ratios
     """
 
+    import numpy as np
+    import pandas as pd
+
+    from t_junction_model.batch import calc_nondim_total_volume
+
     continuous_flow = 1.0
     gutter_flow = continuous_flow * 0.1
     width = 1.0
-    inlet_widths = [1 / 3, 2 / 3, 1, 4 / 3, 3]
-    dispersed_flows = list(map(lambda x: float(x / 100), range(1, 1001)))
+    inlet_widths = np.array([1 / 3, 2 / 3, 1, 4 / 3, 3])
+    dispersed_flows = np.arange(1, 1001) / 100
 
     # h/w is assigned based on width ratio
-    height_dictionary = {
-        "0.33": 1 / 3,
-        "0.67": 0.11,
-        "1.0": 1 / 3,
-        "1.33": 0.17,
-        "3.0": 1 / 3,
-    }
+    heights = np.array([1 / 3, 0.11, 1 / 3, 0.17, 1 / 3])
 
-    inlet_width_col = []
-    dispersed_flow_col = []
-    for inlet_width, dispersed_flow in itertools.product(inlet_widths, dispersed_flows):
-        inlet_width_col.append(inlet_width)
-        dispersed_flow_col.append(dispersed_flow)
-
-    # Parameters for bubbles
-    df = pd.DataFrame()
-    df["inlet_width"] = inlet_width_col
-    df["dispersed_flow"] = dispersed_flow_col
-    df["width"] = width
-    df["continuous_flow"] = continuous_flow
-    df["gutter_flow"] = gutter_flow
-    df["type"] = "bubbles"
+    # Bubbles for each width ratio, followed by droplets
+    n_flows = len(dispersed_flows)
+    n_bubble_rows = len(inlet_widths) * n_flows
 
-    df["corner_roundness"] = 0.1 * df["width"]
-    df["flow_ratio"] = df["dispersed_flow"] / df["continuous_flow"]
-    df["width_ratio"] = round(df["inlet_width"] / df["width"], 2)
-    df["width_ratio"] = df["width_ratio"].astype(str)
-    df["height"] = df.apply(lambda row: height_dictionary.get(row.width_ratio), axis=1)
-
-    # Parameters for droplets
-    liq_liq_df = pd.DataFrame()
-    liq_liq_df["dispersed_flow"] = dispersed_flows
-    liq_liq_df["width"] = 1.0
-    liq_liq_df["inlet_width"] = 1.0
-    liq_liq_df["height"] = 0.48
-    liq_liq_df["continuous_flow"] = continuous_flow
-    liq_liq_df["gutter_flow"] = gutter_flow
-
-    liq_liq_df["corner_roundness"] = 0.01 * liq_liq_df["width"]
-    liq_liq_df["flow_ratio"] = (
-        liq_liq_df["dispersed_flow"] / liq_liq_df["continuous_flow"]
-    )
-    liq_liq_df["width_ratio"] = round(
-        liq_liq_df["inlet_width"] / liq_liq_df["width"], 2
+    df = pd.DataFrame(
+        {
+            "inlet_width": np.append(
+                np.repeat(inlet_widths, n_flows), np.ones(n_flows)
+            ),
+            "dispersed_flow": np.tile(dispersed_flows, len(inlet_widths) + 1),
+            "width": width,
+            "continuous_flow": continuous_flow,
+            "gutter_flow": gutter_flow,
+            "type": pd.Categorical(
+                np.where(
+                    np.arange(n_bubble_rows + n_flows) < n_bubble_rows,
+                    "bubbles",
+                    "droplets",
+                )
+            ),
+            "height": np.append(np.repeat(heights, n_flows), np.full(n_flows, 0.48)),
+        }
     )
-    liq_liq_df["width_ratio"] = liq_liq_df["width_ratio"].astype(str)
-    liq_liq_df["type"] = "droplets"
-
-    df = pd.concat([df, liq_liq_df])
-
-    df["vol"] = df.apply(
-        lambda row: calc_nondim_total_volume(
-            row.height,
-            row.width,
-            row.inlet_width,
-            row.corner_roundness,
-            row.continuous_flow,
-            row.dispersed_flow,
-            row.gutter_flow,
-        ),
-        axis=1,
+
+    df["corner_roundness"] = np.where(df["type"] == "bubbles", 0.1, 0.01) * df["width"]
+    df["flow_ratio"] = df["dispersed_flow"] / df["continuous_flow"]
+    add_width_ratio_labels(df)
+
+    df["vol"] = calc_nondim_total_volume(
+        df["height"],
+        df["width"],
+        df["inlet_width"],
+        df["corner_roundness"],
+        df["continuous_flow"],
+        df["dispersed_flow"],
+        df["gutter_flow"],
     )
-    df["width_ratio_labs"] = df.apply(lambda row: "w_in/w=" + row.width_ratio, axis=1)
 
-    df = df[df["vol"] <= 25]
+    return df[df["vol"] <= 25].reset_index(drop=True)
+
+
+# -------------------------------------------------------------------------------------
+def plot_fig_3(df: pd.DataFrame, color_mapping: dict[str, str]) -> p9.ggplot:
+    """
+    Plot figure 3 from its data
+
+    Arguments:
+    `df`: data from `make_fig_3_data()`
+    `color_mapping`: Dictionary mapping hex colors to width ratios
+    """
+
+    import plotnine as p9
+
     label_df = df[df["vol"] <= 25 - 2.5 * (df["flow_ratio"] - 0.009)]
-    label_df = label_df[label_df["vol"] >= 25 - 2.5 * (label_df["flow_ratio"] + 0.009)]
-    label_df["flow_ratio"][label_df["type"] == "droplets"] = 8
+    label_df = label_df[
+        label_df["vol"] >= 25 - 2.5 * (label_df["flow_ratio"] + 0.009)
+    ].copy()
+    label_df.loc[label_df["type"] == "droplets", "flow_ratio"] = 8
     plot = (
         p9.ggplot(df, p9.aes("flow_ratio", "vol", color="width_ratio", linetype="type"))
         + p9.geom_line()
@@ -322,58 +457,71 @@ def make_fig_3(color_mapping: dict[str, str]) -> p9.ggplot:
 
 
 # -------------------------------------------------------------------------------------
-def make_fig_6(color_mapping: dict[str, str]) -> p9.ggplot:
+def make_fig_6_data() -> pd.DataFrame:
     """
-    Generate figure 6: receding interface during squeezing period
-
-    Arguments:
-    `color_mapping`: Dictionary mapping hex colors to width ratios
+    Calculate the data of figure 6: receding interface during squeezing period
     """
 
+    import numpy as np
+    import pandas as pd
+
+    from t_junction_model.batch import _calc_2r
+
     width = 100 * 10**-6
     continuous_flow = 3 * 10**-9
     height = 33 * 10**-6
-    pinch_thresh = height / (height + width)
-
-    inlet_width_ratios = [1 / 3, 1, 3]
-    alpha_vals = list(map(lambda x: float(x / 100), range(1, 1001)))
-
-    inlet_width_col = []
-    alpha_col = []
-    for inlet_width_ratio, alpha_val in itertools.product(
-        inlet_width_ratios, alpha_vals
-    ):
-        inlet_width_col.append(inlet_width_ratio * width)
-        alpha_col.append(alpha_val)
-
-    df = pd.DataFrame()
-    df["alpha"] = alpha_col
-    df["inlet_width"] = inlet_width_col
-    df["width"] = width
-    df["height"] = height
-    df["continuous_flow"] = continuous_flow
+
+    inlet_width_ratios = np.array([1 / 3, 1, 3])
+    alpha_vals = np.arange(1, 1001) / 100
+
+    inlet_width_grid, alpha_grid = np.meshgrid(
+        inlet_width_ratios * width, alpha_vals, indexing="ij"
+    )
+
+    df = pd.DataFrame(
+        {
+            "alpha": alpha_grid.ravel(),
+            "inlet_width": inlet_width_grid.ravel(),
+            "width": width,
+            "height": height,
+            "continuous_flow": continuous_flow,
+        }
+    )
 
     df["time"] = df["alpha"] / (
         df["continuous_flow"] / (df["height"] * df["width"] ** 2)
     )
     df["corner_roundness"] = 0.1 * df["width"]
-    df["width_ratio"] = round(df["inlet_width"] / df["width"], 2)
-    df["width_ratio"] = df["width_ratio"].astype(str)
+    add_width_ratio_labels(df)
     df["gutter_flow"] = 0.1 * df["continuous_flow"]
-    df["2r"] = df.apply(
-        lambda row: _calc_2r(
-            row.height,
-            row.width,
-            row.inlet_width,
-            row.corner_roundness,
-            row.continuous_flow,
-            row.gutter_flow,
-            row.time,
-        ),
-        axis=1,
+    df["2r"] = _calc_2r(
+        df["height"],
+        df["width"],
+        df["inlet_width"],
+        df["corner_roundness"],
+        df["continuous_flow"],
+        df["gutter_flow"],
+        df["time"],
     )
     df["2r_w"] = df["2r"] / df["width"]
-    df["width_ratio_labs"] = df.apply(lambda row: "w_in/w=" + row.width_ratio, axis=1)
+    df["pinch_thresh"] = df["height"] / (df["height"] + df["width"])
+
+    return df
+
+
+# -------------------------------------------------------------------------------------
+def plot_fig_6(df: pd.DataFrame, color_mapping: dict[str, str]) -> p9.ggplot:
+    """
+    Plot figure 6 from its data
+
+    Arguments:
+    `df`: data from `make_fig_6_data()`
+    `color_mapping`: Dictionary mapping hex colors to width ratios
+    """
+
+    import plotnine as p9
+
+    pinch_thresh = df["pinch_thresh"].iloc[0]
     lab_df = df[df["2r_w"] >= 0.1 * (df["alpha"] - 0.09) + 0.275]
     lab_df = lab_df[lab_df["2r_w"] <= 0.1 * (lab_df["alpha"] + 0.09) + 0.275]
 
@@ -416,6 +564,280 @@ def make_fig_6(color_mapping: dict[str, str]) -> p9.ggplot:
     return plot
 
 
+class Figure(NamedTuple):
+    """Functions calculating and plotting the data of a figure"""
+
+    make_data: Callable[..., pd.DataFrame]
+    args: tuple
+    plot: Callable[[pd.DataFrame, dict[str, str]], p9.ggplot]
+
+
+# Figures, by output file name
+FIGURES = {
+    "fig_2a": Figure(make_fig_2a_data, ("calc_nondim_fill_volume",), plot_fig_2a),
+    "fig_2a_incorrect": Figure(
+        make_fig_2a_data, ("calc_incorrect_nondim_fill_volume",), plot_fig_2a
+    ),
+    "fig_2b": Figure(make_fig_2b_data, (), plot_fig_2b),
+    "fig_3": Figure(make_fig_3_data, (), plot_fig_3),
+    "fig_6": Figure(make_fig_6_data, (), plot_fig_6),
+}
+
+
+# -------------------------------------------------------------------------------------
+def get_sources(*functions: Callable) -> list[str]:
+    """
+    Get the source of functions and, recursively, of the functions of this
+    script which they call, sorted by function name
+
+    Arguments:
+    `functions`: functions defined in this script
+    """
+
+    sources: dict[str, str] = {}
+    pending = list(functions)
+
+    while pending:
+        function = pending.pop()
+        if function.__name__ in sources:
+            continue
+
+        sources[function.__name__] = inspect.getsource(function)
+
+        # Code of the function and of any lambdas or comprehensions within it
+        codes = [function.__code__]
+        while codes:
+            code = codes.pop()
+            codes.extend(const for const in code.co_consts if inspect.iscode(const))
+            pending.extend(
+                globals()[name]
+                for name in code.co_names
+                if inspect.isfunction(globals().get(name))
+                and globals()[name].__module__ == __name__
+            )
+
+    return [sources[name] for name in sorted(sources)]
+
+
+# -------------------------------------------------------------------------------------
+def data_hash(name: str) -> str:
+    """
+    Hash everything the data of a figure depends on: the source of its data
+    function, its arguments and a fingerprint of the model source
+
+    Arguments:
+    `name`: figure name, a key of `FIGURES`
+    """
+
+    figure = FIGURES[name]
+    text = json.dumps(
+        {
+            "sources": get_sources(figure.make_data),
+            "args": list(figure.args),
+            "model": source_fingerprint(),
+        },
+        sort_keys=True,
+    )
+
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+# -------------------------------------------------------------------------------------
+def figure_hash(name: str) -> str:
+    """
+    Hash everything a figure depends on: its data, the source of its plot
+    function and the colors and size of the figure
+
+    Arguments:
+    `name`: figure name, a key of `FIGURES`
+    """
+
+    text = json.dumps(
+        {
+            "data": data_hash(name),
+            "sources": get_sources(FIGURES[name].plot),
+            "colors": COLOR_MAPPING,
+            "size": FIGURE_SIZE,
+        },
+        sort_keys=True,
+    )
+
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+# -------------------------------------------------------------------------------------
+def output_hashes(name: str, data_only: bool = False) -> dict[str, str]:
+    """
+    Get the hash of each output file of a figure: its data, `{name}.parquet`,
+    and unless `data_only`, its image, `{name}.png`
+
+    Arguments:
+    `name`: figure name, a key of `FIGURES`
+    `data_only`: only the data is made
+    """
+
+    hashes = {f"{name}.parquet": data_hash(name)}
+    if not data_only:
+        hashes[f"{name}.png"] = figure_hash(name)
+
+    return hashes
+
+
+# -------------------------------------------------------------------------------------
+def read_manifest(out_dir: str) -> dict[str, str]:
+    """
+    Read the hash each output file in an output directory was made with,
+    which is empty if there is no valid manifest
+
+    Arguments:
+    `out_dir`: output directory
+    """
+
+    try:
+        with open(os.path.join(out_dir, MANIFEST), "rt", encoding="utf-8") as fh_in:
+            manifest = json.load(fh_in)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+    return manifest if isinstance(manifest, dict) else {}
+
+
+# -------------------------------------------------------------------------------------
+def write_manifest(out_dir: str, manifest: dict[str, str]) -> None:
+    """
+    Write the hash each output file in an output directory was made with
+
+    Arguments:
+    `out_dir`: output directory
+    `manifest`: hash of each output file
+    """
+
+    with open(os.path.join(out_dir, MANIFEST), "wt", encoding="utf-8") as out:
+        json.dump(manifest, out, indent=2, sort_keys=True)
+
+
+# -------------------------------------------------------------------------------------
+def find_stale(
+    out_dir: str, manifest: dict[str, str], hashes: dict[str, str]
+) -> list[str]:
+    """
+    Get the output files which are missing or were made with a different hash
+
+    Arguments:
+    `out_dir`: output directory
+    `manifest`: hash each output file was made with
+    `hashes`: current hash of each output file to check
+    """
+
+    return [
+        file_name
+        for file_name, file_hash in hashes.items()
+        if manifest.get(file_name) != file_hash
+        or not os.path.isfile(os.path.join(out_dir, file_name))
+    ]
+
+
+# -------------------------------------------------------------------------------------
+def get_figure_data(name: str, cache: Optional[DiskCache] = None) -> pd.DataFrame:
+    """
+    Calculate the data of a figure, or load it from the cache. Cache keys
+    include the source of the figure's data function and of the model, so
+    changing either invalidates the cached data.
+
+    Arguments:
+    `name`: figure name, a key of `FIGURES`
+    `cache`: persistent cache, or `None` to always calculate the data
+    """
+
+    figure = FIGURES[name]
+
+    if cache is None:
+        return figure.make_data(*figure.args)
+
+    params = {
+        "code": "\n".join(get_sources(figure.make_data)),
+        "args": list(figure.args),
+    }
+
+    return cache.get_or_compute(name, params, lambda: figure.make_data(*figure.args))
+
+
+# -------------------------------------------------------------------------------------
+def write_data(df: pd.DataFrame, file: str) -> None:
+    """
+    Write the data of a figure as Zstandard-compressed Parquet
+
+    Arguments:
+    `df`: data of the figure
+    `file`: output file
+    """
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(table, file, compression="zstd")
+
+
+# -------------------------------------------------------------------------------------
+def save_figure(name: str, df: pd.DataFrame, out_dir: str) -> None:
+    """
+    Plot the data of a figure and save it as `{name}.png` in `out_dir`
+
+    Arguments:
+    `name`: figure name, a key of `FIGURES`
+    `df`: data of the figure
+    `out_dir`: output directory
+    """
+
+    plot = FIGURES[name].plot(df, COLOR_MAPPING)
+    plot.save(
+        os.path.join(out_dir, f"{name}.png"),
+        width=FIGURE_SIZE[0],
+        height=FIGURE_SIZE[1],
+        verbose=False,
+    )
+
+
+# -------------------------------------------------------------------------------------
+def render_figure(
+    name: str,
+    out_dir: str,
+    cache_file: Optional[str],
+    cache_size: int,
+    data_only: bool = False,
+) -> Rendered:
+    """
+    Calculate or load the data of a figure and save it as `{name}.parquet` in
+    `out_dir`, then, unless `data_only`, plot and save it as `{name}.png`.
+    Errors are returned rather than raised, so one failed figure does not stop
+    the others.
+
+    Arguments:
+    `name`: figure name, a key of `FIGURES`
+    `out_dir`: output directory
+    `cache_file`: persistent cache file, or `None` to always calculate the data
+    `cache_size`: maximum cache size in bytes
+    `data_only`: only save the data, without importing plotnine
+    """
+
+    cache = DiskCache(cache_file, cache_size) if cache_file else None
+
+    try:
+        df = get_figure_data(name, cache)
+        write_data(df, os.path.join(out_dir, f"{name}.parquet"))
+
+        if not data_only:
+            save_figure(name, df, out_dir)
+    except Exception:  # pylint: disable=broad-except
+        return Rendered(name, False, traceback.format_exc())
+    finally:
+        if cache is not None:
+            cache.close()
+
+    return Rendered(name, cache is not None and cache.hits > 0, None)
+
+
 # -------------------------------------------------------------------------------------
 def main() -> None:
     """Main function"""
@@ -426,28 +848,51 @@ def main() -> None:
     if not os.path.isdir(out_dir):
         os.makedirs(out_dir)
 
-    print("Generating figures...")
-    fig_2a = make_fig_2a(COLOR_MAPPING, calc_nondim_fill_volume)
-    fig_2a_incorrect = make_fig_2a(COLOR_MAPPING, calc_incorrect_nondim_fill_volume)
-    fig_2b = make_fig_2b(COLOR_MAPPING)
-    fig_3 = make_fig_3(COLOR_MAPPING)
-    fig_6 = make_fig_6(COLOR_MAPPING)
-
-    print("Saving figures...")
-    fig_2a.save(
-        os.path.join(out_dir, "fig_2a.png"), width=6.4, height=4.8, verbose=False
-    )
-    fig_2a_incorrect.save(
-        os.path.join(out_dir, "fig_2a_incorrect.png"),
-        width=6.4,
-        height=4.8,
-        verbose=False,
-    )
-    fig_2b.save(
-        os.path.join(out_dir, "fig_2b.png"), width=6.4, height=4.8, verbose=False
-    )
-    fig_3.save(os.path.join(out_dir, "fig_3.png"), width=6.4, height=4.8, verbose=False)
-    fig_6.save(os.path.join(out_dir, "fig_6.png"), width=6.4, height=4.8, verbose=False)
+    hashes = {name: output_hashes(name, args.data_only) for name in args.only}
+    manifest = read_manifest(out_dir)
+    stale = [
+        name
+        for name in args.only
+        if args.force or find_stale(out_dir, manifest, hashes[name])
+    ]
+    kind = "dataset(s)" if args.data_only else "figure(s)"
+
+    if not stale:
+        print(f"All {len(hashes)} {kind} are up to date.")
+        print(f'Done. See figures in "{out_dir}".')
+        return
+
+    jobs = min(args.jobs, len(stale))
+    print(f"Making {len(stale)} of {len(hashes)} {kind} in {jobs} process(es)...")
+    tasks = [
+        (name, out_dir, args.cache, args.cache_size * 1024**2, args.data_only)
+        for name in stale
+    ]
+    results = list(parallel.run_tasks(render_figure, tasks, jobs))
+
+    for result in results:
+        if result.error:
+            for file_name in output_hashes(result.name):
+                manifest.pop(file_name, None)
+        else:
+            manifest.update(hashes[result.name])
+
+    write_manifest(out_dir, manifest)
+
+    if args.cache:
+        n_cached = sum(result.cached for result in results)
+        print(f"Loaded {n_cached} of {len(stale)} dataset(s) from cache.")
+
+    failed = sorted(result.name for result in results if result.error)
+    for result in results:
+        if result.error:
+            print(f'Error making "{result.name}":\n{result.error}', file=sys.stderr)
+
+    if failed:
+        sys.exit(
+            f"Failed to make {len(failed)} of {len(stale)} {kind}:"
+            f" {', '.join(failed)}"
+        )
 
     print(f'Done. See figures in "{out_dir}".')
 
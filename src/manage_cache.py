@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Author : Kenneth Schackart <schackartk1@gmail.com>
+Date   : 2023-03-25
+Purpose: Inspect and prune a persistent result cache
+"""
+
+import argparse
+import datetime
+import os
+from typing import NamedTuple, Optional
+
+from t_junction_model.disk_cache import DiskCache
+from formatters.formatter_class import CustomHelpFormatter
+
+COMMANDS = ["info", "list", "prune", "clear"]
+
+
+class Args(NamedTuple):
+    """Command-line arguments"""
+
+    command: str
+    file: str
+    max_size: Optional[int]
+
+
+# -------------------------------------------------------------------------------------
+def get_args() -> Args:
+    """Get command-line arguments"""
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Inspect or prune a cache file written by make_figures.py -c|--cache."
+            " info summarizes the cache, list shows each entry, prune removes"
+            " entries computed with a different version of the model (and the"
+            " least recently used entries beyond -m|--max-size), and clear"
+            " removes all entries."
+        ),
+        formatter_class=CustomHelpFormatter,
+    )
+
+    parser.add_argument(
+        "command",
+        help=f"Command, one of {', '.join(COMMANDS)}",
+        metavar="CMD",
+        type=str,
+        choices=COMMANDS,
+    )
+    parser.add_argument(
+        "file",
+        help="Cache file",
+        metavar="FILE",
+        type=str,
+    )
+    parser.add_argument(
+        "-m",
+        "--max-size",
+        help="With prune, also shrink the cache to at most this many MiB",
+        metavar="MIB",
+        type=int,
+        default=None,
+    )
+
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.file):
+        parser.error(f'Cache file "{args.file}" does not exist')
+
+    if args.max_size is not None and args.max_size < 0:
+        parser.error(f"--max-size must not be negative, got {args.max_size}")
+
+    return Args(args.command, args.file, args.max_size)
+
+
+# -------------------------------------------------------------------------------------
+def format_size(size: int) -> str:
+    """
+    Format a size in bytes as KiB or MiB
+
+    Arguments:
+    `size`: size in bytes
+    """
+
+    if size < 1024**2:
+        return f"{size / 1024:.1f} KiB"
+
+    return f"{size / 1024**2:.1f} MiB"
+
+
+# -------------------------------------------------------------------------------------
+def main() -> None:
+    """Main function"""
+
+    args = get_args()
+    cache = DiskCache(args.file)
+
+    if args.command == "info":
+        info = cache.info()
+        print(f'Cache "{info.path}"')
+        print(f"Entries: {info.n_entries} ({info.n_stale} stale)")
+        print(f"Size: {format_size(info.size)}")
+
+    elif args.command == "list":
+        for entry in cache.entries():
+            accessed = datetime.datetime.fromtimestamp(entry.accessed)
+            print(
+                f"{entry.name:<20} {format_size(entry.size):>12}"
+                f"  {accessed:%Y-%m-%d %H:%M:%S}"
+                f"  {'stale' if entry.stale else 'current'}"
+            )
+
+    elif args.command == "prune":
+        max_size = None if args.max_size is None else args.max_size * 1024**2
+        print(f"Removed {cache.prune(stale=True, max_size=max_size)} entries.")
+
+    else:
+        print(f"Removed {cache.clear()} entries.")
+
+    cache.close()
+
+
+# -------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    main()
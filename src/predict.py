@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Author : Kenneth Schackart <schackartk1@gmail.com>
+Date   : 2023-03-11
+Purpose: Predict droplet/bubble volumes for a file of T-junction designs
+"""
+
+import argparse
+import os
+import sys
+from typing import Iterator, NamedTuple, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from t_junction_model import batch
+from formatters.formatter_class import CustomHelpFormatter
+
+# Columns needed by the model
+COLUMNS = list(batch.PARAMETERS)
+
+FORMATS = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet"}
+
+
+class Args(NamedTuple):
+    """Command-line arguments"""
+
+    file: str
+    input_format: str
+    outfile: str
+    chunk_size: int
+
+
+# -------------------------------------------------------------------------------------
+def get_args() -> Args:
+    """Get command-line arguments"""
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Predict fill, squeeze and total volumes for every design in a CSV or"
+            " Parquet file. The file is processed in chunks, so memory use does not"
+            " depend on its size."
+        ),
+        formatter_class=CustomHelpFormatter,
+    )
+
+    parser.add_argument(
+        "file",
+        help=f'Design file with columns {", ".join(COLUMNS)}',
+        metavar="FILE",
+        type=str,
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        help="Input file format, csv or parquet (default: from extension)",
+        metavar="FMT",
+        type=str,
+        choices=sorted(set(FORMATS.values())),
+        default=None,
+    )
+    parser.add_argument(
+        "-o",
+        "--outfile",
+        help="Output Parquet file",
+        metavar="FILE",
+        type=str,
+        default="predictions.parquet",
+    )
+    parser.add_argument(
+        "-c",
+        "--chunk-size",
+        help="Rows per chunk",
+        metavar="INT",
+        type=int,
+        default=100_000,
+    )
+
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.file):
+        parser.error(f'Input file "{args.file}" does not exist')
+
+    input_format = args.format or FORMATS.get(os.path.splitext(args.file)[1].lower())
+    if input_format is None:
+        parser.error(f'Cannot tell format of "{args.file}", use -f|--format')
+
+    if args.chunk_size < 1:
+        parser.error(f"--chunk-size must be positive, got {args.chunk_size}")
+
+    return Args(args.file, input_format, args.outfile, args.chunk_size)
+
+
+# -------------------------------------------------------------------------------------
+def read_chunks(
+    file: str, input_format: str, chunk_size: int
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a design file in chunks of at most `chunk_size` rows. A file without
+    rows gives one empty chunk, which keeps its columns
+
+    Arguments:
+    `file`: input file
+    `input_format`: "csv" or "parquet"
+    `chunk_size`: maximum rows per chunk
+    """
+
+    if input_format == "csv":
+        with pd.read_csv(file, chunksize=chunk_size) as reader:
+            yield from reader
+    else:
+        parquet_file = pq.ParquetFile(file)
+        if parquet_file.metadata.num_rows == 0:
+            yield parquet_file.schema_arrow.empty_table().to_pandas()
+        for record_batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield record_batch.to_pandas()
+
+
+# -------------------------------------------------------------------------------------
+def predict_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the predicted fill volume, squeezing coefficient, squeeze volume and
+    total volume to a chunk of designs
+
+    Arguments:
+    `chunk`: designs, with one column for each model input
+    """
+
+    missing = [column for column in COLUMNS if column not in chunk.columns]
+    if missing:
+        raise KeyError(f'Missing columns: {", ".join(missing)}')
+
+    chunk = chunk.copy()
+    chunk[COLUMNS] = chunk[COLUMNS].astype(float)
+    predictions = batch.calc_predictions(
+        *(chunk[column].to_numpy() for column in COLUMNS)
+    )
+
+    for name, values in predictions.items():
+        chunk[name] = values
+
+    return chunk
+
+
+# -------------------------------------------------------------------------------------
+def write_predictions(chunks: Iterator[pd.DataFrame], outfile: str) -> int:
+    """
+    Predict each chunk and append it to a Parquet file, returning the number of
+    rows written. Without any chunks, an empty file with the model inputs and
+    predictions as columns is written
+
+    Arguments:
+    `chunks`: chunks of designs
+    `outfile`: output Parquet file
+    """
+
+    writer: Optional[pq.ParquetWriter] = None
+    n_rows = 0
+
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(predict_chunk(chunk), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(outfile, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            n_rows += table.num_rows
+
+        if writer is None:
+            empty = pd.DataFrame({column: [] for column in COLUMNS}, dtype=float)
+            table = pa.Table.from_pandas(predict_chunk(empty), preserve_index=False)
+            writer = pq.ParquetWriter(outfile, table.schema)
+            writer.write_table(table)
+
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return n_rows
+
+
+# -------------------------------------------------------------------------------------
+def main() -> None:
+    """Main function"""
+
+    args = get_args()
+
+    out_dir = os.path.dirname(args.outfile)
+    if out_dir and not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+
+    print("Predicting volumes...")
+    try:
+        n_rows = write_predictions(
+            read_chunks(args.file, args.input_format, args.chunk_size), args.outfile
+        )
+    except KeyError as error:
+        sys.exit(f'Error in "{args.file}": {error.args[0]}')
+
+    print(f'Done. Wrote {n_rows:,} predictions to "{args.outfile}".')
+
+
+# -------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Author : Kenneth Schackart <schackartk1@gmail.com>
+Date   : 2023-03-25
+Purpose: Time the model and figure pipeline, and compare with earlier commits
+"""
+
+import argparse
+import fnmatch
+import functools
+import os
+import subprocess
+import sys
+import tempfile
+from typing import NamedTuple, Optional
+
+import make_figures
+from t_junction_model import benchmark
+from t_junction_model.benchmark import Benchmark
+from formatters.formatter_class import CustomHelpFormatter
+
+COMMANDS = ["run", "compare"]
+
+
+class Args(NamedTuple):
+    """Command-line arguments"""
+
+    command: str
+    history: str
+    sizes: list[int]
+    match: str
+    repeat: int
+    threshold: float
+    baseline: Optional[str]
+
+
+# -------------------------------------------------------------------------------------
+def get_args() -> Args:
+    """Get command-line arguments"""
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Time scalar and batched model calls and each figure's data and"
+            " render stages. run appends the timings to the history file, and"
+            " compare compares the latest timings with a baseline, failing if"
+            " any benchmark is slower by more than -t|--threshold."
+        ),
+        formatter_class=CustomHelpFormatter,
+    )
+
+    parser.add_argument(
+        "command",
+        help=f"Command, one of {', '.join(COMMANDS)}",
+        metavar="CMD",
+        type=str,
+        choices=COMMANDS,
+    )
+    parser.add_argument(
+        "-H",
+        "--history",
+        help="JSON Lines file of timings",
+        metavar="FILE",
+        type=str,
+        default="benchmarks.jsonl",
+    )
+    parser.add_argument(
+        "-s",
+        "--sizes",
+        help="Comma-separated numbers of points of batched benchmarks",
+        metavar="SIZES",
+        type=str,
+        default="1e3,1e4,1e5,1e6,1e7",
+    )
+    parser.add_argument(
+        "-m",
+        "--match",
+        help="Only run benchmarks with names matching a pattern, e.g. 'figure/*'",
+        metavar="PATTERN",
+        type=str,
+        default="*",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        help="Number of timed runs of each benchmark",
+        metavar="INT",
+        type=int,
+        default=3,
+    )
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        help="Relative slowdown flagged by compare",
+        metavar="FRAC",
+        type=float,
+        default=0.1,
+    )
+    parser.add_argument(
+        "-b",
+        "--baseline",
+        help="Commit to compare with (default: the previous record)",
+        metavar="COMMIT",
+        type=str,
+        default=None,
+    )
+
+    args = parser.parse_args()
+
+    try:
+        sizes = [int(float(size)) for size in args.sizes.split(",")]
+    except ValueError:
+        parser.error(f"--sizes must be comma-separated numbers, got {args.sizes!r}")
+
+    if any(size < 1 for size in sizes):
+        parser.error(f"--sizes must be positive, got {args.sizes!r}")
+
+    if args.repeat < 1:
+        parser.error(f"--repeat must be positive, got {args.repeat}")
+
+    if args.threshold < 0:
+        parser.error(f"--threshold must not be negative, got {args.threshold}")
+
+    if args.command == "compare" and not os.path.isfile(args.history):
+        parser.error(f'History file "{args.history}" does not exist')
+
+    return Args(
+        args.command,
+        args.history,
+        sizes,
+        args.match,
+        args.repeat,
+        args.threshold,
+        args.baseline,
+    )
+
+
+# -------------------------------------------------------------------------------------
+def render_args(name: str, out_dir: str) -> tuple:
+    """
+    Arguments of `make_figures.save_figure()` for a figure
+
+    Arguments:
+    `name`: figure name, a key of `make_figures.FIGURES`
+    `out_dir`: output directory
+    """
+
+    figure = make_figures.FIGURES[name]
+
+    return name, figure.make_data(*figure.args), out_dir
+
+
+# -------------------------------------------------------------------------------------
+def figure_benchmarks(out_dir: str) -> list[Benchmark]:
+    """
+    Get benchmarks of the data and render stages of each figure
+
+    Arguments:
+    `out_dir`: directory the figures are saved to
+    """
+
+    benchmarks = []
+    for name, figure in make_figures.FIGURES.items():
+        benchmarks.extend(
+            [
+                Benchmark(
+                    f"figure/{name}/data",
+                    functools.partial(tuple, figure.args),
+                    figure.make_data,
+                ),
+                Benchmark(
+                    f"figure/{name}/render",
+                    functools.partial(render_args, name, out_dir),
+                    make_figures.save_figure,
+                ),
+            ]
+        )
+
+    return benchmarks
+
+
+# -------------------------------------------------------------------------------------
+def startup_benchmarks() -> list[Benchmark]:
+    """Get benchmarks of starting scripts in a new interpreter"""
+
+    command = [sys.executable, make_figures.__file__, "--help"]
+
+    return [
+        Benchmark(
+            "startup/make_figures --help",
+            functools.partial(tuple, [command]),
+            functools.partial(subprocess.run, stdout=subprocess.DEVNULL, check=True),
+        )
+    ]
+
+
+# -------------------------------------------------------------------------------------
+def describe_commit(record: dict) -> str:
+    """
+    Describe the commit of a history record
+
+    Arguments:
+    `record`: history record
+    """
+
+    commit = (record.get("commit") or "unknown")[:10]
+
+    return f"{commit}{'+dirty' if record.get('dirty') else ''} ({record['time']})"
+
+
+# -------------------------------------------------------------------------------------
+def run(args: Args) -> None:
+    """
+    Time the benchmarks and append the timings to the history file
+
+    Arguments:
+    `args`: command-line arguments
+    """
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        benchmarks = [
+            bench
+            for bench in benchmark.model_benchmarks(args.sizes)
+            + figure_benchmarks(out_dir)
+            + startup_benchmarks()
+            if fnmatch.fnmatch(bench.name, args.match)
+        ]
+
+        if not benchmarks:
+            sys.exit(f'Error: no benchmark matches "{args.match}"')
+
+        timings = []
+        for bench in benchmarks:
+            timing = benchmark.time_benchmark(bench, args.repeat)
+            timings.append(timing)
+            print(
+                f"{timing.name:<40} {benchmark.format_seconds(timing.best):>10}"
+                f"  ({timing.calls} call(s) per run)",
+                flush=True,
+            )
+
+    record = benchmark.make_record(timings, os.path.dirname(os.path.abspath(__file__)))
+    benchmark.append_history(args.history, record)
+
+    print(
+        f"Saved {len(timings)} timing(s) of {describe_commit(record)}"
+        f' to "{args.history}".'
+    )
+
+
+# -------------------------------------------------------------------------------------
+def compare(args: Args) -> None:
+    """
+    Compare the latest timings in the history file with a baseline
+
+    Arguments:
+    `args`: command-line arguments
+    """
+
+    history = benchmark.read_history(args.history)
+    baseline = benchmark.find_baseline(history, args.baseline)
+
+    if baseline is None:
+        sys.exit(
+            "Error: no earlier record"
+            + (f" of commit {args.baseline}" if args.baseline else "")
+            + f' in "{args.history}"'
+        )
+
+    current = history[-1]
+    print(f"Comparing {describe_commit(current)} with {describe_commit(baseline)}")
+
+    comparisons = benchmark.compare(baseline, current, args.threshold)
+    for comparison in comparisons:
+        print(
+            f"{comparison.name:<40}"
+            f" {benchmark.format_seconds(comparison.baseline):>10}"
+            f" {benchmark.format_seconds(comparison.current):>10}"
+            f" {comparison.ratio - 1:>+8.1%}"
+            f"{'  slower' if comparison.slower else ''}"
+        )
+
+    slower = [comparison.name for comparison in comparisons if comparison.slower]
+    if slower:
+        sys.exit(
+            f"{len(slower)} of {len(comparisons)} benchmark(s) slower by more than"
+            f" {args.threshold:.0%}: {', '.join(slower)}"
+        )
+
+    print(f"No benchmark slower by more than {args.threshold:.0%}.")
+
+
+# -------------------------------------------------------------------------------------
+def main() -> None:
+    """Main function"""
+
+    args = get_args()
+
+    if args.command == "run":
+        run(args)
+    else:
+        compare(args)
+
+
+# -------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    main()
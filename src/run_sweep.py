@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Author : Kenneth Schackart <schackartk1@gmail.com>
+Date   : 2023-03-18
+Purpose: Run a parameter sweep of the T-junction model on many processes
+"""
+
+import argparse
+import os
+import sys
+from typing import NamedTuple
+
+import numpy as np
+
+from t_junction_model.resumable import run_resumable_sweep
+from t_junction_model.sweep import PARAMETERS, SweepGrid, run_sweep
+from formatters.formatter_class import CustomHelpFormatter
+
+# Swept values of each input when not given, in SI units
+DEFAULTS = {
+    "height": "33e-6",
+    "width": "100e-6",
+    "inlet_width": "100e-6",
+    "epsilon": "10e-6",
+    "flow_cont": "3e-9",
+    "flow_disp": "6e-9",
+    "flow_gutter": "0.3e-9",
+}
+
+
+class Args(NamedTuple):
+    """Command-line arguments"""
+
+    values: dict[str, np.ndarray]
+    out_dir: str
+    shard_size: int
+    workers: int
+    resumable: bool
+    float32: bool
+
+
+# -------------------------------------------------------------------------------------
+def get_args() -> Args:
+    """Get command-line arguments"""
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Evaluate the model over the Cartesian product of the given values,"
+            " writing one file per shard of the grid. Each input takes one or more"
+            " values, or START:STOP:NUM for evenly spaced values. With"
+            " -r|--resumable, results go to one memory-mapped file instead, and"
+            " rerunning an interrupted sweep only computes the missing shards."
+        ),
+        formatter_class=CustomHelpFormatter,
+    )
+
+    for name in PARAMETERS:
+        parser.add_argument(
+            f"--{name.replace('_', '-')}",
+            help=f"Value(s) of {name} (default: {DEFAULTS[name]})",
+            metavar="VAL",
+            type=str,
+            nargs="+",
+            default=None,
+        )
+
+    parser.add_argument(
+        "-o",
+        "--out-dir",
+        help="Output directory",
+        metavar="DIR",
+        type=str,
+        default="sweep/",
+    )
+    parser.add_argument(
+        "-s",
+        "--shard-size",
+        help="Grid points per shard",
+        metavar="INT",
+        type=int,
+        default=1_000_000,
+    )
+    parser.add_argument(
+        "-r",
+        "--resumable",
+        help="Write one memory-mapped results file with a journal of finished shards",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-f",
+        "--float32",
+        help="Calculate and store results in single precision",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        help="Worker processes (default: number of CPUs)",
+        metavar="INT",
+        type=int,
+        default=None,
+    )
+
+    args = parser.parse_args()
+
+    values = {}
+    for name in PARAMETERS:
+        try:
+            values[name] = parse_values(getattr(args, name) or [DEFAULTS[name]])
+        except ValueError as error:
+            parser.error(f"--{name.replace('_', '-')}: {error}")
+
+    if args.shard_size < 1:
+        parser.error(f"--shard-size must be positive, got {args.shard_size}")
+
+    if args.workers is not None and args.workers < 1:
+        parser.error(f"--workers must be positive, got {args.workers}")
+
+    workers = args.workers or os.cpu_count() or 1
+
+    return Args(
+        values, args.out_dir, args.shard_size, workers, args.resumable, args.float32
+    )
+
+
+# -------------------------------------------------------------------------------------
+def parse_values(tokens: list[str]) -> np.ndarray:
+    """
+    Convert values given on the command line to an array, expanding
+    START:STOP:NUM into evenly spaced values
+
+    Arguments:
+    `tokens`: values as strings
+    """
+
+    values = []
+    for token in tokens:
+        parts = token.split(":")
+        if len(parts) == 1:
+            values.append(np.array([float(token)]))
+        elif len(parts) == 3:
+            values.append(np.linspace(float(parts[0]), float(parts[1]), int(parts[2])))
+        else:
+            raise ValueError(f'cannot parse "{token}", expected VAL or START:STOP:NUM')
+
+    return np.concatenate(values)
+
+
+# -------------------------------------------------------------------------------------
+def print_progress(n_done: int, n_points: int, seconds: float) -> None:
+    """
+    Print the number of points done and the throughput
+
+    Arguments:
+    `n_done`: points evaluated so far
+    `n_points`: total points
+    `seconds`: time elapsed
+    """
+
+    rate = n_done / seconds if seconds > 0 else float("inf")
+    print(f"{n_done:,}/{n_points:,} points ({rate:,.0f} points/s)", flush=True)
+
+
+# -------------------------------------------------------------------------------------
+def main() -> None:
+    """Main function"""
+
+    args = get_args()
+    grid = SweepGrid(args.values, np.float32 if args.float32 else np.float64)
+
+    print(f"Sweeping {grid.n_points:,} points on {args.workers} worker(s)...")
+
+    if args.resumable:
+        try:
+            resumed = run_resumable_sweep(
+                grid,
+                args.out_dir,
+                args.shard_size,
+                args.workers,
+                progress=print_progress,
+            )
+        except ValueError as error:
+            sys.exit(f"Error: {error}")
+
+        print(
+            f"Done. Computed {resumed.n_chunks - resumed.n_resumed} of"
+            f" {resumed.n_chunks} shard(s) in {resumed.seconds:.2f} s,"
+            f' see "{resumed.file}".'
+        )
+        return
+
+    result = run_sweep(
+        grid, args.out_dir, args.shard_size, args.workers, progress=print_progress
+    )
+
+    print(
+        f"Done. Wrote {result.n_shards} shard(s) in {result.seconds:.2f} s"
+        f' to "{args.out_dir}".'
+    )
+
+
+# -------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Author : Kenneth Schackart <schackartk1@gmail.com>
+Date   : 2023-03-25
+Purpose: Serve model predictions over HTTP, batching concurrent requests
+"""
+
+import argparse
+import asyncio
+from typing import NamedTuple
+
+from t_junction_model.service import PARAMETERS, PredictionService
+from formatters.formatter_class import CustomHelpFormatter
+
+
+class Args(NamedTuple):
+    """Command-line arguments"""
+
+    host: str
+    port: int
+    window: float
+    max_batch: int
+
+
+# -------------------------------------------------------------------------------------
+def get_args() -> Args:
+    """Get command-line arguments"""
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Serve predictions on a local HTTP port. POST /predict takes a JSON"
+            f" object with {', '.join(PARAMETERS)} and returns the fill volume,"
+            " alpha, squeeze volume and total volume. Requests arriving within"
+            " the batching window are evaluated together. GET /stats returns"
+            " latency percentiles and batch sizes."
+        ),
+        formatter_class=CustomHelpFormatter,
+    )
+
+    parser.add_argument(
+        "-H",
+        "--host",
+        help="Address to listen on",
+        metavar="HOST",
+        type=str,
+        default="127.0.0.1",
+    )
+    parser.add_argument(
+        "-p",
+        "--port",
+        help="Port to listen on, 0 for any free port",
+        metavar="INT",
+        type=int,
+        default=8000,
+    )
+    parser.add_argument(
+        "-w",
+        "--window",
+        help="Batching window in milliseconds",
+        metavar="MS",
+        type=float,
+        default=2.0,
+    )
+    parser.add_argument(
+        "-b",
+        "--max-batch",
+        help="Requests at which a batch is evaluated without waiting",
+        metavar="INT",
+        type=int,
+        default=1024,
+    )
+
+    args = parser.parse_args()
+
+    if not 0 <= args.port <= 65535:
+        parser.error(f"--port must be between 0 and 65535, got {args.port}")
+
+    if args.window < 0:
+        parser.error(f"--window must not be negative, got {args.window}")
+
+    if args.max_batch < 1:
+        parser.error(f"--max-batch must be positive, got {args.max_batch}")
+
+    return Args(args.host, args.port, args.window / 1000, args.max_batch)
+
+
+# -------------------------------------------------------------------------------------
+async def serve(args: Args) -> None:
+    """
+    Start the service and serve until interrupted
+
+    Arguments:
+    `args`: command-line arguments
+    """
+
+    service = PredictionService(args.host, args.port, args.window, args.max_batch)
+    await service.start()
+
+    print(f"Serving on http://{args.host}:{service.port}", flush=True)
+
+    await service.serve_forever()
+
+
+# -------------------------------------------------------------------------------------
+def main() -> None:
+    """Main function"""
+
+    try:
+        asyncio.run(serve(get_args()))
+    except KeyboardInterrupt:
+        print("Stopped.")
+
+
+# -------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+"""
+Accelerated
+~~~
+Selectable backends for evaluating the model over arrays of designs.
+
+- "numba": the filling, squeezing and total formulas are compiled with Numba
+  into single fused loops the first time they are used, with the
+  `inlet_width <= width` branch of the fill volume handled inside the loop.
+- "numpy": the functions in the batch module.
+- "python": the scalar functions in the filling, squeezing and total modules,
+  called once per element.
+
+Numba is optional. If it cannot be imported, the "python" backend is used and
+nothing else changes. Use `set_backend()` to choose another backend.
+
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import math
+from math import pi as PI
+from typing import Callable, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from t_junction_model import batch
+from t_junction_model import filling
+from t_junction_model import squeezing
+from t_junction_model import total
+
+try:
+    import numba
+except ImportError:  # pragma: no cover - depends on the environment
+    numba = None
+
+# pylint: disable=protected-access
+
+HAS_NUMBA = numba is not None
+
+BACKENDS = ("python", "numpy", "numba")
+
+_STATE = {"backend": "numba" if HAS_NUMBA else "python"}
+_COMPILED: dict[str, Callable] = {}
+
+
+# -------------------------------------------------------------------------------------
+def get_backend() -> str:
+    """Get the name of the backend in use"""
+
+    return _STATE["backend"]
+
+
+# -------------------------------------------------------------------------------------
+def set_backend(backend: str) -> None:
+    """
+    Choose the backend used by the functions in this module
+
+    Arguments:
+    `backend`: one of "python", "numpy" or "numba"
+    """
+
+    if backend not in BACKENDS:
+        raise ValueError(f'Unknown backend "{backend}", choose from {BACKENDS}')
+
+    if backend == "numba" and not HAS_NUMBA:
+        raise ValueError('Backend "numba" needs Numba, which is not installed')
+
+    _STATE["backend"] = backend
+
+
+# -------------------------------------------------------------------------------------
+def calc_fill_volume(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    backend: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Calculate the filling volume
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `backend`: backend to use instead of the current one
+    """
+
+    return _dispatch(
+        "fill_volume",
+        batch.calc_fill_volume,
+        filling.calc_fill_volume,
+        backend,
+        height,
+        width,
+        inlet_width,
+    )
+
+
+# -------------------------------------------------------------------------------------
+def calc_alpha(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+    backend: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Calculate the sequeezing coefficient, alpha
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_gutter`: volumetric flow rate of gutter
+    `backend`: backend to use instead of the current one
+    """
+
+    return _dispatch(
+        "alpha",
+        batch._calc_alpha,
+        squeezing._calc_alpha,
+        backend,
+        height,
+        width,
+        inlet_width,
+        epsilon,
+        flow_cont,
+        flow_gutter,
+    )
+
+
+# -------------------------------------------------------------------------------------
+def calc_squeezing_volume(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_disp: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+    backend: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Calculate the volume of the droplet due to squeezing phase
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_disp`: volumetric flow rate of dispersed phase
+    `flow_gutter`: volumetric flow rate of gutter
+    `backend`: backend to use instead of the current one
+    """
+
+    return _dispatch(
+        "squeezing_volume",
+        batch.calc_squeezing_volume,
+        squeezing.calc_squeezing_volume,
+        backend,
+        height,
+        width,
+        inlet_width,
+        epsilon,
+        flow_cont,
+        flow_disp,
+        flow_gutter,
+    )
+
+
+# -------------------------------------------------------------------------------------
+def calc_total_volume(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_disp: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+    backend: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Calculate the total volume of droplet/bubble
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_disp`: volumetric flow rate of dispersed phase
+    `flow_gutter`: volumetric flow rate of gutter
+    `backend`: backend to use instead of the current one
+    """
+
+    return _dispatch(
+        "total_volume",
+        batch.calc_total_volume,
+        total.calc_total_volume,
+        backend,
+        height,
+        width,
+        inlet_width,
+        epsilon,
+        flow_cont,
+        flow_disp,
+        flow_gutter,
+    )
+
+
+# -------------------------------------------------------------------------------------
+def calc_nondim_total_volume(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_disp: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+    backend: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Calculate the non-dimensionalized total volume of droplet/bubble. Elements
+    for which `height`, `width` or `inlet_width` is zero are NaN.
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_disp`: volumetric flow rate of dispersed phase
+    `flow_gutter`: volumetric flow rate of gutter
+    `backend`: backend to use instead of the current one
+    """
+
+    def scalar_function(*args: float) -> float:
+        nondim_volume = total.calc_nondim_total_volume(*args)
+        return math.nan if nondim_volume is None else nondim_volume
+
+    return _dispatch(
+        "nondim_total_volume",
+        batch.calc_nondim_total_volume,
+        scalar_function,
+        backend,
+        height,
+        width,
+        inlet_width,
+        epsilon,
+        flow_cont,
+        flow_disp,
+        flow_gutter,
+    )
+
+
+# -------------------------------------------------------------------------------------
+def _dispatch(
+    name: str,
+    numpy_function: Callable[..., np.ndarray],
+    python_function: Callable[..., Optional[float]],
+    backend: Optional[str],
+    *args: npt.ArrayLike,
+) -> np.ndarray:
+    """
+    Evaluate a model function with the chosen backend
+
+    Arguments:
+    `name`: name of the compiled kernel
+    `numpy_function`: function from the batch module
+    `python_function`: scalar function
+    `backend`: backend to use, or None for the current one
+    `args`: arguments, broadcast against each other
+    """
+
+    backend = backend or get_backend()
+    if backend not in BACKENDS:
+        raise ValueError(f'Unknown backend "{backend}", choose from {BACKENDS}')
+
+    if backend == "numpy":
+        return numpy_function(*args)
+
+    if backend == "python":
+        return np.vectorize(python_function, otypes=[float])(*args)
+
+    if not HAS_NUMBA:
+        raise ValueError('Backend "numba" needs Numba, which is not installed')
+
+    if not _COMPILED:
+        # NumPy error model gives inf/NaN on division by zero, as the batch
+        # module does, instead of raising
+        _COMPILED.update(_make_kernels(numba.njit(error_model="numpy")))
+
+    arrays = [np.asarray(arg, dtype=float) for arg in args]
+    shape = np.broadcast_shapes(*(array.shape for array in arrays))
+    out = np.empty(shape, dtype=float)
+
+    # Single values are passed as length-1 arrays rather than expanded
+    flat = [
+        array.reshape(1)
+        if array.size == 1
+        else np.broadcast_to(array, shape).ravel()
+        if array.shape != shape
+        else array.ravel()
+        for array in arrays
+    ]
+    _COMPILED[name](*flat, out.ravel())
+
+    return out
+
+
+# -------------------------------------------------------------------------------------
+def _make_kernels(jit: Callable) -> dict[str, Callable]:
+    """
+    Build the element and loop kernels. `jit` is `numba.njit` for compiled
+    kernels, or an identity function for plain Python versions of them.
+
+    Arguments:
+    `jit`: decorator applied to every kernel
+    """
+
+    # pylint: disable=too-many-arguments,too-many-locals
+
+    @jit
+    def fill_volume(height, width, inlet_width):
+        gutter_area = (height / 2) ** 2 - 0.25 * PI * (height / 2) ** 2
+
+        if inlet_width <= width:
+            area = 0.25 * PI * width**2 + 0.5 * PI * (width / 2) ** 2
+            gutter_length = 0.25 * PI * 2 * width + 0.5 * PI * width
+        else:
+            right_triangle_area = (
+                0.5
+                * (inlet_width - width)
+                * (inlet_width**2 - (inlet_width - width) ** 2) ** 0.5
+            )
+            sector_area = (
+                (inlet_width**2)
+                * 0.5
+                * math.asin((inlet_width - width) / inlet_width)
+            )
+            area_in_inlet = right_triangle_area + sector_area
+            area = 0.5 * PI * (width / 2) ** 2 + (
+                0.25 * PI * inlet_width**2 - area_in_inlet
+            )
+            gutter_length = 0.5 * PI * width + inlet_width * (
+                (PI / 2) - math.asin(1 - (width / inlet_width))
+            )
+
+        return height * area - 2 * (gutter_area * gutter_length)
+
+    @jit
+    def alpha(height, width, inlet_width, epsilon, flow_cont, flow_gutter):
+        fill_radius = max(width, inlet_width)
+        pinch_width = 2 * (0.5 * height * width / (height + width)) - epsilon
+        pinch_radius = (
+            width
+            + inlet_width
+            - pinch_width
+            + math.sqrt(2 * (inlet_width - pinch_width) * (width - pinch_width))
+        )
+
+        geometries = (
+            ((pinch_radius / width) ** 2)
+            - ((fill_radius / width) ** 2)
+            + (PI / 4)
+            * (height / width)
+            * ((pinch_radius / width) - (fill_radius / width))
+        )
+
+        return (1 - (PI / 4)) * geometries / (1 - (flow_gutter / flow_cont))
+
+    @jit
+    def squeezing_volume(
+        height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter
+    ):
+        return (
+            alpha(height, width, inlet_width, epsilon, flow_cont, flow_gutter)
+            * height
+            * (width**2)
+            * (flow_disp / flow_cont)
+        )
+
+    @jit
+    def fill_volume_loop(height, width, inlet_width, out):
+        steps = (height.size > 1, width.size > 1, inlet_width.size > 1)
+        for row in range(out.size):
+            out[row] = fill_volume(
+                height[row * steps[0]],
+                width[row * steps[1]],
+                inlet_width[row * steps[2]],
+            )
+
+    @jit
+    def alpha_loop(height, width, inlet_width, epsilon, flow_cont, flow_gutter, out):
+        steps = (
+            height.size > 1,
+            width.size > 1,
+            inlet_width.size > 1,
+            epsilon.size > 1,
+            flow_cont.size > 1,
+            flow_gutter.size > 1,
+        )
+        for row in range(out.size):
+            out[row] = alpha(
+                height[row * steps[0]],
+                width[row * steps[1]],
+                inlet_width[row * steps[2]],
+                epsilon[row * steps[3]],
+                flow_cont[row * steps[4]],
+                flow_gutter[row * steps[5]],
+            )
+
+    def make_volume_loop(kind):
+        @jit
+        def volume_loop(
+            height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter, out
+        ):
+            steps = (
+                height.size > 1,
+                width.size > 1,
+                inlet_width.size > 1,
+                epsilon.size > 1,
+                flow_cont.size > 1,
+                flow_disp.size > 1,
+                flow_gutter.size > 1,
+            )
+            for row in range(out.size):
+                row_height = height[row * steps[0]]
+                row_width = width[row * steps[1]]
+                row_inlet_width = inlet_width[row * steps[2]]
+
+                if kind == 2 and (
+                    row_height == 0 or row_width == 0 or row_inlet_width == 0
+                ):
+                    out[row] = math.nan
+                    continue
+
+                squeeze = squeezing_volume(
+                    row_height,
+                    row_width,
+                    row_inlet_width,
+                    epsilon[row * steps[3]],
+                    flow_cont[row * steps[4]],
+                    flow_disp[row * steps[5]],
+                    flow_gutter[row * steps[6]],
+                )
+
+                if kind == 0:
+                    out[row] = squeeze
+                elif kind == 1:
+                    out[row] = (
+                        fill_volume(row_height, row_width, row_inlet_width) + squeeze
+                    )
+                else:
+                    scale = row_height * row_width**2
+                    out[row] = (
+                        fill_volume(row_height, row_width, row_inlet_width) / scale
+                        + squeeze / scale
+                    )
+
+        return volume_loop
+
+    return {
+        "fill_volume": fill_volume_loop,
+        "alpha": alpha_loop,
+        "squeezing_volume": make_volume_loop(0),
+        "total_volume": make_volume_loop(1),
+        "nondim_total_volume": make_volume_loop(2),
+    }
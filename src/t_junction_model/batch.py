@@ -0,0 +1,777 @@
+"""
+Batch
+~~~
+Array-in/array-out versions of the functions in the filling, squeezing and total
+modules. All arguments are broadcast against each other following NumPy rules, so
+a whole design sweep can be evaluated in a single call instead of once per design
+point. The formulas are evaluated in the same order as in the scalar functions,
+so the results agree with them to within floating-point rounding (NumPy's
+vectorized `arcsin` and `power` may differ from `math` in the last bit).
+
+Calculations are done in single precision when every argument is a `float32`
+array, and in double precision otherwise. `calc_predictions(..., dtype=np.float32)`
+halves the memory and bandwidth of large sweeps, at the cost of the relative
+errors in `FLOAT32_MAX_REL_ERROR`. These are the largest errors measured against
+the double precision scalar functions over 4 million random designs with
+1 um <= w <= 1 mm, 0.05 <= h/w <= 2, 0.1 <= w_in/w <= 5, Q_g/Q_c <= 0.9 and
+0.01 <= Q_d/Q_c <= 100, rounded up to allow a margin. They hold where
+w_in - pinch width >= 0.01 * w. Closer to the limit w_in = pinch width, alpha is
+ill-conditioned: rounding the inputs alone gives relative errors of about
+2.5e-6 * w / (w_in - pinch width) in alpha and the squeeze volume.
+
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+from math import pi as PI
+from typing import Callable, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+# Inputs of the total volume, in argument order
+PARAMETERS = (
+    "height",
+    "width",
+    "inlet_width",
+    "epsilon",
+    "flow_cont",
+    "flow_disp",
+    "flow_gutter",
+)
+
+# Results of calc_predictions()
+PREDICTIONS = ("fill_volume", "alpha", "squeeze_volume", "total_volume")
+
+# Gutter volume per height**2 per unit gutter length, see _calc_gutter_volume()
+GUTTER = 0.25 * (1 - PI / 4)
+
+# Worst-case relative error of each result of calc_predictions() in single
+# precision, where w_in - pinch width >= 0.01 * w
+FLOAT32_MAX_REL_ERROR = {
+    "fill_volume": 5e-6,
+    "alpha": 1e-5,
+    "squeeze_volume": 1e-5,
+    "total_volume": 1e-5,
+}
+
+
+# -------------------------------------------------------------------------------------
+def calc_fill_volume(
+    height: npt.ArrayLike, width: npt.ArrayLike, inlet_width: npt.ArrayLike
+) -> np.ndarray:
+    """
+    Calculate the filling volume
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    """
+
+    height, width, inlet_width = _broadcast(height, width, inlet_width)
+
+    fill_volume = np.empty_like(height)
+    narrow = inlet_width <= width
+    wide = ~narrow
+
+    fill_volume[narrow] = _calc_narrow_fill_volume(height[narrow], width[narrow])
+    fill_volume[wide] = _calc_wide_fill_volume(
+        height[wide], width[wide], inlet_width[wide]
+    )
+
+    return fill_volume
+
+
+# -------------------------------------------------------------------------------------
+def calc_incorrect_fill_volume(
+    height: npt.ArrayLike, width: npt.ArrayLike, inlet_width: npt.ArrayLike
+) -> np.ndarray:
+    """
+    Calculate the filling volume using modified (incorrect) equation to reproduce
+    figure 2a exactly.
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    """
+
+    height, width, inlet_width = _broadcast(height, width, inlet_width)
+
+    fill_volume = np.empty_like(height)
+    narrow = inlet_width <= width
+    wide = ~narrow
+
+    fill_volume[narrow] = _calc_narrow_fill_volume(height[narrow], width[narrow])
+    fill_volume[wide] = _calc_incorrect_wide_fill_volume(
+        height[wide], width[wide], inlet_width[wide]
+    )
+
+    return fill_volume
+
+
+# -------------------------------------------------------------------------------------
+def calc_nondim_fill_volume(
+    height: npt.ArrayLike, width: npt.ArrayLike, inlet_width: npt.ArrayLike
+) -> np.ndarray:
+    """
+    Calculate the non-dimensionalized fill volume. Elements for which any
+    argument is zero are NaN.
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    """
+
+    height, width, inlet_width = _broadcast(height, width, inlet_width)
+
+    return _nondimensionalize(
+        calc_fill_volume, height, width, inlet_width, (height, width, inlet_width)
+    )
+
+
+# -------------------------------------------------------------------------------------
+def calc_incorrect_nondim_fill_volume(
+    height: npt.ArrayLike, width: npt.ArrayLike, inlet_width: npt.ArrayLike
+) -> np.ndarray:
+    """
+    Calculate the non-dimensionalized fill volume using the incorrect equation
+    in order to reproduce figure 2a exactly. Elements for which any argument
+    is zero are NaN.
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    """
+
+    height, width, inlet_width = _broadcast(height, width, inlet_width)
+
+    return _nondimensionalize(
+        calc_incorrect_fill_volume,
+        height,
+        width,
+        inlet_width,
+        (height, width, inlet_width),
+    )
+
+
+# -------------------------------------------------------------------------------------
+def calc_squeezing_volume(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_disp: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+) -> np.ndarray:
+    """
+    Calculate the volume of the droplet due to squeezing phase
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_disp`: volumetric flow rate of dispersed phase
+    `flow_gutter`: volumetric flow rate of gutter
+    """
+
+    height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter = _broadcast(
+        height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter
+    )
+
+    alpha = _calc_alpha(height, width, inlet_width, epsilon, flow_cont, flow_gutter)
+
+    return alpha * height * (width**2) * (flow_disp / flow_cont)
+
+
+# -------------------------------------------------------------------------------------
+def calc_nondim_squeeze_volume(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_disp: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+) -> np.ndarray:
+    """
+    Calculate the non-dimensionalized volume of the droplet due to squeezing
+    phase. Elements for which `height`, `width` or `inlet_width` is zero are NaN.
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_disp`: volumetric flow rate of dispersed phase
+    `flow_gutter`: volumetric flow rate of gutter
+    """
+
+    height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter = _broadcast(
+        height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter
+    )
+
+    return _nondimensionalize(
+        calc_squeezing_volume,
+        height,
+        width,
+        inlet_width,
+        (height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter),
+    )
+
+
+# -------------------------------------------------------------------------------------
+def calc_total_volume(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_disp: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+) -> np.ndarray:
+    """
+    Calculate the total volume of droplet/bubble
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_disp`: volumetric flow rate of dispersed phase
+    `flow_gutter`: volumetric flow rate of gutter
+    """
+
+    height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter = _broadcast(
+        height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter
+    )
+
+    fill_volume = calc_fill_volume(height, width, inlet_width)
+    squeeze_volume = calc_squeezing_volume(
+        height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter
+    )
+
+    return fill_volume + squeeze_volume
+
+
+# -------------------------------------------------------------------------------------
+def calc_nondim_total_volume(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_disp: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+) -> np.ndarray:
+    """
+    Calculate the non-dimensionalized total volume of droplet/bubble. Elements
+    for which `height`, `width` or `inlet_width` is zero are NaN.
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_disp`: volumetric flow rate of dispersed phase
+    `flow_gutter`: volumetric flow rate of gutter
+    """
+
+    nondim_fill_volume = calc_nondim_fill_volume(height, width, inlet_width)
+    nondim_squeeze_volume = calc_nondim_squeeze_volume(
+        height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter
+    )
+
+    return nondim_fill_volume + nondim_squeeze_volume
+
+
+# -------------------------------------------------------------------------------------
+def calc_predictions(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_disp: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+    dtype: npt.DTypeLike = np.float64,
+) -> dict[str, np.ndarray]:
+    """
+    Calculate the fill volume, squeezing coefficient, squeeze volume and total
+    volume together, evaluating each intermediate result once
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_disp`: volumetric flow rate of dispersed phase
+    `flow_gutter`: volumetric flow rate of gutter
+    `dtype`: `np.float64`, or `np.float32` to calculate and return results in
+    single precision
+    """
+
+    height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter = _broadcast(
+        height,
+        width,
+        inlet_width,
+        epsilon,
+        flow_cont,
+        flow_disp,
+        flow_gutter,
+        dtype=check_dtype(dtype),
+    )
+
+    fill_volume = calc_fill_volume(height, width, inlet_width)
+    alpha = _calc_alpha(height, width, inlet_width, epsilon, flow_cont, flow_gutter)
+    squeeze_volume = alpha * height * (width**2) * (flow_disp / flow_cont)
+
+    return {
+        "fill_volume": fill_volume,
+        "alpha": alpha,
+        "squeeze_volume": squeeze_volume,
+        "total_volume": fill_volume + squeeze_volume,
+    }
+
+
+# -------------------------------------------------------------------------------------
+def check_dtype(dtype: npt.DTypeLike) -> np.dtype:
+    """
+    Check that a calculation precision is single or double, returning it as a
+    NumPy dtype
+
+    Arguments:
+    `dtype`: `np.float32` or `np.float64`, or their names
+    """
+
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError(f"dtype must be float32 or float64, got {dtype}")
+
+    return dtype
+
+
+# -------------------------------------------------------------------------------------
+def calc_2r_trajectory(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+    times: npt.ArrayLike,
+) -> np.ndarray:
+    """
+    Calculate 2r (minimal distance between interface and junction) for many
+    designs over a whole time grid. Returns an array of shape
+    (number of designs, number of times).
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_gutter`: volumetric flow rate of gutter
+    `times`: 1-D grid of times since begin of squeezing phase
+    """
+
+    height, width, inlet_width, epsilon, flow_cont, flow_gutter = (
+        arg.ravel()[:, np.newaxis]
+        for arg in _broadcast(
+            height, width, inlet_width, epsilon, flow_cont, flow_gutter
+        )
+    )
+    times = np.asarray(times, dtype=float).ravel()[np.newaxis, :]
+
+    return _calc_2r(height, width, inlet_width, epsilon, flow_cont, flow_gutter, times)
+
+
+# -------------------------------------------------------------------------------------
+def calc_pinch_time(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+) -> np.ndarray:
+    """
+    Calculate the time since begin of squeezing phase at which 2r reaches the
+    pinch-off threshold, 2r/w = h/(h+w)
+
+    Setting 2r to the threshold and solving for R gives the pinching radius
+    (the other root is smaller than the fill radius, so it is never reached).
+    Substituting the pinching radius into the equation for R(t) gives
+    t = alpha * h * w^2 / Q_c.
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_gutter`: volumetric flow rate of gutter
+    """
+
+    height, width, inlet_width, epsilon, flow_cont, flow_gutter = _broadcast(
+        height, width, inlet_width, epsilon, flow_cont, flow_gutter
+    )
+
+    alpha = _calc_alpha(height, width, inlet_width, epsilon, flow_cont, flow_gutter)
+
+    return alpha * height * width**2 / flow_cont
+
+
+# -------------------------------------------------------------------------------------
+def _calc_alpha(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+) -> np.ndarray:
+    """
+    Calculate the sequeezing coefficient, alpha
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_gutter`: volumetric flow rate of gutter
+    """
+
+    height, width, inlet_width, epsilon, flow_cont, flow_gutter = _broadcast(
+        height, width, inlet_width, epsilon, flow_cont, flow_gutter
+    )
+
+    fill_radius = _calc_fill_radius(width, inlet_width)
+    pinch_radius = _calc_pinch_radius(height, width, inlet_width, epsilon)
+
+    const = 1 - (PI / 4)
+    flow_ratio = 1 - (flow_gutter / flow_cont)
+    geometries = (
+        ((pinch_radius / width) ** 2)
+        - ((fill_radius / width) ** 2)
+        + (PI / 4) * (height / width) * ((pinch_radius / width) - (fill_radius / width))
+    )
+
+    return const * geometries / flow_ratio
+
+
+# -------------------------------------------------------------------------------------
+def _calc_fill_radius(width: npt.ArrayLike, inlet_width: npt.ArrayLike) -> np.ndarray:
+    """
+    Calculate the fill radius, which is the greater of the two channel widths
+
+    Arguments:
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    """
+
+    return np.maximum(*_broadcast(width, inlet_width))
+
+
+# -------------------------------------------------------------------------------------
+def _calc_pinch_radius(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+) -> np.ndarray:
+    """
+    Calculate the pinching radius
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    """
+
+    height, width, inlet_width, epsilon = _broadcast(
+        height, width, inlet_width, epsilon
+    )
+
+    small_r_pinch = 0.5 * height * width / (height + width)
+    pinch_width = 2 * small_r_pinch - epsilon
+
+    return (
+        width
+        + inlet_width
+        - pinch_width
+        + np.sqrt(2 * (inlet_width - pinch_width) * (width - pinch_width))
+    )
+
+
+# -------------------------------------------------------------------------------------
+def _calc_radius(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+    time: npt.ArrayLike,
+) -> np.ndarray:
+    """
+    Calculate the radius (big R) as a function of time
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_gutter`: volumetric flow rate of gutter
+    `time`: time since begin of squeezing phase
+    """
+
+    height, width, inlet_width, flow_cont, flow_gutter, time = _broadcast(
+        height, width, inlet_width, flow_cont, flow_gutter, time
+    )
+
+    # Equation for R is a quadratic equation of the form
+    # R^2 + b*R + c = 0, with b > 0 and c <= 0
+
+    r_fill = _calc_fill_radius(width, inlet_width)
+
+    coeff_b = (PI * height) / 4
+    coeff_c = -1 * (
+        r_fill**2
+        + (coeff_b * r_fill)
+        + (
+            time
+            * (flow_cont / height)
+            * (1 - (flow_gutter / flow_cont))
+            / (1 - (PI / 4))
+        )
+    )
+
+    # Positive root written as -2c / (b + sqrt(b^2 - 4c)), which avoids the
+    # cancellation in -b + sqrt(b^2 - 4c) when |c| is small compared to b^2
+    return (-2 * coeff_c) / (coeff_b + np.sqrt((coeff_b**2) - 4 * coeff_c))
+
+
+# -------------------------------------------------------------------------------------
+def _calc_2r(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+    time: npt.ArrayLike,
+) -> np.ndarray:
+    """
+    Calculate the 2r (minimal distance between interface and junction)
+    as a function of time
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_gutter`: volumetric flow rate of gutter
+    `time`: time since begin of squeezing phase
+    """
+
+    height, width, inlet_width, epsilon, flow_cont, flow_gutter, time = _broadcast(
+        height, width, inlet_width, epsilon, flow_cont, flow_gutter, time
+    )
+
+    radius = _calc_radius(height, width, inlet_width, flow_cont, flow_gutter, time)
+
+    return (
+        radius - np.sqrt((radius - width) ** 2 + (radius - inlet_width) ** 2) + epsilon
+    )
+
+
+# -------------------------------------------------------------------------------------
+def _calc_narrow_fill_volume(height: np.ndarray, width: np.ndarray) -> np.ndarray:
+    """
+    Calculate the filling volume where `inlet_width <= width`
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    """
+
+    # Mid-plane area
+    area = _calc_circle_fraction_area(width, 0.25) + _calc_circle_fraction_area(
+        width / 2, 0.5
+    )
+
+    # Gutter length
+    quarter_circle_length = 0.25 * PI * 2 * width
+    half_circle_length = 0.5 * PI * width
+    gutter_length = quarter_circle_length + half_circle_length
+
+    return height * area - 2 * _calc_gutter_volume(height, gutter_length)
+
+
+# -------------------------------------------------------------------------------------
+def _calc_wide_fill_volume(
+    height: np.ndarray, width: np.ndarray, inlet_width: np.ndarray
+) -> np.ndarray:
+    """
+    Calculate the filling volume where `inlet_width > width`
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    """
+
+    # Mid-plane area and volume
+    right_triangle_area = (
+        0.5
+        * (inlet_width - width)
+        * (inlet_width**2 - (inlet_width - width) ** 2) ** 0.5
+    )
+    sector_area = (
+        (inlet_width**2) * 0.5 * np.arcsin((inlet_width - width) / inlet_width)
+    )
+
+    area_in_inlet = right_triangle_area + sector_area
+    quarter_circle_in_channel = (
+        _calc_circle_fraction_area(inlet_width, 0.25) - area_in_inlet
+    )
+    area = _calc_circle_fraction_area(width / 2, 0.5) + quarter_circle_in_channel
+
+    # Gutter length and volume
+    half_circle_length = 0.5 * PI * width
+    arc_length = inlet_width * ((PI / 2) - np.arcsin(1 - (width / inlet_width)))
+    gutter_length = half_circle_length + arc_length
+
+    return height * area - 2 * _calc_gutter_volume(height, gutter_length)
+
+
+# -------------------------------------------------------------------------------------
+def _calc_incorrect_wide_fill_volume(
+    height: np.ndarray, width: np.ndarray, inlet_width: np.ndarray
+) -> np.ndarray:
+    """
+    Calculate the incorrect filling volume where `inlet_width > width`
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    """
+
+    # First and second terms are correct
+    first_term = ((PI / 4) - 0.5 * np.arcsin(1 - (width / inlet_width))) * (
+        inlet_width / width
+    ) ** 2
+
+    second_term = (-0.5) * ((inlet_width / width) - 1) * (
+        2 * (inlet_width / width) - 1
+    ) ** 0.5 + (PI / 8)
+
+    # Third term is missing parentheses
+    third_term = (
+        (-0.5)
+        * (1 - (PI / 4))
+        * (
+            (PI / 2)
+            - np.arcsin(1 - (width / inlet_width)) * (inlet_width / width)
+            + (PI / 2)
+        )
+        * (height / width)
+    )
+
+    nondim_fill_volume = first_term + second_term + third_term
+
+    return nondim_fill_volume * (height * width**2)
+
+
+# -------------------------------------------------------------------------------------
+def _calc_circle_fraction_area(radius: np.ndarray, portion: float) -> np.ndarray:
+    """
+    Calculate a fraction of the area of a circle
+
+    Arguments:
+    `radius`: circle radius
+    `portion`: Portion of circle area as decimal
+    """
+
+    return portion * PI * radius**2
+
+
+# -------------------------------------------------------------------------------------
+def _calc_gutter_volume(height: np.ndarray, gutter_length: np.ndarray) -> np.ndarray:
+    """
+    Calculate the volume of an individual gutter
+
+    Arguments:
+    `height`: channel height
+    `gutter_length`: length of gutter (droplet perimeter)
+    """
+
+    corner_area = (height / 2) ** 2
+    droplet_area = 0.25 * PI * (height / 2) ** 2
+    gutter_area = corner_area - droplet_area
+
+    return gutter_area * gutter_length
+
+
+# -------------------------------------------------------------------------------------
+def _nondimensionalize(
+    volume_function: Callable[..., np.ndarray],
+    height: np.ndarray,
+    width: np.ndarray,
+    inlet_width: np.ndarray,
+    args: tuple,
+) -> np.ndarray:
+    """
+    Evaluate a volume function and divide by `height * width**2`, leaving NaN
+    wherever `height`, `width` or `inlet_width` is zero
+
+    Arguments:
+    `volume_function`: batch function returning a dimensional volume
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `args`: arguments passed to `volume_function`
+    """
+
+    valid = (height != 0) & (width != 0) & (inlet_width != 0)
+
+    nondim_volume = np.full_like(height, np.nan)
+    volume = volume_function(*(arg[valid] for arg in args))
+    nondim_volume[valid] = volume / (height[valid] * width[valid] ** 2)
+
+    return nondim_volume
+
+
+# -------------------------------------------------------------------------------------
+def _broadcast(
+    *args: npt.ArrayLike, dtype: Optional[npt.DTypeLike] = None
+) -> list[np.ndarray]:
+    """
+    Convert arguments to float arrays and broadcast them to a common shape
+
+    Arguments:
+    `args`: scalars or arrays to broadcast
+    `dtype`: float type of the arrays. By default, single precision if every
+    argument is a `float32` array, otherwise double precision.
+    """
+
+    arrays = [np.asarray(arg) for arg in args]
+    if dtype is None:
+        single = all(array.dtype == np.float32 for array in arrays)
+        dtype = np.float32 if single else np.float64
+
+    return np.broadcast_arrays(*(array.astype(dtype, copy=False) for array in arrays))
@@ -0,0 +1,403 @@
+"""
+Benchmark
+~~~
+Time model functions and keep a history of the timings of each commit.
+
+A `Benchmark` has a setup function, which is not timed, giving the arguments
+of the timed function. After one untimed call, each benchmark is called
+repeatedly until a run lasts at least `min_time`, and the best time per call
+over `repeat` runs is kept, as it is the least disturbed by other processes.
+
+Timings are appended to a history file in JSON Lines format, one record per
+run holding the commit, environment and timings. `compare()` then flags
+benchmarks which became slower than a baseline record by more than a
+threshold.
+
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import datetime
+import functools
+import json
+import platform
+import subprocess
+import time
+from typing import Any, Callable, Iterable, Mapping, NamedTuple, Optional
+
+import numpy as np
+
+from t_junction_model import batch, squeezing, total
+
+# pylint: disable=protected-access
+
+# Default numbers of points of batched benchmarks
+SIZES = (10**3, 10**4, 10**5, 10**6, 10**7)
+
+# Design used by scalar benchmarks, in SI units
+DESIGN = {
+    "height": 33 * 10**-6,
+    "width": 100 * 10**-6,
+    "inlet_width": 100 * 10**-6,
+    "epsilon": 10 * 10**-6,
+    "flow_cont": 3 * 10**-9,
+    "flow_disp": 6 * 10**-9,
+    "flow_gutter": 0.3 * 10**-9,
+}
+
+
+class Benchmark(NamedTuple):
+    """Function to time, and the untimed setup giving its arguments"""
+
+    name: str
+    setup: Callable[[], tuple]
+    function: Callable
+
+
+class Timing(NamedTuple):
+    """Times of a benchmark, in seconds per call"""
+
+    name: str
+    best: float
+    mean: float
+    calls: int  # Calls per run
+
+
+class Comparison(NamedTuple):
+    """Change of the best time of a benchmark from a baseline"""
+
+    name: str
+    baseline: float
+    current: float
+    ratio: float  # current / baseline
+    slower: bool  # Slower by more than the threshold
+
+
+# -------------------------------------------------------------------------------------
+def random_designs(n_designs: int, seed: int = 0) -> dict[str, np.ndarray]:
+    """
+    Random designs in SI units, with the inlet wider than the pinch width
+
+    Arguments:
+    `n_designs`: number of designs
+    `seed`: random seed
+    """
+
+    rng = np.random.default_rng(seed)
+
+    width = 10 ** rng.uniform(-6, -3, n_designs)
+    height = width * rng.uniform(0.05, 2.0, n_designs)
+    pinch_width = height * width / (height + width)
+    epsilon = pinch_width * rng.uniform(0, 0.9, n_designs)
+    inlet_width = np.maximum(
+        width * rng.uniform(0.1, 5.0, n_designs), pinch_width - epsilon + 0.01 * width
+    )
+    flow_cont = 10 ** rng.uniform(-13, -8, n_designs)
+
+    return {
+        "height": height,
+        "width": width,
+        "inlet_width": inlet_width,
+        "epsilon": epsilon,
+        "flow_cont": flow_cont,
+        "flow_disp": flow_cont * 10 ** rng.uniform(-2, 2, n_designs),
+        "flow_gutter": flow_cont * rng.uniform(0, 0.9, n_designs),
+    }
+
+
+# -------------------------------------------------------------------------------------
+def _total_volume_args(designs: Mapping[str, Any]) -> tuple:
+    """
+    Arguments of the total volume functions for designs
+
+    Arguments:
+    `designs`: value(s) of each model input
+    """
+
+    return tuple(designs[name] for name in batch.PARAMETERS)
+
+
+# -------------------------------------------------------------------------------------
+def _2r_args(designs: Mapping[str, Any]) -> tuple:
+    """
+    Arguments of the 2r functions for designs, half way through squeezing
+
+    Arguments:
+    `designs`: value(s) of each model input
+    """
+
+    args = tuple(designs[name] for name in batch.PARAMETERS if name != "flow_disp")
+    pinch_time = batch.calc_pinch_time(*args)
+
+    return args + (pinch_time / 2,)
+
+
+# -------------------------------------------------------------------------------------
+def _random_args(
+    make_args: Callable[[Mapping[str, Any]], tuple], n_designs: int
+) -> tuple:
+    """
+    Arguments of a batch function for random designs
+
+    Arguments:
+    `make_args`: function giving the arguments for designs
+    `n_designs`: number of designs
+    """
+
+    return make_args(random_designs(n_designs))
+
+
+# -------------------------------------------------------------------------------------
+def model_benchmarks(sizes: Iterable[int] = SIZES) -> list[Benchmark]:
+    """
+    Get benchmarks of the scalar and batched total volume and 2r functions,
+    with batches of each size of random designs
+
+    Arguments:
+    `sizes`: numbers of points of batched benchmarks
+    """
+
+    benchmarks = [
+        Benchmark(
+            "scalar/calc_total_volume",
+            lambda: _total_volume_args(DESIGN),
+            total.calc_total_volume,
+        ),
+        Benchmark(
+            "scalar/_calc_2r",
+            lambda: tuple(float(arg) for arg in _2r_args(DESIGN)),
+            squeezing._calc_2r,
+        ),
+    ]
+
+    for size in sizes:
+        benchmarks.extend(
+            [
+                Benchmark(
+                    f"batch/calc_total_volume/{size:.0e}",
+                    functools.partial(_random_args, _total_volume_args, size),
+                    batch.calc_total_volume,
+                ),
+                Benchmark(
+                    f"batch/_calc_2r/{size:.0e}",
+                    functools.partial(_random_args, _2r_args, size),
+                    batch._calc_2r,
+                ),
+            ]
+        )
+
+    return benchmarks
+
+
+# -------------------------------------------------------------------------------------
+def time_benchmark(
+    benchmark: Benchmark, repeat: int = 3, min_time: float = 0.2
+) -> Timing:
+    """
+    Time a benchmark, calling it enough times per run for each run to last at
+    least `min_time` seconds
+
+    Arguments:
+    `benchmark`: benchmark to time
+    `repeat`: number of runs
+    `min_time`: minimum seconds per run
+    """
+
+    if repeat < 1:
+        raise ValueError(f"repeat must be positive, got {repeat}")
+
+    args = benchmark.setup()
+
+    # The first call may import modules or fill caches, so it is not timed
+    benchmark.function(*args)
+
+    # Calls per run, doubled from one until a run is long enough
+    calls = 1
+    while True:
+        seconds = _time_calls(benchmark.function, args, calls)
+        if seconds >= min_time:
+            break
+        calls *= 2
+
+    times = [seconds] + [
+        _time_calls(benchmark.function, args, calls) for _ in range(repeat - 1)
+    ]
+
+    return Timing(
+        benchmark.name, min(times) / calls, sum(times) / len(times) / calls, calls
+    )
+
+
+# -------------------------------------------------------------------------------------
+def _time_calls(function: Callable, args: tuple, calls: int) -> float:
+    """
+    Get the seconds taken to call a function several times
+
+    Arguments:
+    `function`: function to call
+    `args`: arguments of each call
+    `calls`: number of calls
+    """
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        function(*args)
+
+    return time.perf_counter() - start
+
+
+# -------------------------------------------------------------------------------------
+def get_commit(directory: str = ".") -> tuple[Optional[str], bool]:
+    """
+    Get the current git commit of a directory, or `None` outside a repository,
+    and whether there are uncommitted changes
+
+    Arguments:
+    `directory`: directory within the repository
+    """
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=directory,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=directory,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+    return commit, bool(status.strip())
+
+
+# -------------------------------------------------------------------------------------
+def make_record(timings: Iterable[Timing], directory: str = ".") -> dict[str, Any]:
+    """
+    Make a history record of timings, with the commit and environment
+
+    Arguments:
+    `timings`: timings of a run
+    `directory`: directory within the repository being benchmarked
+    """
+
+    commit, dirty = get_commit(directory)
+
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "timings": {
+            timing.name: {
+                "best": timing.best,
+                "mean": timing.mean,
+                "calls": timing.calls,
+            }
+            for timing in timings
+        },
+    }
+
+
+# -------------------------------------------------------------------------------------
+def append_history(file: str, record: Mapping[str, Any]) -> None:
+    """
+    Append a record to a history file
+
+    Arguments:
+    `file`: JSON Lines history file, created if needed
+    `record`: record from `make_record()`
+    """
+
+    with open(file, "at", encoding="utf-8") as out:
+        out.write(json.dumps(record, sort_keys=True) + "\n")
+
+
+# -------------------------------------------------------------------------------------
+def read_history(file: str) -> list[dict[str, Any]]:
+    """
+    Read the records of a history file, oldest first
+
+    Arguments:
+    `file`: JSON Lines history file
+    """
+
+    with open(file, "rt", encoding="utf-8") as fh_in:
+        return [json.loads(line) for line in fh_in if line.strip()]
+
+
+# -------------------------------------------------------------------------------------
+def find_baseline(
+    history: list[dict[str, Any]], commit: Optional[str] = None
+) -> Optional[dict[str, Any]]:
+    """
+    Get the record to compare the latest record of a history with: the latest
+    record of a commit, or by default the record before the latest
+
+    Arguments:
+    `history`: records, oldest first
+    `commit`: commit hash, or a prefix of it
+    """
+
+    if commit is None:
+        return history[-2] if len(history) > 1 else None
+
+    for record in reversed(history[:-1]):
+        if (record.get("commit") or "").startswith(commit):
+            return record
+
+    return None
+
+
+# -------------------------------------------------------------------------------------
+def compare(
+    baseline: Mapping[str, Any], current: Mapping[str, Any], threshold: float = 0.1
+) -> list[Comparison]:
+    """
+    Compare the best times of the benchmarks in both of two records
+
+    Arguments:
+    `baseline`: earlier record
+    `current`: later record
+    `threshold`: relative slowdown beyond which a benchmark is flagged,
+    *e.g.* 0.1 for 10%
+    """
+
+    if threshold < 0:
+        raise ValueError(f"threshold must not be negative, got {threshold}")
+
+    comparisons = []
+    for name, timing in current["timings"].items():
+        if name not in baseline["timings"]:
+            continue
+
+        before = baseline["timings"][name]["best"]
+        ratio = timing["best"] / before
+        comparisons.append(
+            Comparison(name, before, timing["best"], ratio, ratio > 1 + threshold)
+        )
+
+    return comparisons
+
+
+# -------------------------------------------------------------------------------------
+def format_seconds(seconds: float) -> str:
+    """
+    Format a time in seconds with a unit suited to its size
+
+    Arguments:
+    `seconds`: time in seconds
+    """
+
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+
+    return f"{seconds / 1e-9:.3g} ns"
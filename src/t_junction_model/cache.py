@@ -0,0 +1,241 @@
+"""
+Cache
+~~~
+Optional memoization of the fill volume and squeezing coefficient.
+
+The model only depends on the dimensionless groups h/w, w_in/w, eps/w and
+Q_gutter/Q_cont (plus Q_disp/Q_cont for the squeezing volume), so inputs are
+reduced to these groups before lookup. Chips which are scaled copies of each
+other therefore share cache entries. Each cache has a bounded size with
+least-recently-used eviction, is safe to share between threads, and counts its
+hits, misses and evictions.
+
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, NamedTuple
+
+from t_junction_model import filling
+from t_junction_model import squeezing
+
+# pylint: disable=protected-access
+
+
+class CacheStats(NamedTuple):
+    """Cache usage counters"""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+# -------------------------------------------------------------------------------------
+class DimensionlessCache:
+    """Thread-safe LRU cache of model values keyed on dimensionless groups"""
+
+    def __init__(self, maxsize: int = 1024, digits: int = 12) -> None:
+        """
+        Create an empty cache
+
+        Arguments:
+        `maxsize`: maximum number of entries kept
+        `digits`: significant digits of each dimensionless group used in keys
+        """
+
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.maxsize = maxsize
+        self.digits = digits
+        self._entries: OrderedDict[Hashable, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def make_key(self, name: str, *groups: float) -> tuple:
+        """
+        Round dimensionless groups so that scaled copies give the same key
+
+        Arguments:
+        `name`: name of the cached quantity
+        `groups`: dimensionless groups the quantity depends on
+        """
+
+        return (name, *(float(f"{group:.{self.digits}g}") for group in groups))
+
+    def get(self, key: Hashable, compute: Callable[[], float]) -> float:
+        """
+        Look up `key`, calling `compute` and storing its result on a miss
+
+        Arguments:
+        `key`: cache key
+        `compute`: function giving the value for `key`
+        """
+
+        with self._lock:
+            if key in self._entries:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self._misses += 1
+
+        # Compute outside of the lock, so other threads are not held up
+        value = compute()
+
+        with self._lock:
+            # Another thread may have stored the key meanwhile, keep its value
+            if key in self._entries:
+                self._misses -= 1
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+        return value
+
+    def stats(self) -> CacheStats:
+        """Get the hit, miss and eviction counts"""
+
+        with self._lock:
+            return CacheStats(
+                self._hits,
+                self._misses,
+                self._evictions,
+                len(self._entries),
+                self.maxsize,
+            )
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters"""
+
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+
+DEFAULT_CACHE = DimensionlessCache()
+
+
+# -------------------------------------------------------------------------------------
+def calc_fill_volume(
+    height: float,
+    width: float,
+    inlet_width: float,
+    cache: DimensionlessCache = DEFAULT_CACHE,
+) -> float:
+    """
+    Calculate the filling volume, reusing the volume per width cubed of
+    geometries with the same h/w and w_in/w
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `cache`: cache to use
+    """
+
+    if width == 0:
+        return filling.calc_fill_volume(height, width, inlet_width)
+
+    key = cache.make_key("fill_volume", height / width, inlet_width / width)
+    _, height_ratio, inlet_ratio = key
+
+    # Fill volume of the geometry scaled to unit width
+    unit_fill_volume = cache.get(
+        key, lambda: filling.calc_fill_volume(height_ratio, 1.0, inlet_ratio)
+    )
+
+    return unit_fill_volume * width**3
+
+
+# -------------------------------------------------------------------------------------
+def calc_alpha(
+    height: float,
+    width: float,
+    inlet_width: float,
+    epsilon: float,
+    flow_cont: float,
+    flow_gutter: float,
+    cache: DimensionlessCache = DEFAULT_CACHE,
+) -> float:
+    """
+    Calculate the sequeezing coefficient, alpha, reusing the value for
+    geometries with the same h/w, w_in/w, eps/w and Q_gutter/Q_cont
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_gutter`: volumetric flow rate of gutter
+    `cache`: cache to use
+    """
+
+    if 0 in [width, flow_cont]:
+        return squeezing._calc_alpha(
+            height, width, inlet_width, epsilon, flow_cont, flow_gutter
+        )
+
+    key = cache.make_key(
+        "alpha",
+        height / width,
+        inlet_width / width,
+        epsilon / width,
+        flow_gutter / flow_cont,
+    )
+    _, height_ratio, inlet_ratio, epsilon_ratio, gutter_ratio = key
+
+    return cache.get(
+        key,
+        lambda: squeezing._calc_alpha(
+            height_ratio, 1.0, inlet_ratio, epsilon_ratio, 1.0, gutter_ratio
+        ),
+    )
+
+
+# -------------------------------------------------------------------------------------
+def calc_total_volume(
+    height: float,
+    width: float,
+    inlet_width: float,
+    epsilon: float,
+    flow_cont: float,
+    flow_disp: float,
+    flow_gutter: float,
+    cache: DimensionlessCache = DEFAULT_CACHE,
+) -> float:
+    """
+    Calculate the total volume of droplet/bubble from the cached fill volume
+    and squeezing coefficient
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_disp`: volumetric flow rate of dispersed phase
+    `flow_gutter`: volumetric flow rate of gutter
+    `cache`: cache to use
+    """
+
+    fill_volume = calc_fill_volume(height, width, inlet_width, cache)
+    alpha = calc_alpha(
+        height, width, inlet_width, epsilon, flow_cont, flow_gutter, cache
+    )
+    squeeze_volume = alpha * height * (width**2) * (flow_disp / flow_cont)
+
+    return fill_volume + squeeze_volume
@@ -0,0 +1,284 @@
+"""
+Disk Cache
+~~~
+Persistent cache of results, such as figure datasets, in an SQLite file.
+
+Each entry is stored under a key hashed from its name, its input parameters
+and a fingerprint of the source code of the modules that define the model's
+predictions. Any change to the model code therefore gives new keys, and
+entries computed with older code are never returned, while edits to other
+modules keep the cache valid. Stale entries stay in the file until they are
+pruned or evicted. The cache has a size limit on the stored values, and
+the least recently used entries are evicted when it is exceeded. The file uses
+incremental auto-vacuum, so the pages freed by pruning are returned to the
+file system, and the file stays close to the size of the values it holds.
+
+Values are stored pickled, so a cache file should only be shared between
+trusted users, like any other pickle.
+
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import functools
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+from typing import Any, Callable, Mapping, NamedTuple, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Directory of the package whose source is fingerprinted
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules defining the predictions, edits to other modules keep the cache valid
+MODEL_MODULES = ("batch.py", "filling.py", "squeezing.py", "total.py")
+
+
+class CacheEntry(NamedTuple):
+    """Description of one stored entry"""
+
+    key: str
+    name: str
+    size: int
+    created: float
+    accessed: float
+    stale: bool  # Computed with different model code
+
+
+class CacheInfo(NamedTuple):
+    """Summary of a cache file"""
+
+    path: str
+    n_entries: int
+    n_stale: int
+    size: int
+    max_size: int
+    fingerprint: str
+
+
+# -------------------------------------------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def source_fingerprint(
+    package_dir: str = PACKAGE_DIR, modules: tuple[str, ...] = MODEL_MODULES
+) -> str:
+    """
+    Get a SHA-256 hash of the names and contents of some Python files of a
+    package
+
+    Arguments:
+    `package_dir`: package directory
+    `modules`: file names of the modules to hash
+    """
+
+    digest = hashlib.sha256()
+    for file_name in sorted(modules):
+        digest.update(file_name.encode())
+        with open(os.path.join(package_dir, file_name), "rb") as source:
+            digest.update(hashlib.sha256(source.read()).digest())
+
+    return digest.hexdigest()
+
+
+# -------------------------------------------------------------------------------------
+class DiskCache:
+    """Size-limited, persistent cache keyed on parameters and model source"""
+
+    def __init__(
+        self,
+        path: str,
+        max_size: int = 256 * 1024**2,
+        fingerprint: Optional[str] = None,
+    ) -> None:
+        """
+        Open a cache file, creating it if needed
+
+        Arguments:
+        `path`: SQLite file
+        `max_size`: maximum total size of the stored (pickled) values, in
+        bytes. The file is slightly larger, for the keys and SQLite's own pages
+        `fingerprint`: fingerprint of the model code, `source_fingerprint()`
+        by default
+        """
+
+        if max_size < 0:
+            raise ValueError(f"max_size must not be negative, got {max_size}")
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_size = max_size
+        self.fingerprint = fingerprint or source_fingerprint()
+        self.hits = 0
+        self.misses = 0
+
+        self._connection = sqlite3.connect(path, timeout=30)
+
+        # Only takes effect on a new file, older files are converted by VACUUM
+        self._connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, name TEXT, fingerprint TEXT, value BLOB,"
+                " size INTEGER, created REAL, accessed REAL)"
+            )
+
+        if self._connection.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            self._connection.execute("VACUUM")
+
+    def make_key(self, name: str, params: Mapping[str, Any]) -> str:
+        """
+        Hash a name, JSON-serializable parameters and the model fingerprint
+
+        Arguments:
+        `name`: name of the cached result
+        `params`: inputs the result depends on
+        """
+
+        text = json.dumps(
+            {"name": name, "params": params, "fingerprint": self.fingerprint},
+            sort_keys=True,
+        )
+
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get_or_compute(
+        self, name: str, params: Mapping[str, Any], compute: Callable[[], T]
+    ) -> T:
+        """
+        Look up a result, calling `compute` and storing its result on a miss
+
+        Arguments:
+        `name`: name of the cached result
+        `params`: JSON-serializable inputs the result depends on
+        `compute`: function giving the result
+        """
+
+        key = self.make_key(name, params)
+        row = self._connection.execute(
+            "SELECT value FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is not None:
+            self.hits += 1
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key)
+                )
+            return pickle.loads(row[0])
+
+        self.misses += 1
+        value = compute()
+        self.put(key, name, value)
+
+        return value
+
+    def put(self, key: str, name: str, value: Any) -> None:
+        """
+        Store a value, then evict entries until the cache fits its size limit.
+        Values larger than the limit are not stored.
+
+        Arguments:
+        `key`: key from `make_key()`
+        `name`: name of the result
+        `value`: value to store, which must be picklable
+        """
+
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_size:
+            return
+
+        now = time.time()
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, name, self.fingerprint, blob, len(blob), now, now),
+            )
+
+        self.prune(stale=False, max_size=self.max_size)
+
+    def entries(self) -> list[CacheEntry]:
+        """Get the stored entries, most recently used first"""
+
+        rows = self._connection.execute(
+            "SELECT key, name, size, created, accessed, fingerprint != ?"
+            " FROM entries ORDER BY accessed DESC",
+            (self.fingerprint,),
+        ).fetchall()
+
+        return [
+            CacheEntry(key, name, size, created, accessed, bool(stale))
+            for key, name, size, created, accessed, stale in rows
+        ]
+
+    def info(self) -> CacheInfo:
+        """Get the number and total size of the stored entries"""
+
+        n_entries, n_stale, size = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(fingerprint != ?), 0),"
+            " COALESCE(SUM(size), 0) FROM entries",
+            (self.fingerprint,),
+        ).fetchone()
+
+        return CacheInfo(
+            self.path, n_entries, n_stale, size, self.max_size, self.fingerprint
+        )
+
+    def prune(self, stale: bool = True, max_size: Optional[int] = None) -> int:
+        """
+        Remove entries and give their space back to the file system,
+        returning the number removed
+
+        Arguments:
+        `stale`: remove the entries computed with different model code
+        `max_size`: then remove the least recently used entries until the total
+        size is at most this many bytes
+        """
+
+        n_removed = 0
+        with self._connection:
+            if stale:
+                n_removed += self._connection.execute(
+                    "DELETE FROM entries WHERE fingerprint != ?", (self.fingerprint,)
+                ).rowcount
+
+            if max_size is not None:
+                total = 0
+                evicted = []
+                for key, size in self._connection.execute(
+                    "SELECT key, size FROM entries ORDER BY accessed DESC, created DESC"
+                ).fetchall():
+                    total += size
+                    if total > max_size:
+                        evicted.append((key,))
+
+                self._connection.executemany(
+                    "DELETE FROM entries WHERE key = ?", evicted
+                )
+                n_removed += len(evicted)
+
+        if n_removed:
+            # Through execute() the pragma frees no pages, as a script it does
+            self._connection.executescript("PRAGMA incremental_vacuum;")
+
+        return n_removed
+
+    def clear(self) -> int:
+        """Remove all entries, returning the number removed"""
+
+        with self._connection:
+            n_removed = self._connection.execute("DELETE FROM entries").rowcount
+            self.hits = 0
+            self.misses = 0
+
+        self._connection.execute("VACUUM")
+
+        return n_removed
+
+    def close(self) -> None:
+        """Close the cache file"""
+
+        self._connection.close()
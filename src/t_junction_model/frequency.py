@@ -0,0 +1,160 @@
+"""
+Frequency
+~~~
+Droplet/bubble generation frequency and cycle times.
+
+Each cycle has a filling phase, during which the dispersed phase fills the fill
+volume, and a squeezing phase, which lasts until 2r reaches the pinch-off
+threshold. The dispersed phase flows in at Q_d throughout, so
+
+* fill time = V_fill / Q_d
+* squeeze time = alpha * h * w^2 / Q_c (see `batch.calc_pinch_time()`)
+* period = fill time + squeeze time = V_total / Q_d
+* frequency = 1 / period
+
+The squeeze time does not depend on Q_d, so the frequency approaches
+1 / squeeze time as Q_d grows, and no higher frequency can be reached. All
+arguments are broadcast against each other following NumPy rules.
+
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+from t_junction_model import batch
+from t_junction_model.inverse import InverseSolution
+
+# pylint: disable=protected-access
+
+
+class Timing(NamedTuple):
+    """Times of each phase of a cycle and the generation frequency"""
+
+    fill_time: np.ndarray
+    squeeze_time: np.ndarray
+    period: np.ndarray
+    frequency: np.ndarray
+
+
+# -------------------------------------------------------------------------------------
+def calc_timing(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_disp: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+) -> Timing:
+    """
+    Calculate the fill time, squeeze time, period and frequency of droplet/bubble
+    generation. Where `flow_disp` is zero, times are infinite and the frequency
+    is zero.
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_disp`: volumetric flow rate of dispersed phase
+    `flow_gutter`: volumetric flow rate of gutter
+    """
+
+    (
+        height,
+        width,
+        inlet_width,
+        epsilon,
+        flow_cont,
+        flow_disp,
+        flow_gutter,
+    ) = batch._broadcast(
+        height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter
+    )
+
+    fill_volume = batch.calc_fill_volume(height, width, inlet_width)
+    squeeze_time = batch.calc_pinch_time(
+        height, width, inlet_width, epsilon, flow_cont, flow_gutter
+    )
+
+    with np.errstate(divide="ignore"):
+        fill_time = fill_volume / flow_disp
+        period = fill_time + squeeze_time
+
+        return Timing(fill_time, squeeze_time, period, 1 / period)
+
+
+# -------------------------------------------------------------------------------------
+def calc_max_frequency(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+) -> np.ndarray:
+    """
+    Calculate the frequency approached as the dispersed phase flow rate grows,
+    1 / squeeze time
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_gutter`: volumetric flow rate of gutter
+    """
+
+    squeeze_time = batch.calc_pinch_time(
+        height, width, inlet_width, epsilon, flow_cont, flow_gutter
+    )
+
+    with np.errstate(divide="ignore"):
+        return 1 / squeeze_time
+
+
+# -------------------------------------------------------------------------------------
+def calc_flow_disp(
+    target_frequency: npt.ArrayLike,
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+) -> InverseSolution:
+    """
+    Calculate the dispersed phase flow rate which gives the target frequency.
+    Solving f = Q_d / (V_fill + Q_d * t_squeeze) for Q_d gives
+    Q_d = f * V_fill / (1 - f * t_squeeze), so targets at or above
+    `calc_max_frequency()` cannot be reached.
+
+    Arguments:
+    `target_frequency`: target droplets/bubbles per unit time
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_gutter`: volumetric flow rate of gutter
+    """
+
+    target_frequency = np.asarray(target_frequency, dtype=float)
+    fill_volume = batch.calc_fill_volume(height, width, inlet_width)
+    squeeze_time = batch.calc_pinch_time(
+        height, width, inlet_width, epsilon, flow_cont, flow_gutter
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        flow_disp = (
+            target_frequency * fill_volume / (1 - target_frequency * squeeze_time)
+        )
+
+    reached = np.isfinite(flow_disp) & (flow_disp >= 0)
+
+    return InverseSolution(np.where(reached, flow_disp, np.nan), reached)
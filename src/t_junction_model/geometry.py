@@ -0,0 +1,185 @@
+"""
+Geometry
+~~~
+Precompiled T-junction geometry. The fill volume, fill radius, pinch width and
+pinch radius depend only on the channel dimensions, so they are computed once
+when the geometry is created. Sweeping the flow rates on a fixed chip then only
+costs the final few operations per point.
+
+Flow rates passed to the methods may be floats or NumPy arrays.
+
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+from math import pi as PI
+from typing import Optional, Union
+
+import numpy as np
+
+from t_junction_model import filling
+from t_junction_model import squeezing
+
+# pylint: disable=protected-access
+
+# Flow rates may be given as floats or arrays
+Flow = Union[float, np.ndarray]
+
+
+# -------------------------------------------------------------------------------------
+class TJunctionGeometry:  # pylint: disable=too-many-instance-attributes
+    """
+    T-junction channel geometry with flow-independent terms precomputed. The
+    dimensions are read-only, so the precomputed terms cannot go stale; create
+    a new geometry to change them.
+    """
+
+    __slots__ = (
+        "_height",
+        "_width",
+        "_inlet_width",
+        "_epsilon",
+        "fill_volume",
+        "fill_radius",
+        "pinch_width",
+        "pinch_radius",
+        "_alpha_numerator",
+    )
+
+    def __init__(
+        self, height: float, width: float, inlet_width: float, epsilon: float
+    ) -> None:
+        """
+        Compute the flow-independent terms of the model
+
+        Arguments:
+        `height`: channel height
+        `width`: channel width
+        `inlet_width`: inlet channel width
+        `epsilon`: corner roundness
+        """
+
+        self._height = height
+        self._width = width
+        self._inlet_width = inlet_width
+        self._epsilon = epsilon
+
+        self.fill_volume = filling.calc_fill_volume(height, width, inlet_width)
+        self.fill_radius = squeezing._calc_fill_radius(width, inlet_width)
+        self.pinch_width = squeezing._calc_pinch_width(height, width, epsilon)
+        self.pinch_radius = squeezing._calc_pinch_radius(
+            height, width, inlet_width, epsilon
+        )
+
+        # Same expression as squeezing._calc_alpha(), without the flow ratio
+        geometries = (
+            ((self.pinch_radius / width) ** 2)
+            - ((self.fill_radius / width) ** 2)
+            + (PI / 4)
+            * (height / width)
+            * ((self.pinch_radius / width) - (self.fill_radius / width))
+        )
+        self._alpha_numerator = (1 - (PI / 4)) * geometries
+
+    @property
+    def height(self) -> float:
+        """Channel height"""
+
+        return self._height
+
+    @property
+    def width(self) -> float:
+        """Channel width"""
+
+        return self._width
+
+    @property
+    def inlet_width(self) -> float:
+        """Inlet channel width"""
+
+        return self._inlet_width
+
+    @property
+    def epsilon(self) -> float:
+        """Corner roundness"""
+
+        return self._epsilon
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(height={self.height!r}, width={self.width!r}, "
+            f"inlet_width={self.inlet_width!r}, epsilon={self.epsilon!r})"
+        )
+
+    def calc_alpha(self, flow_cont: Flow, flow_gutter: Flow) -> Flow:
+        """
+        Calculate the sequeezing coefficient, alpha
+
+        Arguments:
+        `flow_cont`: volumetric flow rate of continuous phase
+        `flow_gutter`: volumetric flow rate of gutter
+        """
+
+        flow_ratio = 1 - (flow_gutter / flow_cont)
+
+        return self._alpha_numerator / flow_ratio
+
+    def calc_squeezing_volume(
+        self,
+        flow_cont: Flow,
+        flow_disp: Flow,
+        flow_gutter: Flow,
+    ) -> Flow:
+        """
+        Calculate the volume of the droplet due to squeezing phase
+
+        Arguments:
+        `flow_cont`: volumetric flow rate of continuous phase
+        `flow_disp`: volumetric flow rate of dispersed phase
+        `flow_gutter`: volumetric flow rate of gutter
+        """
+
+        alpha = self.calc_alpha(flow_cont, flow_gutter)
+
+        return alpha * self.height * (self.width**2) * (flow_disp / flow_cont)
+
+    def calc_total_volume(
+        self,
+        flow_cont: Flow,
+        flow_disp: Flow,
+        flow_gutter: Flow,
+    ) -> Flow:
+        """
+        Calculate the total volume of droplet/bubble
+
+        Arguments:
+        `flow_cont`: volumetric flow rate of continuous phase
+        `flow_disp`: volumetric flow rate of dispersed phase
+        `flow_gutter`: volumetric flow rate of gutter
+        """
+
+        squeeze_volume = self.calc_squeezing_volume(flow_cont, flow_disp, flow_gutter)
+
+        return self.fill_volume + squeeze_volume
+
+    def calc_nondim_total_volume(
+        self,
+        flow_cont: Flow,
+        flow_disp: Flow,
+        flow_gutter: Flow,
+    ) -> Optional[Flow]:
+        """
+        Calculate the non-dimensionalized total volume of droplet/bubble
+
+        Arguments:
+        `flow_cont`: volumetric flow rate of continuous phase
+        `flow_disp`: volumetric flow rate of dispersed phase
+        `flow_gutter`: volumetric flow rate of gutter
+        """
+
+        if 0 in [self.height, self.width, self.inlet_width]:
+            return None
+
+        scale = self.height * (self.width**2)
+        squeeze_volume = self.calc_squeezing_volume(flow_cont, flow_disp, flow_gutter)
+
+        return (self.fill_volume / scale) + (squeeze_volume / scale)
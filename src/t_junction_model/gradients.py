@@ -0,0 +1,427 @@
+"""
+Gradients
+~~~
+Values of the model together with their analytic partial derivatives.
+
+Each function evaluates a model output as the batch module does and, in the
+same pass, its partial derivative with respect to each input, by the chain rule
+through the same intermediate results. All arguments are broadcast against each
+other following NumPy rules.
+
+The fill volume changes formula where `inlet_width == width`, so it has a kink
+there. At that point the derivatives of the `inlet_width <= width` formula are
+returned, as that is the formula used for the value. The derivative of
+`arcsin(x)` is `1 / sqrt(1 - x**2)`, and in the wide filling formula
+`sqrt(1 - x**2)` reduces to `sqrt(width * (2 * inlet_width - width)) /
+inlet_width`, which is not zero for any `inlet_width > width > 0`. The square
+root in the pinching radius has an infinite derivative where its argument is
+zero, which only happens for degenerate geometries (pinch width equal to a
+channel width). There, its derivatives are NaN.
+
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+from math import pi as PI
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+from t_junction_model import batch
+
+# pylint: disable=protected-access
+
+PARAMETERS = batch.PARAMETERS
+GUTTER = batch.GUTTER
+
+
+class Gradient(NamedTuple):
+    """Value of a model output and its partial derivatives"""
+
+    value: np.ndarray
+    partials: dict[str, np.ndarray]
+
+    def jacobian(self) -> np.ndarray:
+        """
+        Get the partial derivatives stacked along a new last axis, in the order
+        of `partials`
+        """
+
+        return np.stack(list(self.partials.values()), axis=-1)
+
+
+# -------------------------------------------------------------------------------------
+def calc_fill_volume_gradient(
+    height: npt.ArrayLike, width: npt.ArrayLike, inlet_width: npt.ArrayLike
+) -> Gradient:
+    """
+    Calculate the filling volume and its derivatives with respect to `height`,
+    `width` and `inlet_width`
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    """
+
+    height, width, inlet_width = batch._broadcast(height, width, inlet_width)
+
+    value, d_height, d_width, d_inlet_width = (np.empty_like(height) for _ in range(4))
+    narrow = inlet_width <= width
+    wide = ~narrow
+
+    # Narrow formula, 3/8 pi h w^2 - 2 GUTTER h^2 pi w
+    h_narrow, w_narrow = height[narrow], width[narrow]
+    value[narrow] = (
+        3 / 8 * PI * h_narrow * w_narrow**2
+        - 2 * GUTTER * PI * h_narrow**2 * w_narrow
+    )
+    d_height[narrow] = (
+        3 / 8 * PI * w_narrow**2 - 4 * GUTTER * PI * h_narrow * w_narrow
+    )
+    d_width[narrow] = 3 / 4 * PI * h_narrow * w_narrow - 2 * GUTTER * PI * h_narrow**2
+    d_inlet_width[narrow] = 0.0
+
+    wide_gradient = _wide_fill_volume_gradient(
+        height[wide], width[wide], inlet_width[wide]
+    )
+    value[wide] = wide_gradient.value
+    d_height[wide] = wide_gradient.partials["height"]
+    d_width[wide] = wide_gradient.partials["width"]
+    d_inlet_width[wide] = wide_gradient.partials["inlet_width"]
+
+    return Gradient(
+        value, {"height": d_height, "width": d_width, "inlet_width": d_inlet_width}
+    )
+
+
+# -------------------------------------------------------------------------------------
+def calc_alpha_gradient(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+) -> Gradient:
+    """
+    Calculate the squeezing coefficient, alpha, and its derivatives with
+    respect to each argument
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_gutter`: volumetric flow rate of gutter
+    """
+
+    height, width, inlet_width, epsilon, flow_cont, flow_gutter = batch._broadcast(
+        height, width, inlet_width, epsilon, flow_cont, flow_gutter
+    )
+
+    # Fill radius, max(width, inlet_width), takes the width at a tie
+    fill_radius = batch._calc_fill_radius(width, inlet_width)
+    d_fill = {
+        "height": np.zeros_like(height),
+        "width": np.where(inlet_width > width, 0.0, 1.0),
+        "inlet_width": np.where(inlet_width > width, 1.0, 0.0),
+        "epsilon": np.zeros_like(height),
+    }
+
+    pinch = _pinch_radius_gradient(height, width, inlet_width, epsilon)
+
+    # alpha = (1 - pi/4) * numerator / width^2 / flow_ratio, where
+    # numerator = Rp^2 - Rf^2 + pi/4 * h * (Rp - Rf)
+    numerator = (
+        pinch.value**2
+        - fill_radius**2
+        + (PI / 4) * height * (pinch.value - fill_radius)
+    )
+    flow_ratio = 1 - (flow_gutter / flow_cont)
+    value = (1 - PI / 4) * numerator / width**2 / flow_ratio
+
+    partials = {}
+    for name in ["height", "width", "inlet_width", "epsilon"]:
+        d_numerator = (
+            2 * pinch.value * pinch.partials[name]
+            - 2 * fill_radius * d_fill[name]
+            + (PI / 4) * height * (pinch.partials[name] - d_fill[name])
+        )
+        if name == "height":
+            d_numerator += (PI / 4) * (pinch.value - fill_radius)
+
+        partials[name] = (1 - PI / 4) * d_numerator / width**2 / flow_ratio
+
+    partials["width"] -= 2 * value / width
+    partials["flow_cont"] = -value / flow_ratio * flow_gutter / flow_cont**2
+    partials["flow_gutter"] = value / flow_ratio / flow_cont
+
+    return Gradient(value, partials)
+
+
+# -------------------------------------------------------------------------------------
+def calc_squeezing_volume_gradient(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_disp: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+) -> Gradient:
+    """
+    Calculate the squeezing volume and its derivatives with respect to each
+    argument
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_disp`: volumetric flow rate of dispersed phase
+    `flow_gutter`: volumetric flow rate of gutter
+    """
+
+    (
+        height,
+        width,
+        inlet_width,
+        epsilon,
+        flow_cont,
+        flow_disp,
+        flow_gutter,
+    ) = batch._broadcast(
+        height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter
+    )
+
+    alpha = calc_alpha_gradient(
+        height, width, inlet_width, epsilon, flow_cont, flow_gutter
+    )
+
+    return _squeezing_volume_gradient(alpha, height, width, flow_cont, flow_disp)
+
+
+# -------------------------------------------------------------------------------------
+def calc_total_volume_gradient(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_disp: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+) -> Gradient:
+    """
+    Calculate the total volume of droplet/bubble and its derivatives with
+    respect to each argument
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_disp`: volumetric flow rate of dispersed phase
+    `flow_gutter`: volumetric flow rate of gutter
+    """
+
+    return calc_jacobian(
+        height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter
+    )["total_volume"]
+
+
+# -------------------------------------------------------------------------------------
+def calc_jacobian(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_disp: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+) -> dict[str, Gradient]:
+    """
+    Calculate the fill volume, squeezing coefficient, squeeze volume and total
+    volume, each with its derivatives with respect to all seven inputs (zero
+    for inputs it does not depend on)
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_disp`: volumetric flow rate of dispersed phase
+    `flow_gutter`: volumetric flow rate of gutter
+    """
+
+    (
+        height,
+        width,
+        inlet_width,
+        epsilon,
+        flow_cont,
+        flow_disp,
+        flow_gutter,
+    ) = batch._broadcast(
+        height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter
+    )
+    zeros = np.zeros_like(height)
+
+    fill = calc_fill_volume_gradient(height, width, inlet_width)
+    alpha = calc_alpha_gradient(
+        height, width, inlet_width, epsilon, flow_cont, flow_gutter
+    )
+    squeeze = _squeezing_volume_gradient(alpha, height, width, flow_cont, flow_disp)
+
+    return {
+        "fill_volume": Gradient(
+            fill.value,
+            {name: fill.partials.get(name, zeros) for name in PARAMETERS},
+        ),
+        "alpha": Gradient(
+            alpha.value,
+            {name: alpha.partials.get(name, zeros) for name in PARAMETERS},
+        ),
+        "squeeze_volume": squeeze,
+        "total_volume": Gradient(
+            fill.value + squeeze.value,
+            {
+                name: fill.partials.get(name, zeros) + squeeze.partials[name]
+                for name in PARAMETERS
+            },
+        ),
+    }
+
+
+# -------------------------------------------------------------------------------------
+def _squeezing_volume_gradient(
+    alpha: Gradient,
+    height: np.ndarray,
+    width: np.ndarray,
+    flow_cont: np.ndarray,
+    flow_disp: np.ndarray,
+) -> Gradient:
+    """
+    Calculate the squeezing volume and its derivatives with respect to all
+    seven inputs from the squeezing coefficient and its derivatives
+
+    Arguments:
+    `alpha`: squeezing coefficient and its derivatives
+    `height`: channel height
+    `width`: channel width
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_disp`: volumetric flow rate of dispersed phase
+    """
+
+    # Squeeze volume = alpha * scale, with scale = h * w^2 * Q_disp / Q_cont
+    scale = height * (width**2) * (flow_disp / flow_cont)
+    partials = {name: alpha.partials[name] * scale for name in alpha.partials}
+    partials["height"] += alpha.value * (width**2) * (flow_disp / flow_cont)
+    partials["width"] += alpha.value * 2 * height * width * (flow_disp / flow_cont)
+    partials["flow_cont"] -= alpha.value * scale / flow_cont
+    partials["flow_disp"] = alpha.value * height * (width**2) / flow_cont
+
+    return Gradient(alpha.value * scale, {name: partials[name] for name in PARAMETERS})
+
+
+# -------------------------------------------------------------------------------------
+def _wide_fill_volume_gradient(
+    height: np.ndarray, width: np.ndarray, inlet_width: np.ndarray
+) -> Gradient:
+    """
+    Calculate the filling volume where `inlet_width > width`, and its
+    derivatives with respect to `height`, `width` and `inlet_width`
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    """
+
+    diff = inlet_width - width
+    asin = np.arcsin(diff / inlet_width)
+
+    # sqrt(inlet_width^2 - diff^2), which is also inlet_width times the
+    # sqrt(1 - x^2) in the derivative of arcsin(x = diff / inlet_width)
+    root = np.sqrt(width * (2 * inlet_width - width))
+
+    # Mid-plane area = pi w^2 / 8 + pi w_in^2 / 4 - triangle - sector
+    area = (
+        PI * width**2 / 8
+        + PI * inlet_width**2 / 4
+        - 0.5 * diff * root
+        - 0.5 * inlet_width**2 * asin
+    )
+    d_area_width = (
+        PI * width / 4 - 0.5 * (diff**2 / root - root) + 0.5 * inlet_width**2 / root
+    )
+    d_area_inlet = (
+        PI * inlet_width / 2
+        - 0.5 * (root + diff * width / root)
+        - inlet_width * asin
+        - 0.5 * inlet_width * width / root
+    )
+
+    # Gutter length = pi w / 2 + w_in * (pi / 2 - arcsin(1 - w / w_in))
+    length = PI * width / 2 + inlet_width * (PI / 2 - asin)
+    d_length_width = PI / 2 + inlet_width / root
+    d_length_inlet = PI / 2 - asin - width / root
+
+    return Gradient(
+        height * area - 2 * GUTTER * height**2 * length,
+        {
+            "height": area - 4 * GUTTER * height * length,
+            "width": height * d_area_width - 2 * GUTTER * height**2 * d_length_width,
+            "inlet_width": height * d_area_inlet
+            - 2 * GUTTER * height**2 * d_length_inlet,
+        },
+    )
+
+
+# -------------------------------------------------------------------------------------
+def _pinch_radius_gradient(
+    height: np.ndarray, width: np.ndarray, inlet_width: np.ndarray, epsilon: np.ndarray
+) -> Gradient:
+    """
+    Calculate the pinching radius and its derivatives with respect to
+    `height`, `width`, `inlet_width` and `epsilon`
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    """
+
+    pinch_width = height * width / (height + width) - epsilon
+    d_pinch_width = {
+        "height": (width / (height + width)) ** 2,
+        "width": (height / (height + width)) ** 2,
+        "inlet_width": np.zeros_like(height),
+        "epsilon": -np.ones_like(height),
+    }
+
+    # root = sqrt(2 * (w_in - pw) * (w - pw)), so
+    # d(root) = ((w - pw) * d(w_in - pw) + (w_in - pw) * d(w - pw)) / root
+    inlet_gap = inlet_width - pinch_width
+    width_gap = width - pinch_width
+    root = np.sqrt(2 * inlet_gap * width_gap)
+    inverse_root = np.divide(1.0, root, out=np.full_like(root, np.nan), where=root != 0)
+
+    partials = {}
+    for name in ["height", "width", "inlet_width", "epsilon"]:
+        d_inlet_width = 1.0 if name == "inlet_width" else 0.0
+        d_width = 1.0 if name == "width" else 0.0
+
+        d_root = (
+            width_gap * (d_inlet_width - d_pinch_width[name])
+            + inlet_gap * (d_width - d_pinch_width[name])
+        ) * inverse_root
+
+        partials[name] = d_width + d_inlet_width - d_pinch_width[name] + d_root
+
+    return Gradient(width + inlet_width - pinch_width + root, partials)
@@ -0,0 +1,298 @@
+"""
+Inverse
+~~~
+Solve the model backwards: given a target droplet/bubble volume and all but one
+of the inputs to `total.calc_total_volume`, find the remaining input. Every
+function accepts arrays, so millions of targets are solved at once.
+
+The total volume is linear in `flow_disp`, which is solved in closed form. Other
+parameters are solved by scanning a bracket for the first sign change of the
+residual, then bisecting all targets together.
+
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import functools
+from typing import Callable, Mapping, NamedTuple, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from t_junction_model import batch
+
+PARAMETERS = batch.PARAMETERS
+
+# Default search brackets, as multiples of channel width
+DEFAULT_BOUNDS = {
+    "height": (0.01, 1.0),
+    "inlet_width": (0.1, 5.0),
+    "epsilon": (0.0, 0.25),
+}
+
+
+class InverseSolution(NamedTuple):
+    """Solution of the inverse problem"""
+
+    value: np.ndarray  # Solved parameter, NaN where the target was not reached
+    reached: np.ndarray  # Whether a solution was found for the target
+
+
+# -------------------------------------------------------------------------------------
+def solve_for(
+    parameter: str,
+    target_volume: npt.ArrayLike,
+    known: Mapping[str, npt.ArrayLike],
+    bounds: Optional[tuple[npt.ArrayLike, npt.ArrayLike]] = None,
+    n_scan: int = 32,
+    rtol: float = 1e-12,
+    max_iter: int = 200,
+) -> InverseSolution:
+    """
+    Find the value of one model input which gives the target total volume
+
+    Arguments:
+    `parameter`: name of the input to solve for (see `PARAMETERS`)
+    `target_volume`: target total volume of droplet/bubble
+    `known`: values of the other six inputs, by name
+    `bounds`: (lower, upper) search bracket, required unless `parameter` is
+    `flow_disp` or has an entry in `DEFAULT_BOUNDS` (multiples of `width`)
+    `n_scan`: number of points used to scan the bracket for a sign change
+    `rtol`: relative width of the bracket at which bisection stops
+    `max_iter`: maximum number of bisection steps
+    """
+
+    if parameter not in PARAMETERS:
+        raise ValueError(f'Unknown parameter "{parameter}"')
+
+    expected = set(PARAMETERS) - {parameter}
+    if set(known) != expected:
+        missing = ", ".join(sorted(expected - set(known)))
+        extra = ", ".join(sorted(set(known) - expected))
+        raise ValueError(
+            f'Solving for "{parameter}" needs exactly the other inputs'
+            f" (missing: {missing or 'none'}; unexpected: {extra or 'none'})"
+        )
+
+    if parameter == "flow_disp":
+        return calc_flow_disp(target_volume, **known)
+
+    if bounds is None:
+        if parameter not in DEFAULT_BOUNDS:
+            raise ValueError(f'No default bounds for "{parameter}", give `bounds`')
+        lower_ratio, upper_ratio = DEFAULT_BOUNDS[parameter]
+        width = np.asarray(known["width"], dtype=float)
+        bounds = (lower_ratio * width, upper_ratio * width)
+
+    return _bracket_and_bisect(
+        parameter, target_volume, bounds, known, n_scan, rtol, max_iter
+    )
+
+
+# -------------------------------------------------------------------------------------
+def calc_flow_disp(
+    target_volume: npt.ArrayLike,
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+) -> InverseSolution:
+    """
+    Calculate the dispersed phase flow rate which gives the target total volume.
+    Targets smaller than the fill volume cannot be reached.
+
+    Arguments:
+    `target_volume`: target total volume of droplet/bubble
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_gutter`: volumetric flow rate of gutter
+    """
+
+    fill_volume = batch.calc_fill_volume(height, width, inlet_width)
+
+    # Squeezing volume is proportional to flow_disp / flow_cont
+    squeeze_volume_per_ratio = batch.calc_squeezing_volume(
+        height, width, inlet_width, epsilon, flow_cont, flow_cont, flow_gutter
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        flow_disp = (
+            (np.asarray(target_volume, dtype=float) - fill_volume)
+            * flow_cont
+            / squeeze_volume_per_ratio
+        )
+
+    reached = np.isfinite(flow_disp) & (flow_disp >= 0)
+
+    return InverseSolution(np.where(reached, flow_disp, np.nan), reached)
+
+
+# -------------------------------------------------------------------------------------
+def _bracket_and_bisect(
+    parameter: str,
+    target_volume: npt.ArrayLike,
+    bounds: tuple[npt.ArrayLike, npt.ArrayLike],
+    known: Mapping[str, npt.ArrayLike],
+    n_scan: int,
+    rtol: float,
+    max_iter: int,
+) -> InverseSolution:
+    """
+    Scan each bracket for the first sign change of the volume residual,
+    then bisect all brackets together
+
+    Arguments:
+    `parameter`: name of the input to solve for
+    `target_volume`: target total volume of droplet/bubble
+    `bounds`: (lower, upper) search bracket
+    `known`: values of the other six inputs, by name
+    `n_scan`: number of points used to scan the bracket for a sign change
+    `rtol`: relative width of the bracket at which bisection stops
+    `max_iter`: maximum number of bisection steps
+    """
+
+    shape, target, brackets, inputs = _flatten_inputs(target_volume, bounds, known)
+    residual = functools.partial(_calc_residual, parameter, target, inputs)
+
+    low, high, reached = _scan_brackets(residual, *brackets, n_scan)
+    _bisect(residual, low, high, reached, rtol, max_iter)
+
+    return InverseSolution(
+        np.where(reached, 0.5 * (low + high), np.nan).reshape(shape),
+        reached.reshape(shape),
+    )
+
+
+# -------------------------------------------------------------------------------------
+def _flatten_inputs(
+    target_volume: npt.ArrayLike,
+    bounds: tuple[npt.ArrayLike, npt.ArrayLike],
+    known: Mapping[str, npt.ArrayLike],
+) -> tuple[
+    tuple[int, ...], np.ndarray, tuple[np.ndarray, np.ndarray], dict[str, np.ndarray]
+]:
+    """
+    Broadcast the targets, brackets and known inputs against each other,
+    returning their shape and each of them flattened
+
+    Arguments:
+    `target_volume`: target total volume of droplet/bubble
+    `bounds`: (lower, upper) search bracket
+    `known`: values of the other six inputs, by name
+    """
+
+    arrays = np.broadcast_arrays(
+        *(np.asarray(arg, dtype=float) for arg in [target_volume, *bounds]),
+        *(np.asarray(value, dtype=float) for value in known.values()),
+    )
+    target, lower, upper, *values = (array.ravel() for array in arrays)
+
+    return arrays[0].shape, target, (lower, upper), dict(zip(known, values))
+
+
+# -------------------------------------------------------------------------------------
+def _calc_residual(
+    parameter: str,
+    target: np.ndarray,
+    inputs: dict[str, np.ndarray],
+    value: np.ndarray,
+    index: np.ndarray,
+) -> np.ndarray:
+    """
+    Calculate total volume minus target for a subset of the targets
+
+    Arguments:
+    `parameter`: name of the input being solved for
+    `target`: target total volume of droplet/bubble
+    `inputs`: values of the other six inputs, by name
+    `value`: trial values of `parameter`, one per index
+    `index`: indices of the targets to evaluate
+    """
+
+    args = {name: array[index] for name, array in inputs.items()}
+    args[parameter] = value
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volume = batch.calc_total_volume(**args)
+
+    return volume - target[index]
+
+
+# -------------------------------------------------------------------------------------
+def _scan_brackets(
+    residual: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    lower: np.ndarray,
+    upper: np.ndarray,
+    n_scan: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Narrow each bracket to the first of `n_scan - 1` equal steps where the
+    residual changes sign. Only one step is held in memory at a time.
+
+    Arguments:
+    `residual`: function of (values, indices) giving volume minus target
+    `lower`: lower end of each bracket
+    `upper`: upper end of each bracket
+    `n_scan`: number of points used to scan the bracket
+    """
+
+    everything = np.arange(lower.size)
+    reached = np.zeros(lower.size, dtype=bool)
+    low = lower.copy()
+    high = upper.copy()
+
+    prev_value = lower
+    prev_residual = residual(lower, everything)
+    for fraction in np.linspace(0, 1, n_scan)[1:]:
+        value = lower + fraction * (upper - lower)
+        value_residual = residual(value, everything)
+
+        change = ~reached & (np.sign(prev_residual) * np.sign(value_residual) <= 0)
+        low[change] = prev_value[change]
+        high[change] = value[change]
+        reached |= change
+
+        prev_value, prev_residual = value, value_residual
+
+    return low, high, reached
+
+
+# -------------------------------------------------------------------------------------
+def _bisect(
+    residual: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    low: np.ndarray,
+    high: np.ndarray,
+    reached: np.ndarray,
+    rtol: float,
+    max_iter: int,
+) -> None:
+    """
+    Bisect the brackets in place until they are narrower than `rtol`
+
+    Arguments:
+    `residual`: function of (values, indices) giving volume minus target
+    `low`: lower end of each bracket
+    `high`: upper end of each bracket
+    `reached`: whether each bracket contains a root
+    `rtol`: relative width of the bracket at which bisection stops
+    `max_iter`: maximum number of bisection steps
+    """
+
+    low_residual = residual(low, np.arange(low.size))
+
+    for _ in range(max_iter):
+        active = np.flatnonzero(reached & (high - low > rtol * np.abs(high)))
+        if active.size == 0:
+            break
+
+        mid = 0.5 * (low[active] + high[active])
+        mid_residual = residual(mid, active)
+        same_sign = np.sign(mid_residual) == np.sign(low_residual[active])
+
+        low[active[same_sign]] = mid[same_sign]
+        low_residual[active[same_sign]] = mid_residual[same_sign]
+        high[active[~same_sign]] = mid[~same_sign]
@@ -0,0 +1,47 @@
+"""
+Parallel
+~~~
+Run independent calls of a function in a pool of worker processes.
+
+Sweeps, tolerance and sensitivity studies and the figure script split their
+work into tasks, and run them with `run_tasks()`. The function and its
+arguments are pickled to reach the workers, so the function must be defined at
+module level. Results are yielded as the calls finish, so callers that need a
+fixed order should return an index with each result.
+
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Iterator, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+# -------------------------------------------------------------------------------------
+def run_tasks(
+    function: Callable[..., T], tasks: Sequence[tuple], workers: int
+) -> Iterator[T]:
+    """
+    Call `function` on each tuple of arguments, in a pool of `workers`
+    processes, yielding the results in the order the calls finish
+
+    Arguments:
+    `function`: function to call, defined at module level so it can be pickled
+    `tasks`: arguments of each call
+    `workers`: number of worker processes. With one worker, the calls are made
+    in order in this process.
+    """
+
+    if workers < 1:
+        raise ValueError(f"workers must be positive, got {workers}")
+
+    if workers == 1:
+        for task in tasks:
+            yield function(*task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(function, *task) for task in tasks]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,197 @@
+"""
+Resumable
+~~~
+Parameter sweeps that survive being interrupted.
+
+Results are written straight into one preallocated `.npy` file, opened as a
+memory map, so no sweep needs more memory than one chunk per worker. After a
+chunk's rows are flushed to disk, its index is appended to a journal. When a
+sweep is started again in the same directory, only the chunks missing from the
+journal are computed.
+
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import json
+import os
+import time
+from typing import Callable, NamedTuple, Optional
+
+import numpy as np
+
+from t_junction_model import parallel, sweep
+from t_junction_model.sweep import SweepGrid
+
+RESULTS_FILE = "results.npy"
+JOURNAL_FILE = "journal.txt"
+# Not sweep.json, which describes the shards of a sweep.py sweep
+MANIFEST_FILE = "resumable.json"
+
+
+class ResumableResult(NamedTuple):
+    """Summary of a finished resumable sweep"""
+
+    n_points: int
+    n_chunks: int
+    n_resumed: int
+    seconds: float
+    file: str
+
+
+# -------------------------------------------------------------------------------------
+def run_resumable_sweep(
+    grid: SweepGrid,
+    out_dir: str,
+    chunk_size: int = 1_000_000,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int, float], None]] = None,
+) -> ResumableResult:
+    """
+    Evaluate every grid point into `results.npy` in `out_dir`, skipping chunks
+    recorded as finished in `journal.txt` by an earlier, interrupted run
+
+    Arguments:
+    `grid`: sweep grid
+    `out_dir`: output directory
+    `chunk_size`: points per chunk, the unit of work that is journaled
+    `workers`: number of worker processes, defaults to the number of CPUs
+    `progress`: called with the points computed, the points this run has to
+    compute and the seconds elapsed each time a chunk finishes
+    """
+
+    bounds = sweep.calc_shard_bounds(grid.n_points, chunk_size)
+    results_file = os.path.join(out_dir, RESULTS_FILE)
+
+    os.makedirs(out_dir, exist_ok=True)
+    done = _prepare(grid, out_dir, chunk_size)
+
+    missing = [index for index in range(len(bounds)) if index not in done]
+    n_missing = sum(bounds[index][1] - bounds[index][0] for index in missing)
+    n_done = 0
+    workers = min(workers or os.cpu_count() or 1, max(len(missing), 1))
+    tasks = [(grid, results_file, index, *bounds[index]) for index in missing]
+
+    start_time = time.perf_counter()
+    with open(os.path.join(out_dir, JOURNAL_FILE), "at", encoding="utf-8") as journal:
+        for index in parallel.run_tasks(_fill_chunk, tasks, workers):
+            # The chunk is on disk before it is journaled
+            journal.write(f"{index}\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+
+            n_done += bounds[index][1] - bounds[index][0]
+            if progress is not None:
+                progress(n_done, n_missing, time.perf_counter() - start_time)
+
+    return ResumableResult(
+        grid.n_points,
+        len(bounds),
+        len(done),
+        time.perf_counter() - start_time,
+        results_file,
+    )
+
+
+# -------------------------------------------------------------------------------------
+def read_journal(out_dir: str) -> set[int]:
+    """
+    Get the indices of the chunks recorded as finished. A partly written last
+    line, left by a crash, is ignored.
+
+    Arguments:
+    `out_dir`: sweep directory
+    """
+
+    journal_file = os.path.join(out_dir, JOURNAL_FILE)
+    if not os.path.isfile(journal_file):
+        return set()
+
+    with open(journal_file, "rt", encoding="utf-8") as journal:
+        lines = journal.read().split("\n")
+
+    # Everything after the last newline is incomplete
+    return {int(line) for line in lines[:-1] if line.strip().isdigit()}
+
+
+# -------------------------------------------------------------------------------------
+def load_results(out_dir: str) -> np.ndarray:
+    """
+    Open the results of a sweep as a read-only memory-mapped record array.
+    Rows of chunks that have not finished are undefined.
+
+    Arguments:
+    `out_dir`: sweep directory
+    """
+
+    return np.load(os.path.join(out_dir, RESULTS_FILE), mmap_mode="r")
+
+
+# -------------------------------------------------------------------------------------
+def _prepare(grid: SweepGrid, out_dir: str, chunk_size: int) -> set[int]:
+    """
+    Start a new sweep, or check that the existing one in `out_dir` is the same
+    sweep, returning the chunks already finished
+
+    Arguments:
+    `grid`: sweep grid
+    `out_dir`: output directory
+    `chunk_size`: points per chunk
+    """
+
+    manifest = {
+        "parameters": grid.to_dict(),
+        "n_points": grid.n_points,
+        "dtype": grid.dtype.name,
+        "chunk_size": chunk_size,
+    }
+    manifest_file = os.path.join(out_dir, MANIFEST_FILE)
+    results_file = os.path.join(out_dir, RESULTS_FILE)
+
+    if os.path.isfile(manifest_file) and os.path.isfile(results_file):
+        with open(manifest_file, "rt", encoding="utf-8") as manifest_fh:
+            existing = json.load(manifest_fh)
+
+        if existing != json.loads(json.dumps(manifest)):
+            raise ValueError(
+                f'"{out_dir}" holds a different sweep, use another directory'
+            )
+
+        return read_journal(out_dir)
+
+    results = np.lib.format.open_memmap(
+        results_file, mode="w+", dtype=grid.record, shape=(grid.n_points,)
+    )
+    results.flush()
+    del results
+
+    with open(os.path.join(out_dir, JOURNAL_FILE), "wt", encoding="utf-8"):
+        pass
+
+    # Written last, so a crash above starts the sweep from scratch
+    with open(manifest_file, "wt", encoding="utf-8") as manifest_fh:
+        json.dump(manifest, manifest_fh, indent=2)
+
+    return set()
+
+
+# -------------------------------------------------------------------------------------
+def _fill_chunk(
+    grid: SweepGrid, results_file: str, index: int, start: int, stop: int
+) -> int:
+    """
+    Evaluate grid points `start` up to `stop` into the memory-mapped results,
+    and flush them to disk. Returns `index`.
+
+    Arguments:
+    `grid`: sweep grid
+    `results_file`: preallocated `.npy` file of results
+    `index`: chunk index
+    `start`: index of the first point
+    `stop`: index after the last point
+    """
+
+    results = np.load(results_file, mmap_mode="r+")
+    results[start:stop] = sweep.evaluate_shard(grid, start, stop)
+    results.flush()
+
+    return index
@@ -0,0 +1,168 @@
+"""
+Sensitivity
+~~~
+Global sensitivity analysis of the model by Sobol indices.
+
+Inputs are varied uniformly within given bounds, using a scrambled Sobol
+low-discrepancy sequence. The first-order index of an input is the fraction of
+the output variance explained by that input alone, and its total index also
+counts its interactions with the other inputs. Indices are estimated with the
+Saltelli (first-order) and Jansen (total) estimators, from N * (k + 2) model
+evaluations for k varied inputs, which are evaluated in batches and split
+across worker processes.
+
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import math
+import os
+from typing import Callable, Mapping, NamedTuple, Optional, Union
+
+import numpy as np
+from scipy.stats import qmc
+
+from t_junction_model import batch, parallel, sweep
+
+PARAMETERS = batch.PARAMETERS
+
+
+class SobolResult(NamedTuple):
+    """First-order and total Sobol indices of each varied input"""
+
+    first_order: dict[str, float]
+    total: dict[str, float]
+    variance: float
+    n_evaluations: int
+
+
+# -------------------------------------------------------------------------------------
+def calc_sobol_indices(
+    bounds: Mapping[str, Union[float, tuple[float, float]]],
+    n_samples: int = 2**14,
+    seed: int = 0,
+    function: Callable[..., np.ndarray] = batch.calc_nondim_total_volume,
+    chunk_size: int = 2**16,
+    workers: Optional[int] = 1,
+) -> SobolResult:
+    """
+    Calculate the first-order and total Sobol indices of the inputs which are
+    varied, over the region of the design space given by `bounds`
+
+    Arguments:
+    `bounds`: a (low, high) range of each varied input, and a value of each
+    fixed input, for every input in `PARAMETERS`
+    `n_samples`: base sample size N, a power of 2
+    `seed`: seed of the scrambling of the Sobol sequence
+    `function`: batch model function taking the inputs as keyword arguments,
+    defined at module level so it can be pickled
+    `chunk_size`: base samples per unit of work
+    `workers`: number of worker processes, `None` for the number of CPUs
+    """
+
+    missing = set(PARAMETERS) - set(bounds)
+    if missing:
+        raise ValueError(f"Bounds missing for: {', '.join(sorted(missing))}")
+
+    if n_samples < 2 or n_samples & (n_samples - 1):
+        raise ValueError(f"n_samples must be a power of 2, got {n_samples}")
+
+    varied = [name for name in PARAMETERS if not np.isscalar(bounds[name])]
+    if not varied:
+        raise ValueError("No input is varied")
+
+    fixed = {name: bounds[name] for name in PARAMETERS if name not in varied}
+    matrices = _sample_matrices(
+        np.array([bounds[name] for name in varied], dtype=float), n_samples, seed
+    )
+
+    chunks = sweep.calc_shard_bounds(n_samples, chunk_size)
+    tasks = [
+        (function, varied, fixed, matrices[start:stop], index)
+        for index, (start, stop) in enumerate(chunks)
+    ]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+
+    # Rows are f(A), f(B), and f(A with column i taken from B) for each input
+    evaluations = np.empty((len(varied) + 2, n_samples))
+    for index, values in parallel.run_tasks(_evaluate_chunk, tasks, workers):
+        evaluations[:, slice(*chunks[index])] = values
+
+    return _estimate_indices(varied, evaluations)
+
+
+# -------------------------------------------------------------------------------------
+def _sample_matrices(ranges: np.ndarray, n_samples: int, seed: int) -> np.ndarray:
+    """
+    Draw the two independent sample matrices, A and B, side by side from a
+    scrambled Sobol sequence
+
+    Arguments:
+    `ranges`: (low, high) range of each varied input
+    `n_samples`: rows of each matrix, a power of 2
+    `seed`: seed of the scrambling
+    """
+
+    low, high = ranges.T
+    unit = qmc.Sobol(2 * len(ranges), seed=seed).random_base2(int(math.log2(n_samples)))
+
+    return qmc.scale(unit, np.tile(low, 2), np.tile(high, 2))
+
+
+# -------------------------------------------------------------------------------------
+def _evaluate_chunk(
+    function: Callable[..., np.ndarray],
+    varied: list[str],
+    fixed: dict[str, float],
+    matrices: np.ndarray,
+    index: int,
+) -> tuple[int, np.ndarray]:
+    """
+    Evaluate the model at A, B and the k matrices mixing them, for a chunk of
+    base samples. Returns `index` and an array of shape (k + 2, rows).
+
+    Arguments:
+    `function`: batch model function
+    `varied`: names of the varied inputs
+    `fixed`: values of the fixed inputs
+    `matrices`: rows of the A and B sample matrices, side by side
+    `index`: chunk index
+    """
+
+    n_varied = len(varied)
+    matrix_a, matrix_b = matrices[:, :n_varied], matrices[:, n_varied:]
+
+    mixed = [matrix_a, matrix_b]
+    for column in range(n_varied):
+        matrix_ab = matrix_a.copy()
+        matrix_ab[:, column] = matrix_b[:, column]
+        mixed.append(matrix_ab)
+
+    # Evaluate all k + 2 matrices in a single batch call
+    stacked = np.concatenate(mixed)
+    values = function(**fixed, **dict(zip(varied, stacked.T)))
+
+    return index, np.asarray(values).reshape(n_varied + 2, len(matrices))
+
+
+# -------------------------------------------------------------------------------------
+def _estimate_indices(varied: list[str], evaluations: np.ndarray) -> SobolResult:
+    """
+    Calculate the Sobol indices from the model evaluations
+
+    Arguments:
+    `varied`: names of the varied inputs
+    `evaluations`: rows of f(A), f(B) and f(AB_i) for each varied input
+    """
+
+    f_a, f_b, f_ab = evaluations[0], evaluations[1], evaluations[2:]
+    variance = float(np.var(np.concatenate([f_a, f_b])))
+
+    first_order = np.mean(f_b * (f_ab - f_a), axis=1) / variance
+    total = 0.5 * np.mean((f_a - f_ab) ** 2, axis=1) / variance
+
+    return SobolResult(
+        dict(zip(varied, first_order.tolist())),
+        dict(zip(varied, total.tolist())),
+        variance,
+        evaluations.size,
+    )
@@ -0,0 +1,457 @@
+"""
+Service
+~~~
+Local asyncio prediction service with request micro-batching.
+
+Requests arriving within a short time window are gathered by a `MicroBatcher`
+and evaluated together with one call to `validation.calc_predictions()`, then
+each request is answered separately. The first request of a window starts its
+timer, and a window is also closed early once it holds `max_batch` requests.
+An invalid request is answered with its reason codes, without affecting the
+others in its window.
+
+`PredictionService` serves the batcher over HTTP/1.1 with JSON bodies:
+
+* `POST /predict` with an object holding each input in `PARAMETERS` returns
+the fill volume, alpha, squeeze volume and total volume
+* `GET /stats` returns latency percentiles and a histogram of batch sizes
+
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import asyncio
+import collections
+import contextlib
+import json
+import time
+from http import HTTPStatus
+from typing import Any, Mapping, NamedTuple, Optional
+
+import numpy as np
+
+from t_junction_model import batch, validation
+
+PARAMETERS = batch.PARAMETERS
+
+# Largest accepted request body, in bytes
+MAX_BODY_SIZE = 64 * 1024
+
+
+class Prediction(NamedTuple):
+    """Predictions of one request, and its reason code (0 if valid)"""
+
+    values: dict[str, float]
+    reason: int
+
+
+class Request(NamedTuple):
+    """Parsed HTTP request"""
+
+    method: str
+    path: str
+    body: bytes
+    keep_alive: bool
+
+
+# -------------------------------------------------------------------------------------
+class ServiceStats:
+    """Request latencies and batch sizes of a batcher"""
+
+    def __init__(self, max_latencies: int = 100_000) -> None:
+        """
+        Create empty statistics
+
+        Arguments:
+        `max_latencies`: number of most recent latencies kept for percentiles
+        """
+
+        self.n_requests = 0
+        self.n_batches = 0
+        self.latencies: collections.deque[float] = collections.deque(
+            maxlen=max_latencies
+        )
+        self.batch_sizes: collections.Counter[int] = collections.Counter()
+
+    def record_batch(self, latencies: list[float]) -> None:
+        """
+        Record a finished batch
+
+        Arguments:
+        `latencies`: seconds from arrival to answer of each request in the batch
+        """
+
+        self.n_requests += len(latencies)
+        self.n_batches += 1
+        self.latencies.extend(latencies)
+
+        # Batch sizes are binned by powers of 2
+        self.batch_sizes[1 << (len(latencies).bit_length() - 1)] += 1
+
+    def latency_percentiles(
+        self, percentiles: tuple[float, ...] = (50, 90, 99)
+    ) -> dict[str, Optional[float]]:
+        """
+        Get percentiles of the recent latencies, in milliseconds, or `None`
+        before any request is answered
+
+        Arguments:
+        `percentiles`: percentiles to calculate, between 0 and 100
+        """
+
+        if not self.latencies:
+            return {f"p{p:g}": None for p in percentiles}
+
+        values = np.percentile(np.array(self.latencies) * 1e3, percentiles)
+
+        return {f"p{p:g}": float(value) for p, value in zip(percentiles, values)}
+
+    def batch_size_histogram(self) -> dict[str, int]:
+        """Get the number of batches in each power of 2 range of sizes"""
+
+        return {
+            (f"{low}-{2 * low - 1}" if low > 1 else "1"): self.batch_sizes[low]
+            for low in sorted(self.batch_sizes)
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        """Get all statistics as a JSON-serializable dictionary"""
+
+        return {
+            "n_requests": self.n_requests,
+            "n_batches": self.n_batches,
+            "latency_ms": self.latency_percentiles(),
+            "batch_sizes": self.batch_size_histogram(),
+        }
+
+
+# -------------------------------------------------------------------------------------
+class MicroBatcher:
+    """Gathers concurrent predictions into batches evaluated together"""
+
+    def __init__(
+        self,
+        window: float = 0.002,
+        max_batch: int = 1024,
+        stats: Optional[ServiceStats] = None,
+    ) -> None:
+        """
+        Create a batcher
+
+        Arguments:
+        `window`: seconds to wait for more requests after the first of a batch
+        `max_batch`: number of requests at which a batch is evaluated at once
+        `stats`: statistics to update, a new `ServiceStats` by default
+        """
+
+        if window < 0 or max_batch < 1:
+            raise ValueError("window must not be negative and max_batch positive")
+
+        self.window = window
+        self.max_batch = max_batch
+        self.stats = stats or ServiceStats()
+        self._pending: list[tuple[Mapping[str, float], asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def predict(self, inputs: Mapping[str, float]) -> Prediction:
+        """
+        Queue one design and wait for its predictions
+
+        Arguments:
+        `inputs`: value of each input in `PARAMETERS`
+        """
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((inputs, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+
+        return await future
+
+    def flush(self) -> None:
+        """Evaluate the pending requests as one batch and answer each of them"""
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        try:
+            columns = [
+                np.array([inputs[name] for inputs, _, _ in pending], dtype=float)
+                for name in PARAMETERS
+            ]
+            predictions, reasons = validation.calc_predictions(*columns)
+        except Exception as error:  # pylint: disable=broad-except
+            # Fail every request of the batch rather than leave them waiting
+            for _, future, _ in pending:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        finished = time.perf_counter()
+        for row, (_, future, _) in enumerate(pending):
+            if not future.done():
+                future.set_result(
+                    Prediction(
+                        {
+                            name: float(values[row])
+                            for name, values in predictions.items()
+                        },
+                        int(reasons[row]),
+                    )
+                )
+
+        self.stats.record_batch([finished - arrived for _, _, arrived in pending])
+
+
+# -------------------------------------------------------------------------------------
+class PredictionService:
+    """HTTP server answering prediction requests through a `MicroBatcher`"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        window: float = 0.002,
+        max_batch: int = 1024,
+    ) -> None:
+        """
+        Create a service, which listens once `start()` is awaited
+
+        Arguments:
+        `host`: address to listen on
+        `port`: port to listen on, 0 for any free port
+        `window`: seconds to wait for more requests after the first of a batch
+        `max_batch`: number of requests at which a batch is evaluated at once
+        """
+
+        self.host = host
+        self.port = port
+        self.batcher = MicroBatcher(window, max_batch)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        """Start listening, setting `port` to the port actually used"""
+
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop listening and answer any pending requests"""
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+        self.batcher.flush()
+
+    async def serve_forever(self) -> None:
+        """Start, if needed, and serve until cancelled"""
+
+        if self._server is None:
+            await self.start()
+
+        assert self._server is not None
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def handle(self, request: Request) -> tuple[int, dict[str, Any]]:
+        """
+        Answer a request, returning the HTTP status and the JSON payload
+
+        Arguments:
+        `request`: parsed request
+        """
+
+        routes = {("GET", "/stats"): self._stats, ("POST", "/predict"): self._predict}
+
+        if (request.method, request.path) in routes:
+            return await routes[request.method, request.path](request)
+
+        if request.path in {path for _, path in routes}:
+            return HTTPStatus.METHOD_NOT_ALLOWED, {
+                "error": f"{request.method} not allowed"
+            }
+
+        return HTTPStatus.NOT_FOUND, {"error": f"no such path: {request.path}"}
+
+    async def _stats(self, _request: Request) -> tuple[int, dict[str, Any]]:
+        """
+        Answer a statistics request
+
+        Arguments:
+        `_request`: parsed request
+        """
+
+        return HTTPStatus.OK, self.batcher.stats.to_dict()
+
+    async def _predict(self, request: Request) -> tuple[int, dict[str, Any]]:
+        """
+        Answer a prediction request
+
+        Arguments:
+        `request`: parsed request
+        """
+
+        try:
+            inputs = parse_inputs(request.body)
+        except ValueError as error:
+            return HTTPStatus.BAD_REQUEST, {"error": str(error)}
+
+        prediction = await self.batcher.predict(inputs)
+        if prediction.reason:
+            return HTTPStatus.UNPROCESSABLE_ENTITY, {
+                "error": "invalid inputs",
+                "reasons": validation.describe(prediction.reason),
+            }
+
+        return HTTPStatus.OK, prediction.values
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Answer requests on one connection until the client closes it
+
+        Arguments:
+        `reader`: connection input
+        `writer`: connection output
+        """
+
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except ValueError as error:
+                    write_response(
+                        writer, HTTPStatus.BAD_REQUEST, {"error": str(error)}, False
+                    )
+                    await writer.drain()
+                    break
+
+                if request is None:
+                    break
+
+                status, payload = await self.handle(request)
+                write_response(writer, status, payload, request.keep_alive)
+                await writer.drain()
+
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+
+# -------------------------------------------------------------------------------------
+def parse_inputs(body: bytes) -> dict[str, float]:
+    """
+    Get the model inputs from the JSON body of a prediction request
+
+    Arguments:
+    `body`: request body
+    """
+
+    try:
+        data = json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise ValueError(f"body is not valid JSON: {error}") from error
+
+    if not isinstance(data, dict):
+        raise ValueError("body must be a JSON object")
+
+    missing = [name for name in PARAMETERS if name not in data]
+    if missing:
+        raise ValueError(f"missing inputs: {', '.join(missing)}")
+
+    try:
+        return {name: float(data[name]) for name in PARAMETERS}
+    except (TypeError, ValueError) as error:
+        raise ValueError("inputs must be numbers") from error
+
+
+# -------------------------------------------------------------------------------------
+async def read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """
+    Read one HTTP request, returning `None` if the connection was closed
+    before it started
+
+    Arguments:
+    `reader`: connection input
+    """
+
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+
+    parts = request_line.decode("latin-1").split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+        raise ValueError("malformed request line")
+    method, path, version = parts
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError as error:
+        raise ValueError("malformed Content-Length") from error
+
+    if not 0 <= length <= MAX_BODY_SIZE:
+        raise ValueError(f"body must be at most {MAX_BODY_SIZE} bytes")
+
+    body = await reader.readexactly(length)
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection == "keep-alive" or (
+        version == "HTTP/1.1" and connection != "close"
+    )
+
+    return Request(method, path.split("?")[0], body, keep_alive)
+
+
+# -------------------------------------------------------------------------------------
+def write_response(
+    writer: asyncio.StreamWriter,
+    status: int,
+    payload: Mapping[str, Any],
+    keep_alive: bool,
+) -> None:
+    """
+    Write an HTTP response with a JSON body
+
+    Arguments:
+    `writer`: connection output
+    `status`: HTTP status code
+    `payload`: JSON-serializable body
+    `keep_alive`: whether the connection stays open
+    """
+
+    body = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+
+    writer.write(head.encode("latin-1") + body)
@@ -36,13 +36,13 @@ def calc_nondim_squeeze_volume(
     `flow_gutter`: volumetric flow rate of gutter
     """
 
+    if 0 in [height, width, inlet_width]:
+        return None
+
     squeeze_volume = calc_squeezing_volume(
         height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter
     )
 
-    if 0 in [height, width, inlet_width]:
-        return None
-
     nondim_volume = squeeze_volume / (height * (width**2))
 
     return nondim_volume
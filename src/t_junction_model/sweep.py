@@ -0,0 +1,283 @@
+"""
+Sweep
+~~~
+Evaluate the model over the Cartesian product of values of each input, split
+into shards that are run in a pool of worker processes.
+
+Grid points are numbered in the same order as `itertools.product()` over the
+inputs in `PARAMETERS` order, and shard `i` always holds points
+`i * shard_size` up to `(i + 1) * shard_size`. Each shard is written to its own
+`.npy` file, so the output files do not depend on the number of workers or the
+order in which shards finish. Grids created with `dtype=np.float32` are
+evaluated and stored in single precision, which halves the size of the output
+(see `batch.FLOAT32_MAX_REL_ERROR` for the accuracy cost).
+
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import json
+import math
+import os
+import time
+from typing import Callable, Literal, Mapping, NamedTuple, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from t_junction_model import batch, parallel
+
+PARAMETERS = batch.PARAMETERS
+
+
+class SweepResult(NamedTuple):
+    """Summary of a finished sweep"""
+
+    n_points: int
+    n_shards: int
+    seconds: float
+    files: list[str]
+
+
+# -------------------------------------------------------------------------------------
+class SweepGrid:
+    """Values of each model input, swept as a Cartesian product"""
+
+    def __init__(
+        self, values: Mapping[str, npt.ArrayLike], dtype: npt.DTypeLike = np.float64
+    ) -> None:
+        """
+        Check and store the values of each input
+
+        Arguments:
+        `values`: one or more values of each input in `PARAMETERS`
+        `dtype`: precision of the calculations and results, `np.float64` or
+        `np.float32`
+        """
+
+        missing = set(PARAMETERS) - set(values)
+        unexpected = set(values) - set(PARAMETERS)
+        if missing or unexpected:
+            raise ValueError(
+                f"Sweep inputs missing: {', '.join(sorted(missing)) or 'none'}; "
+                f"unexpected: {', '.join(sorted(unexpected)) or 'none'}"
+            )
+
+        self.values = {
+            name: np.atleast_1d(np.asarray(values[name], dtype=float)).ravel()
+            for name in PARAMETERS
+        }
+        self.shape = tuple(len(self.values[name]) for name in PARAMETERS)
+        self.n_points = math.prod(self.shape)
+        self.dtype = batch.check_dtype(dtype)
+        self.record = make_record(self.dtype)
+
+    def points(self, start: int, stop: int) -> dict[str, np.ndarray]:
+        """
+        Get the input values of grid points `start` up to `stop`
+
+        Arguments:
+        `start`: index of the first point
+        `stop`: index after the last point
+        """
+
+        indices = np.unravel_index(np.arange(start, stop), self.shape)
+
+        return {
+            name: self.values[name][index] for name, index in zip(PARAMETERS, indices)
+        }
+
+    def to_dict(self) -> dict[str, list[float]]:
+        """Get the values of each input as lists"""
+
+        return {name: values.tolist() for name, values in self.values.items()}
+
+
+# -------------------------------------------------------------------------------------
+def make_record(dtype: npt.DTypeLike) -> np.dtype:
+    """
+    Get the structured dtype of each row of a shard file
+
+    Arguments:
+    `dtype`: float type of the inputs and outputs
+    """
+
+    return np.dtype([(name, dtype) for name in PARAMETERS + batch.PREDICTIONS])
+
+
+# -------------------------------------------------------------------------------------
+def calc_shard_bounds(n_points: int, shard_size: int) -> list[tuple[int, int]]:
+    """
+    Split point indices into consecutive shards
+
+    Arguments:
+    `n_points`: number of grid points
+    `shard_size`: maximum points per shard
+    """
+
+    if shard_size < 1:
+        raise ValueError(f"shard_size must be positive, got {shard_size}")
+
+    return [
+        (start, min(start + shard_size, n_points))
+        for start in range(0, n_points, shard_size)
+    ]
+
+
+# -------------------------------------------------------------------------------------
+def evaluate_shard(grid: SweepGrid, start: int, stop: int) -> np.ndarray:
+    """
+    Evaluate the model at grid points `start` up to `stop`, returning a record
+    array of the inputs and outputs
+
+    Arguments:
+    `grid`: sweep grid
+    `start`: index of the first point
+    `stop`: index after the last point
+    """
+
+    points = grid.points(start, stop)
+    predictions = batch.calc_predictions(**points, dtype=grid.dtype)
+
+    records = np.empty(stop - start, dtype=grid.record)
+    for name, values in {**points, **predictions}.items():
+        records[name] = values
+
+    return records
+
+
+# -------------------------------------------------------------------------------------
+def run_sweep(
+    grid: SweepGrid,
+    out_dir: str,
+    shard_size: int = 1_000_000,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int, float], None]] = None,
+) -> SweepResult:
+    """
+    Evaluate every grid point, writing shard `i` to `shard_{i:05d}.npy` in
+    `out_dir` along with a `sweep.json` describing the sweep
+
+    Arguments:
+    `grid`: sweep grid
+    `out_dir`: output directory
+    `shard_size`: maximum points per shard
+    `workers`: number of worker processes, defaults to the number of CPUs. With
+    one worker, shards are evaluated in this process.
+    `progress`: called with the points done, total points and seconds elapsed
+    each time a shard finishes
+    """
+
+    bounds = calc_shard_bounds(grid.n_points, shard_size)
+    files = [os.path.join(out_dir, f"shard_{i:05d}.npy") for i in range(len(bounds))]
+    workers = min(workers or os.cpu_count() or 1, max(len(bounds), 1))
+
+    os.makedirs(out_dir, exist_ok=True)
+    _write_manifest(grid, out_dir, shard_size, files)
+
+    start_time = time.perf_counter()
+    n_done = 0
+    tasks = [(grid, start, stop, file) for (start, stop), file in zip(bounds, files)]
+    for n_shard_points in parallel.run_tasks(_write_shard, tasks, workers):
+        n_done += n_shard_points
+        if progress is not None:
+            progress(n_done, grid.n_points, time.perf_counter() - start_time)
+
+    return SweepResult(
+        grid.n_points, len(bounds), time.perf_counter() - start_time, files
+    )
+
+
+# -------------------------------------------------------------------------------------
+def load_sweep(out_dir: str) -> np.ndarray:
+    """
+    Read all shards of a sweep, in grid order, into one record array in memory
+
+    Arguments:
+    `out_dir`: directory written by `run_sweep()`
+    """
+
+    shards = load_shards(out_dir)
+    if not shards:
+        return np.empty(0, dtype=make_record(_read_manifest(out_dir)["dtype"]))
+
+    return np.concatenate(shards)
+
+
+# -------------------------------------------------------------------------------------
+def load_shards(
+    out_dir: str, mmap_mode: Optional[Literal["r", "r+", "c"]] = "r"
+) -> list[np.ndarray]:
+    """
+    Open each shard of a sweep, in grid order, without reading it into memory
+
+    Arguments:
+    `out_dir`: directory written by `run_sweep()`
+    `mmap_mode`: passed to `np.load()` for each shard, `None` to read them
+    """
+
+    return [
+        np.load(os.path.join(out_dir, shard), mmap_mode=mmap_mode)
+        for shard in _read_manifest(out_dir)["shards"]
+    ]
+
+
+# -------------------------------------------------------------------------------------
+def _read_manifest(out_dir: str) -> dict:
+    """
+    Read `sweep.json` of a sweep
+
+    Arguments:
+    `out_dir`: directory written by `run_sweep()`
+    """
+
+    with open(os.path.join(out_dir, "sweep.json"), "rt", encoding="utf-8") as fh_in:
+        manifest: dict = json.load(fh_in)
+
+    manifest.setdefault("dtype", "float64")
+
+    return manifest
+
+
+# -------------------------------------------------------------------------------------
+def _write_manifest(
+    grid: SweepGrid, out_dir: str, shard_size: int, files: list[str]
+) -> None:
+    """
+    Write `sweep.json`, describing the grid and listing the shard files in order
+
+    Arguments:
+    `grid`: sweep grid
+    `out_dir`: output directory
+    `shard_size`: maximum points per shard
+    `files`: shard files
+    """
+
+    with open(os.path.join(out_dir, "sweep.json"), "wt", encoding="utf-8") as out:
+        json.dump(
+            {
+                "parameters": grid.to_dict(),
+                "n_points": grid.n_points,
+                "dtype": grid.dtype.name,
+                "shard_size": shard_size,
+                "shards": [os.path.basename(file) for file in files],
+            },
+            out,
+            indent=2,
+        )
+
+
+# -------------------------------------------------------------------------------------
+def _write_shard(grid: SweepGrid, start: int, stop: int, file: str) -> int:
+    """
+    Evaluate a shard and save it, returning the number of points
+
+    Arguments:
+    `grid`: sweep grid
+    `start`: index of the first point
+    `stop`: index after the last point
+    `file`: output `.npy` file
+    """
+
+    np.save(file, evaluate_shard(grid, start, stop))
+
+    return stop - start
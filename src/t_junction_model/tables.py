@@ -0,0 +1,487 @@
+"""
+Tables
+~~~
+Precomputed lookup tables for the non-dimensionalized fill volume and the
+squeezing coefficient, alpha.
+
+The non-dimensionalized fill volume only depends on h/w and w_in/w, and alpha
+only depends on h/w, w_in/w and eps/w apart from the factor 1/(1 - Q_gutter/Q_cont).
+Both are tabulated on uniform grids of these ratios by `build_tables()` and saved
+as `.npy` files. `load_tables()` opens them as read-only memory maps, so the
+operating system shares the pages between all processes using the same tables.
+
+Queries use multilinear interpolation, which costs the same small number of
+operations wherever the point lies. The largest relative interpolation error,
+measured when the tables are built, is stored with them (`max_rel_error`).
+Points outside the tabulated ratios are calculated exactly.
+
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import functools
+import json
+import os
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from t_junction_model import batch
+
+# pylint: disable=protected-access
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(__file__), "tables")
+
+METHODS = ("table", "exact")
+
+
+class Axis(NamedTuple):
+    """Uniform grid of one dimensionless ratio"""
+
+    start: float
+    stop: float
+    num: int
+
+
+# w_in/w = 1 falls on a grid point, where the fill radius switches branches. Alpha
+# has a square root singularity where w_in approaches the pinch width (at most
+# w/2), so the inlet ratio starts a little above that.
+DEFAULT_AXES = {
+    "height_ratio": Axis(0.05, 1.0, 191),
+    "inlet_ratio": Axis(0.6, 4.0, 273),
+    "epsilon_ratio": Axis(0.0, 0.1, 21),
+}
+
+
+# -------------------------------------------------------------------------------------
+class LookupTables:
+    """Tabulated non-dimensionalized fill volume and squeezing coefficient"""
+
+    def __init__(
+        self,
+        fill_volume: np.ndarray,
+        alpha: np.ndarray,
+        axes: dict[str, Axis],
+        max_rel_error: dict[str, float],
+    ) -> None:
+        """
+        Wrap tables of values on a grid
+
+        Arguments:
+        `fill_volume`: non-dimensionalized fill volume over (h/w, w_in/w)
+        `alpha`: alpha without gutter flow over (h/w, w_in/w, eps/w)
+        `axes`: grid of each ratio
+        `max_rel_error`: largest relative interpolation error of each table
+        """
+
+        self.fill_volume = fill_volume
+        self.alpha = alpha
+        self.axes = axes
+        self.max_rel_error = max_rel_error
+
+    def contains(
+        self,
+        height_ratio: npt.ArrayLike,
+        inlet_ratio: npt.ArrayLike,
+        epsilon_ratio: npt.ArrayLike = 0.0,
+    ) -> np.ndarray:
+        """
+        Check which points lie within the tabulated ratios
+
+        Arguments:
+        `height_ratio`: channel height / channel width
+        `inlet_ratio`: inlet channel width / channel width
+        `epsilon_ratio`: corner roundness / channel width
+        """
+
+        inside = np.asarray(True)
+        for name, ratio in [
+            ("height_ratio", height_ratio),
+            ("inlet_ratio", inlet_ratio),
+            ("epsilon_ratio", epsilon_ratio),
+        ]:
+            axis = self.axes[name]
+            ratio = np.asarray(ratio, dtype=float)
+            inside = inside & (ratio >= axis.start) & (ratio <= axis.stop)
+
+        return inside
+
+    def interp_nondim_fill_volume(
+        self, height_ratio: npt.ArrayLike, inlet_ratio: npt.ArrayLike
+    ) -> np.ndarray:
+        """
+        Interpolate the non-dimensionalized fill volume
+
+        Arguments:
+        `height_ratio`: channel height / channel width
+        `inlet_ratio`: inlet channel width / channel width
+        """
+
+        return _interpolate(
+            self.fill_volume,
+            [self.axes["height_ratio"], self.axes["inlet_ratio"]],
+            [height_ratio, inlet_ratio],
+        )
+
+    def interp_alpha(
+        self,
+        height_ratio: npt.ArrayLike,
+        inlet_ratio: npt.ArrayLike,
+        epsilon_ratio: npt.ArrayLike,
+        gutter_ratio: npt.ArrayLike = 0.0,
+    ) -> np.ndarray:
+        """
+        Interpolate the squeezing coefficient, alpha
+
+        Arguments:
+        `height_ratio`: channel height / channel width
+        `inlet_ratio`: inlet channel width / channel width
+        `epsilon_ratio`: corner roundness / channel width
+        `gutter_ratio`: gutter flow rate / continuous phase flow rate
+        """
+
+        alpha = _interpolate(
+            self.alpha,
+            [
+                self.axes[name]
+                for name in ["height_ratio", "inlet_ratio", "epsilon_ratio"]
+            ],
+            [height_ratio, inlet_ratio, epsilon_ratio],
+        )
+
+        return alpha / (1 - np.asarray(gutter_ratio, dtype=float))
+
+
+# -------------------------------------------------------------------------------------
+def build_tables(
+    directory: str = DEFAULT_DIRECTORY,
+    axes: Optional[dict[str, Axis]] = None,
+    n_check: int = 100_000,
+) -> LookupTables:
+    """
+    Tabulate the non-dimensionalized fill volume and alpha, measure the
+    interpolation error, and save the tables to `directory`
+
+    Arguments:
+    `directory`: output directory
+    `axes`: grid of each ratio, defaults to `DEFAULT_AXES`
+    `n_check`: number of random points at which the error is measured, in
+    addition to the center of every grid cell
+    """
+
+    axes = dict(DEFAULT_AXES if axes is None else axes)
+    height_ratio, inlet_ratio, epsilon_ratio = np.meshgrid(
+        _axis_values(axes["height_ratio"]),
+        _axis_values(axes["inlet_ratio"]),
+        _axis_values(axes["epsilon_ratio"]),
+        indexing="ij",
+    )
+
+    fill_volume = batch.calc_nondim_fill_volume(
+        height_ratio[..., 0], 1.0, inlet_ratio[..., 0]
+    )
+    alpha = batch._calc_alpha(height_ratio, 1.0, inlet_ratio, epsilon_ratio, 1.0, 0.0)
+
+    tables = LookupTables(fill_volume, alpha, axes, {})
+    tables.max_rel_error = _measure_error(tables, n_check)
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "fill_volume.npy"), fill_volume)
+    np.save(os.path.join(directory, "alpha.npy"), alpha)
+
+    with open(os.path.join(directory, "metadata.json"), "wt", encoding="utf-8") as out:
+        metadata = {
+            "axes": {name: list(axis) for name, axis in axes.items()},
+            "max_rel_error": tables.max_rel_error,
+        }
+        json.dump(metadata, out, indent=2)
+
+    load_tables.cache_clear()
+
+    return tables
+
+
+# -------------------------------------------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def load_tables(directory: str = DEFAULT_DIRECTORY) -> LookupTables:
+    """
+    Open saved tables as read-only memory maps. Tables are opened once per
+    process and directory.
+
+    Arguments:
+    `directory`: directory written by `build_tables()`
+    """
+
+    metadata_file = os.path.join(directory, "metadata.json")
+    if not os.path.isfile(metadata_file):
+        raise FileNotFoundError(
+            f'No lookup tables in "{directory}", build them with build_tables.py'
+        )
+
+    with open(metadata_file, "rt", encoding="utf-8") as metadata_fh:
+        metadata = json.load(metadata_fh)
+
+    return LookupTables(
+        np.load(os.path.join(directory, "fill_volume.npy"), mmap_mode="r"),
+        np.load(os.path.join(directory, "alpha.npy"), mmap_mode="r"),
+        {name: Axis(*axis) for name, axis in metadata["axes"].items()},
+        metadata["max_rel_error"],
+    )
+
+
+# -------------------------------------------------------------------------------------
+def calc_nondim_fill_volume(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    method: str = "table",
+    tables: Optional[LookupTables] = None,
+) -> np.ndarray:
+    """
+    Calculate the non-dimensionalized fill volume from the lookup tables, or
+    exactly with `method="exact"`. Elements for which any argument is zero are
+    NaN.
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `method`: "table" or "exact"
+    `tables`: tables to use, defaults to those in `DEFAULT_DIRECTORY`
+    """
+
+    _check_method(method)
+    if method == "exact":
+        return batch.calc_nondim_fill_volume(height, width, inlet_width)
+
+    tables = load_tables() if tables is None else tables
+    height, width, inlet_width = batch._broadcast(height, width, inlet_width)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        height_ratio = height / width
+        inlet_ratio = inlet_width / width
+
+    inside = tables.contains(height_ratio, inlet_ratio)
+    if inside.all():
+        return tables.interp_nondim_fill_volume(height_ratio, inlet_ratio)
+
+    nondim_volume = np.empty_like(height)
+    nondim_volume[inside] = tables.interp_nondim_fill_volume(
+        height_ratio[inside], inlet_ratio[inside]
+    )
+    nondim_volume[~inside] = batch.calc_nondim_fill_volume(
+        height[~inside], width[~inside], inlet_width[~inside]
+    )
+
+    return nondim_volume
+
+
+# -------------------------------------------------------------------------------------
+def calc_alpha(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+    method: str = "table",
+    tables: Optional[LookupTables] = None,
+) -> np.ndarray:
+    """
+    Calculate the sequeezing coefficient, alpha, from the lookup tables, or
+    exactly with `method="exact"`
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_gutter`: volumetric flow rate of gutter
+    `method`: "table" or "exact"
+    `tables`: tables to use, defaults to those in `DEFAULT_DIRECTORY`
+    """
+
+    _check_method(method)
+    args = batch._broadcast(height, width, inlet_width, epsilon, flow_cont, flow_gutter)
+    if method == "exact":
+        return batch._calc_alpha(*args)
+
+    tables = load_tables() if tables is None else tables
+    height, width, inlet_width, epsilon, flow_cont, flow_gutter = args
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        height_ratio = height / width
+        inlet_ratio = inlet_width / width
+        epsilon_ratio = epsilon / width
+        gutter_ratio = flow_gutter / flow_cont
+
+    inside = tables.contains(height_ratio, inlet_ratio, epsilon_ratio)
+    if inside.all():
+        return tables.interp_alpha(
+            height_ratio, inlet_ratio, epsilon_ratio, gutter_ratio
+        )
+
+    alpha = np.empty_like(height)
+    alpha[inside] = tables.interp_alpha(
+        height_ratio[inside],
+        inlet_ratio[inside],
+        epsilon_ratio[inside],
+        gutter_ratio[inside],
+    )
+    alpha[~inside] = batch._calc_alpha(*(arg[~inside] for arg in args))
+
+    return alpha
+
+
+# -------------------------------------------------------------------------------------
+def _interpolate(
+    table: np.ndarray, axes: list[Axis], points: Sequence[npt.ArrayLike]
+) -> np.ndarray:
+    """
+    Multilinear interpolation on a uniform grid. Points are assumed to lie
+    within the grid.
+
+    Arguments:
+    `table`: values at the grid points
+    `axes`: grid of each dimension of `table`
+    `points`: coordinates of the query points along each axis
+    """
+
+    index, fractions, strides = _locate(axes, points)
+    flat_table = np.ravel(table)
+
+    # Weighted sum over the corners of the grid cell containing each point
+    value = np.zeros(index.shape)
+    for corner in np.ndindex(*(2,) * len(axes)):
+        weight = np.ones(index.shape)
+        for upper, fraction in zip(corner, fractions):
+            weight *= fraction if upper else 1 - fraction
+        offset = sum(upper * stride for upper, stride in zip(corner, strides))
+        value += weight * flat_table.take(index + offset)
+
+    return value
+
+
+# -------------------------------------------------------------------------------------
+def _locate(
+    axes: list[Axis], points: Sequence[npt.ArrayLike]
+) -> tuple[np.ndarray, list[np.ndarray], list[int]]:
+    """
+    Find the flat index of the lower corner of the grid cell containing each
+    point, and the fractional position of the point within the cell
+
+    Arguments:
+    `axes`: grid of each dimension
+    `points`: coordinates of the query points along each axis
+    """
+
+    # Tables are C-ordered, so the last axis is contiguous
+    strides = [1]
+    for axis in axes[:0:-1]:
+        strides.insert(0, strides[0] * axis.num)
+
+    index = np.zeros(np.broadcast(*points).shape, dtype=np.intp)
+    fractions = []
+    for axis, stride, point in zip(axes, strides, points):
+        step = (axis.stop - axis.start) / (axis.num - 1)
+        position = (np.asarray(point, dtype=float) - axis.start) / step
+        lower = np.clip(np.floor(position), 0, axis.num - 2)
+        index += lower.astype(np.intp) * stride
+        fractions.append(position - lower)
+
+    return index, fractions, strides
+
+
+# -------------------------------------------------------------------------------------
+def _measure_error(tables: LookupTables, n_check: int) -> dict[str, float]:
+    """
+    Find the largest relative interpolation error at the center of every grid
+    cell and at random points
+
+    Arguments:
+    `tables`: tables to check
+    `n_check`: number of random points
+    """
+
+    height_ratio, inlet_ratio = _check_points(
+        [tables.axes["height_ratio"], tables.axes["inlet_ratio"]], n_check
+    )
+    fill_error = _rel_error(
+        tables.interp_nondim_fill_volume(height_ratio, inlet_ratio),
+        batch.calc_nondim_fill_volume(height_ratio, 1.0, inlet_ratio),
+    )
+
+    height_ratio, inlet_ratio, epsilon_ratio = _check_points(
+        [
+            tables.axes[name]
+            for name in ["height_ratio", "inlet_ratio", "epsilon_ratio"]
+        ],
+        n_check,
+    )
+    alpha_error = _rel_error(
+        tables.interp_alpha(height_ratio, inlet_ratio, epsilon_ratio),
+        batch._calc_alpha(height_ratio, 1.0, inlet_ratio, epsilon_ratio, 1.0, 0.0),
+    )
+
+    return {"fill_volume": fill_error, "alpha": alpha_error}
+
+
+# -------------------------------------------------------------------------------------
+def _check_points(axes: list[Axis], n_check: int) -> list[np.ndarray]:
+    """
+    Get the center of every grid cell followed by `n_check` random points
+
+    Arguments:
+    `axes`: grid of each dimension
+    `n_check`: number of random points
+    """
+
+    rng = np.random.default_rng(0)
+    values = [_axis_values(axis) for axis in axes]
+    centers = np.meshgrid(
+        *((value[:-1] + value[1:]) / 2 for value in values), indexing="ij"
+    )
+
+    return [
+        np.concatenate([center.ravel(), rng.uniform(axis.start, axis.stop, n_check)])
+        for center, axis in zip(centers, axes)
+    ]
+
+
+# -------------------------------------------------------------------------------------
+def _rel_error(approx: np.ndarray, exact: np.ndarray) -> float:
+    """
+    Calculate the largest relative error
+
+    Arguments:
+    `approx`: approximate values
+    `exact`: exact values
+    """
+
+    return float(np.max(np.abs(approx - exact) / np.abs(exact)))
+
+
+# -------------------------------------------------------------------------------------
+def _axis_values(axis: Axis) -> np.ndarray:
+    """
+    Get the grid points of an axis
+
+    Arguments:
+    `axis`: grid specification
+    """
+
+    return np.linspace(axis.start, axis.stop, axis.num)
+
+
+# -------------------------------------------------------------------------------------
+def _check_method(method: str) -> None:
+    """
+    Raise an error for unknown methods
+
+    Arguments:
+    `method`: requested method
+    """
+
+    if method not in METHODS:
+        raise ValueError(f'Unknown method "{method}", expected one of {METHODS}')
@@ -0,0 +1,415 @@
+"""
+Tolerance
+~~~
+Monte Carlo propagation of fabrication tolerances to the total volume.
+
+Each input of each design is perturbed by a relative, normally distributed
+error, and the total volume is evaluated for whole blocks of samples at once.
+The mean, variance and quantiles of every design are updated block by block,
+so memory use depends on the block size and not on the number of samples.
+Samples giving a NaN or infinite volume are counted, but left out of the
+statistics.
+
+Designs are split into chunks, and each chunk draws its samples from its own
+random stream, derived from the seed and the chunk index. Results therefore
+depend on the seed, chunk size and block size, but not on the number of
+worker processes.
+
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import os
+from typing import Mapping, NamedTuple, Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from t_junction_model import batch, parallel, sweep
+
+# pylint: disable=protected-access
+
+PARAMETERS = batch.PARAMETERS
+
+
+class ToleranceResult(NamedTuple):
+    """Statistics of the total volume of each design"""
+
+    mean: np.ndarray
+    std: np.ndarray
+    quantiles: dict[float, np.ndarray]
+    n_samples: int
+    n_nonfinite: np.ndarray  # Samples of each design that gave NaN or inf
+
+
+# -------------------------------------------------------------------------------------
+class StreamingStats:
+    """
+    Running mean, variance and histogram of samples of many designs. NaN and
+    infinite samples are counted, but left out of the statistics
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, n_designs: int, n_bins: int = 1024) -> None:
+        """
+        Create empty statistics
+
+        Arguments:
+        `n_designs`: number of designs
+        `n_bins`: histogram bins per design, used to estimate quantiles,
+        must be even
+        """
+
+        if n_bins < 2 or n_bins % 2:
+            raise ValueError(f"n_bins must be a positive even number, got {n_bins}")
+
+        self.n_bins = n_bins
+        self.count = np.zeros(n_designs, dtype=np.int64)
+        self.n_nonfinite = np.zeros(n_designs, dtype=np.int64)
+        self.mean = np.zeros(n_designs)
+        self.m_2 = np.zeros(n_designs)
+        self.minimum = np.full(n_designs, np.inf)
+        self.maximum = np.full(n_designs, -np.inf)
+        self.counts = np.zeros((n_designs, n_bins), dtype=np.int64)
+        self.lower = np.zeros(n_designs)
+        self.upper = np.zeros(n_designs)
+
+    def update(self, samples: np.ndarray) -> None:
+        """
+        Add a block of samples. The histogram range is set from the first
+        block, widened by half its spread on either side. When later samples
+        fall outside it, the range is doubled and pairs of bins are merged
+        until they fit.
+
+        Arguments:
+        `samples`: array of shape (number of designs, samples in the block)
+        """
+
+        finite = np.isfinite(samples)
+        n_block = finite.sum(axis=1)
+        self.n_nonfinite += samples.shape[1] - n_block
+        self._update_moments(samples, finite, n_block)
+
+        # Designs without finite samples in the block are left as they are
+        block_min = np.where(finite, samples, np.inf).min(axis=1)
+        block_max = np.where(finite, samples, -np.inf).max(axis=1)
+        first = (self.count == 0) & (n_block > 0)
+        spread = block_max[first] - block_min[first]
+        self.lower[first] = block_min[first] - spread / 2
+        self.upper[first] = block_max[first] + spread / 2
+        self._widen(block_min, block_max)
+
+        self.count += n_block
+        self.minimum = np.minimum(self.minimum, block_min)
+        self.maximum = np.maximum(self.maximum, block_max)
+
+        bins = self._bin(np.where(finite, samples, self.lower[:, np.newaxis]))
+        offsets = np.arange(len(samples))[:, np.newaxis] * self.n_bins
+        self.counts += np.bincount(
+            (bins + offsets)[finite], minlength=self.counts.size
+        ).reshape(self.counts.shape)
+
+    def _update_moments(
+        self, samples: np.ndarray, finite: np.ndarray, n_block: np.ndarray
+    ) -> None:
+        """
+        Combine the mean and sum of squared deviations of the finite samples of
+        a block with the running ones (Chan et al.), before `count` is updated
+
+        Arguments:
+        `samples`: array of shape (number of designs, samples in the block)
+        `finite`: mask of the finite samples
+        `n_block`: number of finite samples of each design
+        """
+
+        block_mean = np.divide(
+            np.where(finite, samples, 0.0).sum(axis=1),
+            n_block,
+            out=np.zeros(len(samples)),
+            where=n_block > 0,
+        )
+        deviations = np.where(finite, samples - block_mean[:, np.newaxis], 0.0)
+
+        n_total = self.count + n_block
+        weight = np.divide(
+            n_block, n_total, out=np.zeros(len(samples)), where=n_total > 0
+        )
+        delta = block_mean - self.mean
+        self.mean += delta * weight
+        self.m_2 += (deviations**2).sum(axis=1) + delta**2 * self.count * weight
+
+    def std(self) -> np.ndarray:
+        """
+        Get the sample standard deviation of each design, NaN for designs
+        with fewer than two finite samples
+        """
+
+        return np.sqrt(
+            np.divide(
+                self.m_2,
+                self.count - 1,
+                out=np.full_like(self.mean, np.nan),
+                where=self.count > 1,
+            )
+        )
+
+    def quantile(self, prob: float) -> np.ndarray:
+        """
+        Estimate a quantile of each design from the histogram, interpolating
+        linearly within a bin. The error is at most one bin width.
+
+        Designs without finite samples give NaN.
+
+        Arguments:
+        `prob`: probability, between 0 and 1
+        """
+
+        if not 0 <= prob <= 1:
+            raise ValueError(f"Quantile must be between 0 and 1, got {prob}")
+
+        sampled = self.count > 0
+        if not np.any(sampled):
+            return np.full_like(self.mean, np.nan)
+
+        cumulative = np.cumsum(self.counts, axis=1)
+        target = prob * self.count
+        index = np.minimum(
+            (cumulative < target[:, np.newaxis]).sum(axis=1), self.n_bins - 1
+        )
+
+        rows = np.arange(len(self.counts))
+        below = cumulative[rows, index] - self.counts[rows, index]
+        fraction = (target - below) / np.maximum(self.counts[rows, index], 1)
+
+        # Bins never extend past the smallest and largest sample
+        bin_width = (self.upper - self.lower) / self.n_bins
+        left = np.maximum(self.lower + index * bin_width, self.minimum)
+        right = np.minimum(self.lower + (index + 1) * bin_width, self.maximum)
+
+        with np.errstate(invalid="ignore"):
+            value = np.clip(
+                left + fraction * (right - left), self.minimum, self.maximum
+            )
+
+        return np.where(sampled, value, np.nan)
+
+    def _widen(self, block_min: np.ndarray, block_max: np.ndarray) -> None:
+        """
+        Widen the histogram range of each design until it holds a new block
+
+        Arguments:
+        `block_min`: smallest finite sample of each design in the block, inf
+        if there is none
+        `block_max`: largest finite sample of each design in the block, -inf
+        if there is none
+        """
+
+        # Without spread all samples so far are equal, so the range can be
+        # set as for a first block and their bin found again
+        flat = (self.upper == self.lower) & (
+            (block_min < self.lower) | (block_max > self.upper)
+        )
+        if np.any(flat):
+            value = self.minimum[flat]
+            low = np.minimum(value, block_min[flat])
+            high = np.maximum(value, block_max[flat])
+            self.lower[flat] = low - (high - low) / 2
+            self.upper[flat] = high + (high - low) / 2
+
+            bins = np.floor(
+                (value - self.lower[flat]) * self.n_bins / (high - low) / 2
+            ).astype(np.int64)
+            rows = np.flatnonzero(flat)
+            self.counts[rows] = 0
+            self.counts[rows, np.clip(bins, 0, self.n_bins - 1)] = self.count[rows]
+
+        half = self.n_bins // 2
+        while True:
+            above = block_max > self.upper
+            below = ~above & (block_min < self.lower)
+            if not np.any(above | below):
+                return
+
+            # Doubling the range merges each pair of bins into one, which goes
+            # in the half of the new range that covers the old one
+            span = self.upper - self.lower
+            merged = self.counts.reshape(len(self.counts), half, 2).sum(axis=2)
+
+            self.counts[above, :half] = merged[above]
+            self.counts[above, half:] = 0
+            self.upper[above] = self.lower[above] + 2 * span[above]
+
+            self.counts[below, half:] = merged[below]
+            self.counts[below, :half] = 0
+            self.lower[below] = self.upper[below] - 2 * span[below]
+
+    def _bin(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Get the histogram bin of each sample
+
+        Arguments:
+        `samples`: array of shape (number of designs, samples in the block)
+        """
+
+        span = self.upper - self.lower
+        scale = np.divide(self.n_bins, span, out=np.zeros_like(span), where=span > 0)[
+            :, np.newaxis
+        ]
+
+        bins = np.floor((samples - self.lower[:, np.newaxis]) * scale)
+
+        return np.clip(bins, 0, self.n_bins - 1).astype(np.int64)
+
+
+# -------------------------------------------------------------------------------------
+def propagate_tolerances(
+    designs: Mapping[str, npt.ArrayLike],
+    tolerances: Mapping[str, float],
+    n_samples: int = 10_000,
+    quantiles: Sequence[float] = (0.025, 0.5, 0.975),
+    seed: int = 0,
+    block_size: int = 1_000,
+    chunk_size: int = 1_000,
+    workers: Optional[int] = 1,
+) -> ToleranceResult:
+    """
+    Calculate the mean, standard deviation and quantiles of the total volume of
+    each design when its inputs are subject to random fabrication errors
+
+    Arguments:
+    `designs`: nominal value(s) of each input in `PARAMETERS`, broadcast
+    against each other to give the designs
+    `tolerances`: relative standard deviation of the error of some inputs,
+    *e.g.* `{"height": 0.03}` for a 3% error in height
+    `n_samples`: samples per design
+    `quantiles`: probabilities of the quantiles to estimate
+    `seed`: seed of the random streams
+    `block_size`: samples per design evaluated at once
+    `chunk_size`: designs per unit of work
+    `workers`: number of worker processes, `None` for the number of CPUs
+    """
+
+    unexpected = set(tolerances) - set(PARAMETERS)
+    if unexpected:
+        raise ValueError(f"Unknown tolerance inputs: {', '.join(sorted(unexpected))}")
+
+    if n_samples < 1 or block_size < 1:
+        raise ValueError("n_samples and block_size must be positive")
+
+    bounds, chunks = _split_designs(designs, chunk_size)
+    tasks = [
+        (chunk, dict(tolerances), n_samples, block_size, tuple(quantiles), seed, i)
+        for i, chunk in enumerate(chunks)
+    ]
+    workers = min(workers or os.cpu_count() or 1, max(len(bounds), 1))
+
+    # Rows are the mean, standard deviation, non-finite samples and each quantile
+    results = np.empty((3 + len(quantiles), bounds[-1][1] if bounds else 0))
+    for index, chunk_results in parallel.run_tasks(_propagate_chunk, tasks, workers):
+        results[:, slice(*bounds[index])] = chunk_results
+
+    return ToleranceResult(
+        results[0],
+        results[1],
+        dict(zip(quantiles, results[3:])),
+        n_samples,
+        results[2].astype(np.int64),
+    )
+
+
+# -------------------------------------------------------------------------------------
+def draw_samples(
+    nominal: Mapping[str, np.ndarray],
+    tolerances: Mapping[str, float],
+    n_samples: int,
+    rng: np.random.Generator,
+) -> dict[str, np.ndarray]:
+    """
+    Draw perturbed inputs, returning arrays of shape
+    (number of designs, `n_samples`)
+
+    Arguments:
+    `nominal`: 1-D array of the nominal values of each input
+    `tolerances`: relative standard deviation of the error of some inputs
+    `n_samples`: samples per design
+    `rng`: random number generator
+    """
+
+    samples = {}
+    for name in PARAMETERS:
+        values = nominal[name][:, np.newaxis]
+        if tolerances.get(name, 0) == 0:
+            samples[name] = np.broadcast_to(values, (len(values), n_samples))
+        else:
+            errors = rng.standard_normal((len(values), n_samples))
+            samples[name] = values * (1 + tolerances[name] * errors)
+
+    return samples
+
+
+# -------------------------------------------------------------------------------------
+def _propagate_chunk(
+    nominal: dict[str, np.ndarray],
+    tolerances: dict[str, float],
+    n_samples: int,
+    block_size: int,
+    quantiles: tuple[float, ...],
+    seed: int,
+    index: int,
+) -> tuple[int, np.ndarray]:
+    """
+    Sample the total volume of a chunk of designs, returning the chunk index
+    and an array with rows of the mean, standard deviation, number of
+    non-finite samples and each quantile
+
+    Arguments:
+    `nominal`: 1-D array of the nominal values of each input
+    `tolerances`: relative standard deviation of the error of some inputs
+    `n_samples`: samples per design
+    `block_size`: samples per design evaluated at once
+    `quantiles`: probabilities of the quantiles to estimate
+    `seed`: seed of the random streams
+    `index`: chunk index, which selects the chunk's random stream
+    """
+
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+    stats = StreamingStats(len(nominal[PARAMETERS[0]]))
+
+    for start in range(0, n_samples, block_size):
+        samples = draw_samples(
+            nominal, tolerances, min(block_size, n_samples - start), rng
+        )
+        # Samples past the limits of the model give NaN, which stats counts
+        with np.errstate(divide="ignore", invalid="ignore"):
+            volumes = batch.calc_total_volume(*(samples[name] for name in PARAMETERS))
+        stats.update(volumes)
+
+    mean = np.where(stats.count > 0, stats.mean, np.nan)
+
+    return index, np.array(
+        [mean, stats.std(), stats.n_nonfinite] + [stats.quantile(p) for p in quantiles]
+    )
+
+
+# -------------------------------------------------------------------------------------
+def _split_designs(
+    designs: Mapping[str, npt.ArrayLike], chunk_size: int
+) -> tuple[list[tuple[int, int]], list[dict[str, np.ndarray]]]:
+    """
+    Broadcast the inputs of the designs to 1-D arrays and split them into
+    chunks, returning the bounds and inputs of each chunk
+
+    Arguments:
+    `designs`: nominal value(s) of each input in `PARAMETERS`
+    `chunk_size`: designs per chunk
+    """
+
+    nominal = [
+        arg.ravel() for arg in batch._broadcast(*(designs[p] for p in PARAMETERS))
+    ]
+    bounds = sweep.calc_shard_bounds(len(nominal[0]), chunk_size)
+
+    return bounds, [
+        dict(zip(PARAMETERS, (values[start:stop] for values in nominal)))
+        for start, stop in bounds
+    ]
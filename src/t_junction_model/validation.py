@@ -0,0 +1,147 @@
+"""
+Validation
+~~~
+Array-wide checks of model inputs, with a reason code for each invalid row.
+
+The scalar functions return `None` for some invalid inputs and raise or return
+meaningless numbers for others, so a batch caller would have to screen rows one
+by one. `validate()` checks whole arrays at once and returns one small integer
+per row, whose bits (`Reason` flags) say why the row is invalid, with 0 meaning
+valid. `calc_predictions()` evaluates the batch model on the valid rows only and
+fills the others with NaN, so a bad row never interrupts the batch.
+
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import enum
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+from t_junction_model import batch
+
+# pylint: disable=protected-access
+
+
+class Reason(enum.IntFlag):
+    """Reasons a row of inputs is invalid, combined as bits"""
+
+    NON_FINITE = 1  # Any input is NaN or infinite
+    NEGATIVE = 2  # Any input is negative
+    ZERO_DIMENSION = 4  # Height, width or inlet width is zero
+    ZERO_FLOW = 8  # Continuous phase flow rate is zero
+    GUTTER_FLOW = 16  # Gutter flow is at least the continuous phase flow
+    PINCH_WIDTH = 32  # Pinch width is negative, epsilon > h * w / (h + w)
+    PINCH_ROOT = 64  # Square root in the pinching radius has a negative argument
+
+
+class ValidatedPredictions(NamedTuple):
+    """Predictions, NaN for invalid rows, and the reason code of each row"""
+
+    predictions: dict[str, np.ndarray]
+    reasons: np.ndarray
+
+
+# -------------------------------------------------------------------------------------
+def validate(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_disp: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+) -> np.ndarray:
+    """
+    Check the inputs of many designs, returning a `uint8` array of `Reason`
+    codes, 0 where the design is valid
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_disp`: volumetric flow rate of dispersed phase
+    `flow_gutter`: volumetric flow rate of gutter
+    """
+
+    args = batch._broadcast(
+        height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter
+    )
+    height, width, inlet_width, epsilon, flow_cont, _, flow_gutter = args
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pinch_width = height * width / (height + width) - epsilon
+        root_arg = 2 * (inlet_width - pinch_width) * (width - pinch_width)
+
+    checks = [
+        (Reason.NON_FINITE, ~np.all(np.isfinite(args), axis=0)),
+        (Reason.NEGATIVE, np.any(np.less(args, 0), axis=0)),
+        (Reason.ZERO_DIMENSION, (height == 0) | (width == 0) | (inlet_width == 0)),
+        (Reason.ZERO_FLOW, flow_cont == 0),
+        (Reason.GUTTER_FLOW, (flow_gutter >= flow_cont) & (flow_cont != 0)),
+        (Reason.PINCH_WIDTH, pinch_width < 0),
+        (Reason.PINCH_ROOT, root_arg < 0),
+    ]
+
+    reasons = np.zeros(height.shape, dtype=np.uint8)
+    for reason, failed in checks:
+        reasons[failed] |= np.uint8(reason)
+
+    return reasons
+
+
+# -------------------------------------------------------------------------------------
+def describe(code: int) -> list[str]:
+    """
+    Get the names of the reasons in a reason code
+
+    Arguments:
+    `code`: reason code from `validate()`
+    """
+
+    return [str(reason.name) for reason in Reason if int(code) & reason]
+
+
+# -------------------------------------------------------------------------------------
+def calc_predictions(
+    height: npt.ArrayLike,
+    width: npt.ArrayLike,
+    inlet_width: npt.ArrayLike,
+    epsilon: npt.ArrayLike,
+    flow_cont: npt.ArrayLike,
+    flow_disp: npt.ArrayLike,
+    flow_gutter: npt.ArrayLike,
+) -> ValidatedPredictions:
+    """
+    Validate the inputs and calculate the fill volume, squeezing coefficient,
+    squeeze volume and total volume of the valid designs. Predictions of
+    invalid designs are NaN.
+
+    Arguments:
+    `height`: channel height
+    `width`: channel width
+    `inlet_width`: inlet channel width
+    `epsilon`: corner roundness
+    `flow_cont`: volumetric flow rate of continuous phase
+    `flow_disp`: volumetric flow rate of dispersed phase
+    `flow_gutter`: volumetric flow rate of gutter
+    """
+
+    args = batch._broadcast(
+        height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter
+    )
+    reasons = validate(*args)
+    valid = reasons == 0
+
+    if valid.all():
+        return ValidatedPredictions(batch.calc_predictions(*args), reasons)
+
+    predictions = {}
+    for name, values in batch.calc_predictions(*(arg[valid] for arg in args)).items():
+        predictions[name] = np.full(reasons.shape, np.nan)
+        predictions[name][valid] = values
+
+    return ValidatedPredictions(predictions, reasons)
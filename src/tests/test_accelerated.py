@@ -0,0 +1,178 @@
+"""
+Unit tests for the functions in the accelerated module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import importlib
+import sys
+
+import numpy as np
+import pytest
+
+from t_junction_model import accelerated, filling, squeezing, total
+
+# pylint: disable=protected-access
+
+GEOMETRY = ["height", "width", "inlet_width", "epsilon"]
+AVAILABLE_BACKENDS = ["python", "numpy"] + (["numba"] if accelerated.HAS_NUMBA else [])
+
+
+# -------------------------------------------------------------------------------------
+def random_designs(size: int = 500) -> dict[str, np.ndarray]:
+    """Random designs spanning both filling branches"""
+
+    rng = np.random.default_rng(0)
+    width = rng.uniform(50, 200, size) * 10**-6
+    height = width * rng.uniform(0.05, 1.0, size)
+    inlet_width = width * rng.uniform(0.55, 3.5, size)
+    epsilon = width * rng.uniform(0.0, 0.1, size)
+    flow_cont = rng.uniform(1, 5, size) * 10**-9
+    flow_disp = flow_cont * rng.uniform(0.01, 10, size)
+    flow_gutter = flow_cont * rng.uniform(0.0, 0.3, size)
+
+    return {
+        "height": height,
+        "width": width,
+        "inlet_width": inlet_width,
+        "epsilon": epsilon,
+        "flow_cont": flow_cont,
+        "flow_disp": flow_disp,
+        "flow_gutter": flow_gutter,
+    }
+
+
+# -------------------------------------------------------------------------------------
+def test_parity() -> None:
+    """Every available backend matches the scalar functions"""
+
+    designs = random_designs()
+    geometry = {name: designs[name] for name in GEOMETRY}
+    flows = {name: designs[name] for name in ["flow_cont", "flow_gutter"]}
+    rows = [dict(zip(designs, map(float, row))) for row in zip(*designs.values())]
+
+    expected = {
+        "fill_volume": [
+            filling.calc_fill_volume(*[row[name] for name in GEOMETRY[:3]])
+            for row in rows
+        ],
+        "alpha": [
+            squeezing._calc_alpha(**{name: row[name] for name in [*GEOMETRY, *flows]})
+            for row in rows
+        ],
+        "squeezing_volume": [squeezing.calc_squeezing_volume(**row) for row in rows],
+        "total_volume": [total.calc_total_volume(**row) for row in rows],
+        "nondim_total_volume": [total.calc_nondim_total_volume(**row) for row in rows],
+    }
+
+    for backend in AVAILABLE_BACKENDS:
+        actual = {
+            "fill_volume": accelerated.calc_fill_volume(
+                designs["height"],
+                designs["width"],
+                designs["inlet_width"],
+                backend=backend,
+            ),
+            "alpha": accelerated.calc_alpha(**geometry, **flows, backend=backend),
+            "squeezing_volume": accelerated.calc_squeezing_volume(
+                **designs, backend=backend
+            ),
+            "total_volume": accelerated.calc_total_volume(**designs, backend=backend),
+            "nondim_total_volume": accelerated.calc_nondim_total_volume(
+                **designs, backend=backend
+            ),
+        }
+
+        for name, values in actual.items():
+            assert list(values) == pytest.approx(expected[name], rel=1e-13), name
+
+
+# -------------------------------------------------------------------------------------
+def test_python_kernels() -> None:
+    """Uncompiled kernels give exactly the numbers of the scalar functions"""
+
+    kernels = accelerated._make_kernels(lambda function: function)
+    designs = random_designs(50)
+    out = np.empty(50)
+
+    kernels["total_volume"](*designs.values(), out)
+
+    assert list(out) == [
+        total.calc_total_volume(*map(float, row)) for row in zip(*designs.values())
+    ]
+
+
+# -------------------------------------------------------------------------------------
+def test_broadcasting() -> None:
+    """Arguments broadcast against each other, with NaN where scalar is None"""
+
+    heights = np.array([[0.0], [10.0], [33.0]]) * 10**-6
+    flow_disps = np.array([1.0, 2.0]) * 10**-9
+
+    for backend in AVAILABLE_BACKENDS:
+        actual = accelerated.calc_nondim_total_volume(
+            heights,
+            10**-4,
+            10**-4,
+            10**-5,
+            10**-9,
+            flow_disps,
+            10**-10,
+            backend,
+        )
+
+        assert actual.shape == (3, 2)
+        assert np.isnan(actual[0]).all()
+        assert actual[2, 1] == pytest.approx(
+            total.calc_nondim_total_volume(
+                33 * 10**-6,
+                10**-4,
+                10**-4,
+                10**-5,
+                10**-9,
+                2 * 10**-9,
+                10**-10,
+            )
+        )
+
+
+# -------------------------------------------------------------------------------------
+def test_set_backend() -> None:
+    """Test set_backend() and get_backend()"""
+
+    original = accelerated.get_backend()
+
+    try:
+        accelerated.set_backend("numpy")
+        assert accelerated.get_backend() == "numpy"
+
+        with pytest.raises(ValueError, match="Unknown backend"):
+            accelerated.set_backend("fortran")
+
+        with pytest.raises(ValueError, match="Unknown backend"):
+            accelerated.calc_fill_volume(1.0, 1.0, 1.0, backend="fortran")
+
+    finally:
+        accelerated.set_backend(original)
+
+
+# -------------------------------------------------------------------------------------
+def test_fallback(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Import falls back to the pure-Python functions without Numba"""
+
+    monkeypatch.setitem(sys.modules, "numba", None)
+
+    try:
+        module = importlib.reload(accelerated)
+
+        assert not module.HAS_NUMBA
+        assert module.get_backend() == "python"
+        assert module.calc_fill_volume(2.0, 3.0, 4.0) == filling.calc_fill_volume(
+            2.0, 3.0, 4.0
+        )
+
+        with pytest.raises(ValueError, match="not installed"):
+            module.set_backend("numba")
+
+    finally:
+        monkeypatch.undo()
+        importlib.reload(accelerated)
@@ -0,0 +1,333 @@
+"""
+Unit tests for the functions in the batch module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import itertools
+import math
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from t_junction_model import batch, filling, squeezing, total
+
+# pylint: disable=protected-access
+
+HEIGHTS = [10.0, 33.0, 80.0]
+WIDTHS = [100.0, 150.0]
+INLET_WIDTH_RATIOS = [0.6, 1.0, 4 / 3, 3.0]
+
+
+# -------------------------------------------------------------------------------------
+def design_grid() -> dict[str, np.ndarray]:
+    """Flattened grid of designs spanning both filling branches"""
+
+    rows = [
+        (height, width, ratio * width, 0.1 * width, 3.0, flow_ratio * 3.0, 0.3)
+        for height, width, ratio, flow_ratio in itertools.product(
+            HEIGHTS, WIDTHS, INLET_WIDTH_RATIOS, [0.1, 2.0]
+        )
+    ]
+    return {name: np.array(col) for name, col in zip(batch.PARAMETERS, zip(*rows))}
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_fill_volume() -> None:
+    """Test calc_fill_volume()"""
+
+    grid = design_grid()
+    args = (grid["height"], grid["width"], grid["inlet_width"])
+
+    actual = batch.calc_fill_volume(*args)
+    expected = [filling.calc_fill_volume(*map(float, row)) for row in zip(*args)]
+
+    assert actual.shape == grid["height"].shape
+    assert list(actual) == pytest.approx(expected, rel=1e-14)
+
+    # Scalars give 0-d arrays
+    assert batch.calc_fill_volume(2.0, 3.0, 4.0) == pytest.approx(
+        filling.calc_fill_volume(2.0, 3.0, 4.0), rel=1e-14
+    )
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_incorrect_fill_volume() -> None:
+    """Test calc_incorrect_fill_volume()"""
+
+    grid = design_grid()
+    args = (grid["height"], grid["width"], grid["inlet_width"])
+
+    actual = batch.calc_incorrect_fill_volume(*args)
+    expected = [
+        filling.calc_incorrect_fill_volume(*map(float, row)) for row in zip(*args)
+    ]
+
+    assert list(actual) == pytest.approx(expected, rel=1e-14)
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_nondim_fill_volume() -> None:
+    """Test calc_nondim_fill_volume()"""
+
+    heights = np.array([0.0, 1.0, 1.0, 2.0])
+    widths = np.array([1.0, 0.0, 1.0, 3.0])
+    inlet_widths = np.array([1.0, 1.0, 0.0, 4.0])
+
+    for function, scalar_function in [
+        (batch.calc_nondim_fill_volume, filling.calc_nondim_fill_volume),
+        (
+            batch.calc_incorrect_nondim_fill_volume,
+            filling.calc_incorrect_nondim_fill_volume,
+        ),
+    ]:
+        actual = function(heights, widths, inlet_widths)
+
+        # NaN where scalar function returns None
+        assert np.isnan(actual[:3]).all()
+        assert actual[3] == pytest.approx(scalar_function(2.0, 3.0, 4.0), rel=1e-14)
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_alpha() -> None:
+    """Test _calc_alpha()"""
+
+    grid = design_grid()
+    names = ["height", "width", "inlet_width", "epsilon", "flow_cont", "flow_gutter"]
+    args = [grid[name] for name in names]
+
+    actual = batch._calc_alpha(*args)
+    expected = [squeezing._calc_alpha(*map(float, row)) for row in zip(*args)]
+
+    assert list(actual) == pytest.approx(expected, rel=1e-14)
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_fill_radius() -> None:
+    """Test _calc_fill_radius()"""
+
+    actual = batch._calc_fill_radius([1.0, 3.0], 2.0)
+
+    assert list(actual) == [2.0, 3.0]
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_total_volume() -> None:
+    """Test calc_total_volume() and calc_nondim_total_volume()"""
+
+    grid = design_grid()
+    args = list(grid.values())
+
+    for function, scalar_function in [
+        (batch.calc_total_volume, total.calc_total_volume),
+        (batch.calc_nondim_total_volume, total.calc_nondim_total_volume),
+        (batch.calc_squeezing_volume, squeezing.calc_squeezing_volume),
+        (batch.calc_nondim_squeeze_volume, squeezing.calc_nondim_squeeze_volume),
+    ]:
+        actual = function(*args)
+        expected = [scalar_function(*map(float, row)) for row in zip(*args)]
+
+        assert list(actual) == pytest.approx(expected, rel=1e-14)
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_predictions() -> None:
+    """Test calc_predictions()"""
+
+    grid = design_grid()
+    predictions = batch.calc_predictions(**grid)
+
+    assert tuple(predictions) == batch.PREDICTIONS
+    assert list(predictions["fill_volume"]) == list(
+        batch.calc_fill_volume(grid["height"], grid["width"], grid["inlet_width"])
+    )
+    assert list(predictions["squeeze_volume"]) == list(
+        batch.calc_squeezing_volume(**grid)
+    )
+    assert list(predictions["total_volume"]) == list(batch.calc_total_volume(**grid))
+
+
+# -------------------------------------------------------------------------------------
+def random_designs(n_designs: int) -> tuple[np.ndarray, ...]:
+    """
+    Random designs in SI units, with the inlet wider than the pinch width by at
+    least 1% of the channel width
+    """
+
+    rng = np.random.default_rng(0)
+
+    width = 10 ** rng.uniform(-6, -3, n_designs)
+    height = width * rng.uniform(0.05, 2.0, n_designs)
+    pinch_width = height * width / (height + width)
+    epsilon = pinch_width * rng.uniform(0, 0.9, n_designs)
+    inlet_width = np.maximum(
+        width * rng.uniform(0.1, 5.0, n_designs), pinch_width - epsilon + 0.01 * width
+    )
+    flow_cont = 10 ** rng.uniform(-13, -8, n_designs)
+
+    return (
+        height,
+        width,
+        inlet_width,
+        epsilon,
+        flow_cont,
+        flow_cont * 10 ** rng.uniform(-2, 2, n_designs),
+        flow_cont * rng.uniform(0, 0.9, n_designs),
+    )
+
+
+# -------------------------------------------------------------------------------------
+def scalar_predictions(
+    height: float,
+    width: float,
+    inlet_width: float,
+    epsilon: float,
+    flow_cont: float,
+    flow_disp: float,
+    flow_gutter: float,
+) -> dict[str, float]:
+    """Results of calc_predictions() for one design, from the scalar modules"""
+
+    design = (height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter)
+
+    return {
+        "fill_volume": filling.calc_fill_volume(height, width, inlet_width),
+        "alpha": squeezing._calc_alpha(
+            height, width, inlet_width, epsilon, flow_cont, flow_gutter
+        ),
+        "squeeze_volume": squeezing.calc_squeezing_volume(*design),
+        "total_volume": total.calc_total_volume(*design),
+    }
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_predictions_float32() -> None:
+    """Single precision results are within the documented error bounds"""
+
+    designs = dict(zip(batch.PARAMETERS, random_designs(2000)))
+    predictions = batch.calc_predictions(**designs, dtype=np.float32)
+
+    rows = [
+        scalar_predictions(**dict(zip(batch.PARAMETERS, map(float, row))))
+        for row in zip(*designs.values())
+    ]
+    expected = {name: [row[name] for row in rows] for name in batch.PREDICTIONS}
+
+    for name in batch.PREDICTIONS:
+        assert predictions[name].dtype == np.float32
+        error = np.abs(predictions[name] / np.array(expected[name]) - 1)
+        assert error.max() <= batch.FLOAT32_MAX_REL_ERROR[name]
+
+
+# -------------------------------------------------------------------------------------
+def test_float32_inputs() -> None:
+    """Calculations stay in single precision only if every input is float32"""
+
+    grid = {name: values.astype(np.float32) for name, values in design_grid().items()}
+
+    assert batch.calc_total_volume(**grid).dtype == np.float32
+    mixed: dict[str, npt.ArrayLike] = {**grid, "height": 33.0}
+    assert batch.calc_total_volume(**mixed).dtype == np.float64
+    assert batch.calc_predictions(**grid)["alpha"].dtype == np.float64
+
+    with pytest.raises(ValueError, match="dtype must be float32 or float64"):
+        batch.calc_predictions(**grid, dtype=np.int64)
+
+
+# -------------------------------------------------------------------------------------
+def test_broadcasting() -> None:
+    """Arguments broadcast against each other"""
+
+    heights = np.linspace(10.0, 50.0, 5)[:, np.newaxis]
+    flow_disps = np.linspace(0.1, 10.0, 7)
+
+    actual = batch.calc_total_volume(heights, 100.0, 100.0, 10.0, 1.0, flow_disps, 0.1)
+
+    assert actual.shape == (5, 7)
+    assert actual[2, 3] == pytest.approx(
+        total.calc_total_volume(30.0, 100.0, 100.0, 10.0, 1.0, flow_disps[3], 0.1),
+        rel=1e-14,
+    )
+    assert not math.isnan(actual.sum())
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_radius() -> None:
+    """Test _calc_radius()"""
+
+    height = 33 * 10**-6
+    width = 100 * 10**-6
+    continuous_flow = 3 * 10**-9
+    gutter_flow = 0.1 * continuous_flow
+    times = np.array([0.0, 0.01, 0.05])
+
+    for inlet_width in [width / 3, width, 3 * width]:
+        actual = batch._calc_radius(
+            height, width, inlet_width, continuous_flow, gutter_flow, times
+        )
+        expected = [
+            squeezing._calc_radius(
+                height, width, inlet_width, continuous_flow, gutter_flow, time
+            )
+            for time in times
+        ]
+
+        assert list(actual) == pytest.approx(expected, rel=1e-12)
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_2r_trajectory() -> None:
+    """Test calc_2r_trajectory()"""
+
+    height = 33 * 10**-6
+    width = 100 * 10**-6
+    inlet_widths = np.array([1 / 3, 1, 3]) * width
+    epsilon = 0.1 * width
+    continuous_flow = 3 * 10**-9
+    gutter_flow = 0.1 * continuous_flow
+    times = np.linspace(0, 0.01, 11)
+
+    actual = batch.calc_2r_trajectory(
+        height, width, inlet_widths, epsilon, continuous_flow, gutter_flow, times
+    )
+
+    assert actual.shape == (3, 11)
+
+    for row, inlet_width in zip(actual, inlet_widths):
+        expected = [
+            squeezing._calc_2r(
+                height, width, inlet_width, epsilon, continuous_flow, gutter_flow, t
+            )
+            for t in times
+        ]
+
+        assert list(row) == pytest.approx(expected, rel=1e-12)
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_pinch_time() -> None:
+    """Test calc_pinch_time()"""
+
+    height = np.array([33.0, 20.0, 50.0]) * 10**-6
+    width = 100 * 10**-6
+    inlet_width = np.array([1 / 3, 1, 3]) * width
+    epsilon = 0.1 * width
+    continuous_flow = 3 * 10**-9
+    gutter_flow = 0.1 * continuous_flow
+
+    pinch_time = batch.calc_pinch_time(
+        height, width, inlet_width, epsilon, continuous_flow, gutter_flow
+    )
+    two_r = batch._calc_2r(
+        height, width, inlet_width, epsilon, continuous_flow, gutter_flow, pinch_time
+    )
+
+    # 2r reaches the threshold h/(h+w) at the pinch time
+    assert list(two_r / width) == pytest.approx(list(height / (height + width)))
+
+    # Dimensionless pinch time is alpha
+    alpha = batch._calc_alpha(
+        height, width, inlet_width, epsilon, continuous_flow, gutter_flow
+    )
+    dimensionless_time = pinch_time * continuous_flow / (height * width**2)
+    assert list(dimensionless_time) == pytest.approx(list(alpha))
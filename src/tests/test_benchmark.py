@@ -0,0 +1,136 @@
+"""
+Unit tests for the functions in the benchmark module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+
+from t_junction_model import batch, benchmark, squeezing, total
+from t_junction_model.benchmark import Benchmark, Comparison
+
+# pylint: disable=protected-access
+
+
+# -------------------------------------------------------------------------------------
+def test_model_benchmarks() -> None:
+    """Benchmarks call the model with valid designs"""
+
+    benchmarks = benchmark.model_benchmarks([1000])
+
+    assert [bench.name for bench in benchmarks] == [
+        "scalar/calc_total_volume",
+        "scalar/_calc_2r",
+        "batch/calc_total_volume/1e+03",
+        "batch/_calc_2r/1e+03",
+    ]
+
+    scalar_total, scalar_2r, batch_total, batch_2r = (
+        bench.function(*bench.setup()) for bench in benchmarks
+    )
+
+    assert scalar_total == pytest.approx(
+        total.calc_total_volume(**benchmark.DESIGN), rel=1e-14
+    )
+    assert 0 < scalar_2r < benchmark.DESIGN["width"]
+    assert batch_total.shape == batch_2r.shape == (1000,)
+    assert np.isfinite(batch_total).all() and np.isfinite(batch_2r).all()
+
+    # Both 2r benchmarks are half way through squeezing
+    design = {
+        key: value for key, value in benchmark.DESIGN.items() if key != "flow_disp"
+    }
+    pinch_time = float(batch.calc_pinch_time(**design))
+    assert scalar_2r == pytest.approx(squeezing._calc_2r(**design, time=pinch_time / 2))
+
+
+# -------------------------------------------------------------------------------------
+def test_time_benchmark() -> None:
+    """Calls are repeated until each run lasts long enough"""
+
+    calls: list[int] = []
+    bench = Benchmark("append", lambda: (1,), calls.append)
+
+    timing = benchmark.time_benchmark(bench, repeat=3, min_time=0.001)
+
+    assert timing.name == "append"
+    assert 0 < timing.best <= timing.mean
+    assert timing.calls >= 1
+
+    # One untimed call, calibration runs of 1, 2, 4, ... calls, then 2 more runs
+    assert len(calls) == 1 + (2 * timing.calls - 1) + 2 * timing.calls
+
+    with pytest.raises(ValueError):
+        benchmark.time_benchmark(bench, repeat=0)
+
+
+# -------------------------------------------------------------------------------------
+def test_history(tmp_path: Path) -> None:
+    """Records are appended to and read from a history file"""
+
+    file = str(tmp_path / "history.jsonl")
+    timings = [benchmark.Timing("a", 1.0, 1.5, 2), benchmark.Timing("b", 2.0, 2.0, 1)]
+
+    for _ in range(2):
+        benchmark.append_history(file, benchmark.make_record(timings, str(tmp_path)))
+
+    history = benchmark.read_history(file)
+
+    assert len(history) == 2
+    assert history[0]["timings"] == {
+        "a": {"best": 1.0, "mean": 1.5, "calls": 2},
+        "b": {"best": 2.0, "mean": 2.0, "calls": 1},
+    }
+
+    # tmp_path is not in a repository
+    assert history[0]["commit"] is None
+    assert history[0]["numpy"] == np.__version__
+
+
+# -------------------------------------------------------------------------------------
+def test_find_baseline() -> None:
+    """Baseline is the previous record, or the latest of a commit"""
+
+    history: list[dict[str, Any]] = [
+        {"commit": "aaa1"},
+        {"commit": "bbb2"},
+        {"commit": "aaa1"},
+        {},
+    ]
+
+    assert benchmark.find_baseline(history) == history[2]
+    assert benchmark.find_baseline(history, "bbb") == history[1]
+    assert benchmark.find_baseline(history, "ccc") is None
+    assert benchmark.find_baseline(history[:1]) is None
+
+
+# -------------------------------------------------------------------------------------
+def test_compare() -> None:
+    """Slowdowns beyond the threshold are flagged"""
+
+    baseline = {"timings": {"a": {"best": 1.0}, "b": {"best": 1.0}, "c": {"best": 1.0}}}
+    current = {"timings": {"a": {"best": 1.05}, "b": {"best": 1.2}, "d": {"best": 1.0}}}
+
+    assert benchmark.compare(baseline, current, 0.1) == [
+        Comparison("a", 1.0, 1.05, 1.05, False),
+        Comparison("b", 1.0, 1.2, 1.2, True),
+    ]
+    assert not any(
+        comparison.slower for comparison in benchmark.compare(baseline, current, 0.5)
+    )
+
+    with pytest.raises(ValueError):
+        benchmark.compare(baseline, current, -0.1)
+
+
+# -------------------------------------------------------------------------------------
+def test_format_seconds() -> None:
+    """Times are shown with a suitable unit"""
+
+    assert benchmark.format_seconds(2.5) == "2.5 s"
+    assert benchmark.format_seconds(0.0123) == "12.3 ms"
+    assert benchmark.format_seconds(4.56e-6) == "4.56 µs"
+    assert benchmark.format_seconds(7e-8) == "70 ns"
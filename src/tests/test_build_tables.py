@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+"""
+Author : Kenneth Schackart <schackartk1@gmail.com>
+Date   : 2023-03-04
+Purpose: Test table building script
+"""
+
+import json
+import os
+import random
+import shutil
+import string
+from subprocess import getstatusoutput
+
+PRG = "src/build_tables.py"
+
+
+# -------------------------------------------------------------------------------------
+def random_string() -> str:
+    """Generate a random string"""
+
+    return "".join(random.choices(string.ascii_uppercase + string.digits, k=5))
+
+
+# -------------------------------------------------------------------------------------
+def test_exists() -> None:
+    """Program exists"""
+
+    assert os.path.isfile(PRG)
+
+
+# -------------------------------------------------------------------------------------
+def test_usage() -> None:
+    """Usage"""
+
+    for flag in ["-h", "--help"]:
+        retval, out = getstatusoutput(f"{PRG} {flag}")
+        assert retval == 0
+        assert out.lower().startswith("usage")
+
+
+# -------------------------------------------------------------------------------------
+def test_bad_points() -> None:
+    """Dies on too few grid points"""
+
+    retval, out = getstatusoutput(f"{PRG} --epsilon-points 1")
+    assert retval != 0
+    assert "--epsilon-points must be at least 2" in out
+
+
+# -------------------------------------------------------------------------------------
+def test_runs_okay() -> None:
+    """Runs on good input"""
+
+    out_dir = random_string()
+
+    try:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+
+        retval, out = getstatusoutput(
+            f"{PRG} -o {out_dir} --height-points 5 --inlet-points 18"
+            " --epsilon-points 3"
+        )
+
+        assert retval == 0
+        assert "Maximum relative error of alpha" in out
+        for out_file in ["fill_volume.npy", "alpha.npy", "metadata.json"]:
+            assert os.path.isfile(os.path.join(out_dir, out_file))
+
+        with open(
+            os.path.join(out_dir, "metadata.json"), encoding="utf-8"
+        ) as metadata_fh:
+            metadata = json.load(metadata_fh)
+        assert metadata["axes"]["inlet_ratio"] == [0.6, 4.0, 18]
+
+    finally:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
@@ -0,0 +1,117 @@
+"""
+Unit tests for the functions in the cache module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import threading
+
+import pytest
+
+from t_junction_model import cache, filling, squeezing, total
+
+# pylint: disable=protected-access
+
+HEIGHT = 33 * 10**-6
+WIDTH = 100 * 10**-6
+INLET_WIDTH = 300 * 10**-6
+EPSILON = 0.1 * WIDTH
+FLOW_CONT = 3 * 10**-9
+FLOW_DISP = 2 * FLOW_CONT
+FLOW_GUTTER = 0.1 * FLOW_CONT
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_fill_volume() -> None:
+    """Test calc_fill_volume()"""
+
+    lru = cache.DimensionlessCache()
+
+    actual = cache.calc_fill_volume(HEIGHT, WIDTH, INLET_WIDTH, lru)
+    expected = filling.calc_fill_volume(HEIGHT, WIDTH, INLET_WIDTH)
+
+    assert actual == pytest.approx(expected, rel=1e-12)
+    assert lru.stats().misses == 1
+
+    # Scaled copy of the chip hits the cache
+    scaled = cache.calc_fill_volume(10 * HEIGHT, 10 * WIDTH, 10 * INLET_WIDTH, lru)
+
+    assert scaled == pytest.approx(1000 * expected, rel=1e-12)
+    assert lru.stats().hits == 1
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_alpha() -> None:
+    """Test calc_alpha()"""
+
+    lru = cache.DimensionlessCache()
+    args = (HEIGHT, WIDTH, INLET_WIDTH, EPSILON, FLOW_CONT, FLOW_GUTTER)
+    expected = squeezing._calc_alpha(*args)
+
+    assert cache.calc_alpha(*args, lru) == pytest.approx(expected, rel=1e-12)
+
+    # Scaled geometry and flows hit the cache
+    scaled_args = (2 * HEIGHT, 2 * WIDTH, 2 * INLET_WIDTH, 2 * EPSILON, 1.0, 0.1)
+    assert cache.calc_alpha(*scaled_args, lru) == pytest.approx(expected, rel=1e-12)
+
+    assert lru.stats().hits == 1
+    assert lru.stats().misses == 1
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_total_volume() -> None:
+    """Test calc_total_volume()"""
+
+    args = (HEIGHT, WIDTH, INLET_WIDTH, EPSILON, FLOW_CONT, FLOW_DISP, FLOW_GUTTER)
+
+    assert cache.calc_total_volume(
+        *args, cache=cache.DimensionlessCache()
+    ) == pytest.approx(total.calc_total_volume(*args), rel=1e-12)
+
+
+# -------------------------------------------------------------------------------------
+def test_eviction() -> None:
+    """Least recently used entries are evicted"""
+
+    lru = cache.DimensionlessCache(maxsize=2)
+
+    lru.get("a", lambda: 1.0)
+    lru.get("b", lambda: 2.0)
+    lru.get("a", lambda: 1.0)
+    lru.get("c", lambda: 3.0)
+
+    # "b" was least recently used, so it was evicted
+    assert lru.stats() == cache.CacheStats(
+        hits=1, misses=3, evictions=1, size=2, maxsize=2
+    )
+    assert lru.get("b", lambda: 4.0) == 4.0
+
+    lru.clear()
+    assert lru.stats() == cache.CacheStats(0, 0, 0, 0, 2)
+
+    with pytest.raises(ValueError):
+        cache.DimensionlessCache(maxsize=0)
+
+
+# -------------------------------------------------------------------------------------
+def test_threads() -> None:
+    """Cache can be shared between threads"""
+
+    lru = cache.DimensionlessCache(maxsize=8)
+    heights = [height * 10**-6 for height in range(10, 30)]
+
+    def worker() -> None:
+        for _ in range(20):
+            for height in heights:
+                cache.calc_fill_volume(height, WIDTH, INLET_WIDTH, lru)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = lru.stats()
+
+    assert stats.hits + stats.misses == 4 * 20 * len(heights)
+    assert stats.size == 8
+    assert stats.misses - stats.evictions == stats.size
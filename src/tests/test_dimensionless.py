@@ -0,0 +1,99 @@
+"""
+Unit tests for the functions in the dimensionless module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import numpy as np
+import pytest
+
+from t_junction_model import batch, dimensionless, filling, squeezing, total
+
+# pylint: disable=protected-access
+
+# Designs in SI units, with narrow, equal and wide inlets
+DESIGNS = {
+    "height": np.array([10e-6, 33e-6, 60e-6, 33e-6, 80e-6]),
+    "width": np.full(5, 100e-6),
+    "inlet_width": np.array([60e-6, 100e-6, 150e-6, 300e-6, 400e-6]),
+    "epsilon": np.array([0.0, 5e-6, 10e-6, 1e-6, 0.0]),
+    "flow_cont": np.full(5, 3e-9),
+    "flow_disp": np.array([6e-9, 0.3e-9, 30e-9, 3e-9, 1e-9]),
+    "flow_gutter": np.array([0.3e-9, 0.0, 1e-9, 0.1e-9, 0.0]),
+}
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_groups() -> None:
+    """Test calc_groups()"""
+
+    groups = dimensionless.calc_groups(*DESIGNS.values())
+
+    assert list(groups.height_ratio) == pytest.approx([0.1, 0.33, 0.6, 0.33, 0.8])
+    assert list(groups.inlet_ratio) == pytest.approx([0.6, 1.0, 1.5, 3.0, 4.0])
+    assert list(groups.epsilon_ratio) == pytest.approx([0.0, 0.05, 0.1, 0.01, 0.0])
+    assert list(groups.gutter_ratio) == pytest.approx([0.1, 0.0, 1 / 3, 1 / 30, 0.0])
+    assert list(groups.disp_ratio) == pytest.approx([2.0, 0.1, 10.0, 1.0, 1 / 3])
+
+    assert np.isnan(dimensionless.calc_groups(0, 0, 0, 0, 1, 1, 0).height_ratio)
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_nondim_fill_volume() -> None:
+    """Agrees with the dimensional round trip"""
+
+    groups = dimensionless.calc_groups(*DESIGNS.values())
+    expected = [
+        filling.calc_nondim_fill_volume(*map(float, row))
+        for row in zip(DESIGNS["height"], DESIGNS["width"], DESIGNS["inlet_width"])
+    ]
+
+    assert list(
+        dimensionless.calc_nondim_fill_volume(groups.height_ratio, groups.inlet_ratio)
+    ) == pytest.approx(expected, rel=1e-13)
+
+    # Only the ratios matter
+    assert dimensionless.calc_nondim_fill_volume(0.33, 3.0) == pytest.approx(
+        filling.calc_nondim_fill_volume(0.33, 1.0, 3.0), rel=1e-14
+    )
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_alpha() -> None:
+    """Test calc_alpha()"""
+
+    groups = dimensionless.calc_groups(*DESIGNS.values())
+    args = [
+        DESIGNS[name]
+        for name in [
+            "height",
+            "width",
+            "inlet_width",
+            "epsilon",
+            "flow_cont",
+            "flow_gutter",
+        ]
+    ]
+    expected = [squeezing._calc_alpha(*map(float, row)) for row in zip(*args)]
+
+    assert list(dimensionless.calc_alpha(*groups[:4])) == pytest.approx(
+        expected, rel=1e-13
+    )
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_nondim_total_volume() -> None:
+    """Test calc_nondim_squeeze_volume() and calc_nondim_total_volume()"""
+
+    groups = dimensionless.calc_groups(*DESIGNS.values())
+
+    assert dimensionless.calc_nondim_squeeze_volume(*groups) == pytest.approx(
+        batch.calc_nondim_squeeze_volume(*DESIGNS.values()), rel=1e-13
+    )
+
+    expected = [
+        total.calc_nondim_total_volume(*map(float, row))
+        for row in zip(*DESIGNS.values())
+    ]
+    assert list(dimensionless.calc_nondim_total_volume(*groups)) == pytest.approx(
+        expected, rel=1e-13
+    )
@@ -0,0 +1,129 @@
+"""
+Unit tests for the functions in the disk_cache module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from t_junction_model import disk_cache
+
+
+# -------------------------------------------------------------------------------------
+def test_source_fingerprint(tmp_path: Path) -> None:
+    """Fingerprint only changes with the contents of the given modules"""
+
+    (tmp_path / "model.py").write_text("X = 1\n", encoding="utf-8")
+    (tmp_path / "service.py").write_text("Y = 1\n", encoding="utf-8")
+    before = disk_cache.source_fingerprint(str(tmp_path), ("model.py",))
+
+    (tmp_path / "service.py").write_text("Y = 2\n", encoding="utf-8")
+    disk_cache.source_fingerprint.cache_clear()
+    assert disk_cache.source_fingerprint(str(tmp_path), ("model.py",)) == before
+
+    (tmp_path / "model.py").write_text("X = 2\n", encoding="utf-8")
+    disk_cache.source_fingerprint.cache_clear()
+    assert disk_cache.source_fingerprint(str(tmp_path), ("model.py",)) != before
+
+    assert len(disk_cache.source_fingerprint()) == 64
+
+
+# -------------------------------------------------------------------------------------
+def test_get_or_compute(tmp_path: Path) -> None:
+    """Results are computed once and persist between instances"""
+
+    path = str(tmp_path / "cache" / "results.sqlite")
+    calls = []
+
+    def compute() -> np.ndarray:
+        calls.append(1)
+        return np.arange(5.0)
+
+    cache = disk_cache.DiskCache(path)
+    first = cache.get_or_compute("ramp", {"n": 5}, compute)
+    second = cache.get_or_compute("ramp", {"n": 5}, compute)
+    cache.get_or_compute("ramp", {"n": 6}, compute)
+    cache.close()
+
+    assert np.array_equal(first, second)
+    assert len(calls) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    reopened = disk_cache.DiskCache(path)
+    assert np.array_equal(reopened.get_or_compute("ramp", {"n": 5}, compute), first)
+    assert len(calls) == 2
+    assert reopened.info().n_entries == 2
+
+
+# -------------------------------------------------------------------------------------
+def test_fingerprint_invalidates(tmp_path: Path) -> None:
+    """Entries computed with other model code are not used, and can be pruned"""
+
+    path = str(tmp_path / "results.sqlite")
+
+    old = disk_cache.DiskCache(path, fingerprint="old")
+    old.get_or_compute("value", {}, lambda: "old")
+    old.close()
+
+    new = disk_cache.DiskCache(path, fingerprint="new")
+
+    assert new.get_or_compute("value", {}, lambda: "new") == "new"
+    assert new.info().n_entries == 2
+    assert new.info().n_stale == 1
+    assert [entry.stale for entry in new.entries()] == [False, True]
+
+    assert new.prune() == 1
+    assert new.info().n_stale == 0
+    assert new.get_or_compute("value", {}, lambda: "recomputed") == "new"
+
+
+# -------------------------------------------------------------------------------------
+def test_eviction(tmp_path: Path) -> None:
+    """Least recently used entries are evicted beyond the size limit"""
+
+    value = np.zeros(1000)
+    cache = disk_cache.DiskCache(str(tmp_path / "results.sqlite"), max_size=20_000)
+    entry_size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    for index in range(3):
+        cache.get_or_compute(f"value_{index}", {}, lambda: value)
+
+    # Using value_0 makes value_1 the least recently used
+    cache.get_or_compute("value_0", {}, lambda: value)
+    cache.get_or_compute("value_3", {}, lambda: value)
+
+    assert 2 * entry_size <= 20_000 < 3 * entry_size
+    assert [entry.name for entry in cache.entries()] == ["value_3", "value_0"]
+    assert cache.info().size <= 20_000
+
+    # Values larger than the cache are returned but not stored
+    assert len(cache.get_or_compute("big", {}, lambda: np.zeros(10_000))) == 10_000
+    assert "big" not in [entry.name for entry in cache.entries()]
+
+    assert cache.prune(stale=False, max_size=entry_size) == 1
+    assert cache.clear() == 1
+    assert cache.info().n_entries == 0
+
+    with pytest.raises(ValueError, match="max_size must not be negative"):
+        disk_cache.DiskCache(str(tmp_path / "other.sqlite"), max_size=-1)
+
+
+# -------------------------------------------------------------------------------------
+def test_file_shrinks(tmp_path: Path) -> None:
+    """Space of evicted entries is returned to the file system"""
+
+    path = tmp_path / "results.sqlite"
+    cache = disk_cache.DiskCache(str(path), max_size=1_000_000)
+
+    value = np.arange(10_000)
+    for index in range(10):
+        cache.get_or_compute(f"value_{index}", {}, lambda: value)
+    full_size = path.stat().st_size
+
+    cache.prune(stale=False, max_size=100_000)
+
+    assert full_size > 800_000
+    assert path.stat().st_size < 200_000
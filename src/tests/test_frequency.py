@@ -0,0 +1,80 @@
+"""
+Unit tests for the functions in the frequency module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import numpy as np
+import pytest
+
+from t_junction_model import filling, frequency, squeezing, total
+
+# pylint: disable=protected-access
+
+DESIGN = {
+    "height": 33 * 10**-6,
+    "width": 100 * 10**-6,
+    "inlet_width": 100 * 10**-6,
+    "epsilon": 10 * 10**-6,
+    "flow_cont": 3 * 10**-9,
+    "flow_disp": 6 * 10**-9,
+    "flow_gutter": 0.3 * 10**-9,
+}
+
+KNOWN = {name: value for name, value in DESIGN.items() if name != "flow_disp"}
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_timing() -> None:
+    """Test calc_timing()"""
+
+    flow_disps = np.array([0.1, 1.0, 10.0]) * DESIGN["flow_cont"]
+    timing = frequency.calc_timing(**KNOWN, flow_disp=flow_disps)
+
+    fill_volume = filling.calc_fill_volume(
+        DESIGN["height"], DESIGN["width"], DESIGN["inlet_width"]
+    )
+    assert list(timing.fill_time) == pytest.approx(list(fill_volume / flow_disps))
+
+    # 2r reaches the pinch-off threshold at the end of the squeezing phase
+    assert timing.squeeze_time.shape == (3,)
+    two_r = squeezing._calc_2r(**KNOWN, time=float(timing.squeeze_time[0]))
+    height, width = DESIGN["height"], DESIGN["width"]
+    assert two_r / width == pytest.approx(height / (height + width))
+
+    # Dispersed phase flows in at Q_d over the whole period
+    volumes = [total.calc_total_volume(**KNOWN, flow_disp=flow) for flow in flow_disps]
+    assert list(timing.period * flow_disps) == pytest.approx(volumes, rel=1e-14)
+    assert list(timing.frequency * timing.period) == pytest.approx([1.0] * 3)
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_timing_no_flow() -> None:
+    """Nothing is generated without dispersed phase flow"""
+
+    timing = frequency.calc_timing(**KNOWN, flow_disp=0.0)
+
+    assert timing.fill_time == np.inf
+    assert timing.period == np.inf
+    assert timing.frequency == 0
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_flow_disp() -> None:
+    """Test calc_flow_disp() and calc_max_frequency()"""
+
+    flow_disps = np.array([0.1, 1.0, 10.0]) * DESIGN["flow_cont"]
+    targets = frequency.calc_timing(**KNOWN, flow_disp=flow_disps).frequency
+
+    solution = frequency.calc_flow_disp(targets, **KNOWN)
+
+    assert solution.reached.all()
+    assert list(solution.value) == pytest.approx(list(flow_disps))
+
+    # Frequency approaches, but never reaches, 1 / squeeze time
+    max_frequency = frequency.calc_max_frequency(**KNOWN)
+    assert all(targets < max_frequency)
+
+    solution = frequency.calc_flow_disp([max_frequency, 2 * max_frequency], **KNOWN)
+
+    assert not solution.reached.any()
+    assert np.isnan(solution.value).all()
@@ -0,0 +1,106 @@
+"""
+Unit tests for the geometry module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import numpy as np
+import pytest
+
+from t_junction_model import filling, squeezing, total
+from t_junction_model.geometry import TJunctionGeometry
+
+# pylint: disable=protected-access
+
+HEIGHT = 33 * 10**-6
+WIDTH = 100 * 10**-6
+EPSILON = 0.1 * WIDTH
+FLOW_CONT = 3 * 10**-9
+FLOW_GUTTER = 0.1 * FLOW_CONT
+
+
+# -------------------------------------------------------------------------------------
+def test_precomputed_terms() -> None:
+    """Flow-independent terms match the module functions"""
+
+    for inlet_width in [WIDTH / 3, WIDTH, 3 * WIDTH]:
+        geometry = TJunctionGeometry(HEIGHT, WIDTH, inlet_width, EPSILON)
+
+        assert geometry.fill_volume == filling.calc_fill_volume(
+            HEIGHT, WIDTH, inlet_width
+        )
+        assert geometry.fill_radius == squeezing._calc_fill_radius(WIDTH, inlet_width)
+        assert geometry.pinch_width == squeezing._calc_pinch_width(
+            HEIGHT, WIDTH, EPSILON
+        )
+        assert geometry.pinch_radius == squeezing._calc_pinch_radius(
+            HEIGHT, WIDTH, inlet_width, EPSILON
+        )
+
+
+# -------------------------------------------------------------------------------------
+def test_slots() -> None:
+    """Geometry has no instance dictionary"""
+
+    geometry = TJunctionGeometry(HEIGHT, WIDTH, WIDTH, EPSILON)
+
+    assert not hasattr(geometry, "__dict__")
+    with pytest.raises(AttributeError):
+        setattr(geometry, "length", 1.0)
+
+
+# -------------------------------------------------------------------------------------
+def test_read_only_dimensions() -> None:
+    """Dimensions cannot be reassigned, leaving the precomputed terms stale"""
+
+    geometry = TJunctionGeometry(HEIGHT, WIDTH, WIDTH, EPSILON)
+
+    for name in ["height", "width", "inlet_width", "epsilon"]:
+        with pytest.raises(AttributeError):
+            setattr(geometry, name, 1.0)
+
+    assert geometry.width == WIDTH
+    assert geometry.fill_volume == filling.calc_fill_volume(HEIGHT, WIDTH, WIDTH)
+
+
+# -------------------------------------------------------------------------------------
+def test_flow_methods() -> None:
+    """Methods give the same numbers as the module functions"""
+
+    for inlet_width in [WIDTH / 3, WIDTH, 3 * WIDTH]:
+        geometry = TJunctionGeometry(HEIGHT, WIDTH, inlet_width, EPSILON)
+        geometry_args = (HEIGHT, WIDTH, inlet_width, EPSILON)
+
+        assert geometry.calc_alpha(FLOW_CONT, FLOW_GUTTER) == squeezing._calc_alpha(
+            *geometry_args, FLOW_CONT, FLOW_GUTTER
+        )
+
+        for flow_disp in [0.1 * FLOW_CONT, FLOW_CONT, 10 * FLOW_CONT]:
+            flows = (FLOW_CONT, flow_disp, FLOW_GUTTER)
+
+            assert geometry.calc_squeezing_volume(
+                *flows
+            ) == squeezing.calc_squeezing_volume(*geometry_args, *flows)
+            assert geometry.calc_total_volume(*flows) == total.calc_total_volume(
+                *geometry_args, *flows
+            )
+            assert geometry.calc_nondim_total_volume(
+                *flows
+            ) == total.calc_nondim_total_volume(*geometry_args, *flows)
+
+
+# -------------------------------------------------------------------------------------
+def test_flow_sweep() -> None:
+    """Flow rates can be arrays"""
+
+    geometry = TJunctionGeometry(HEIGHT, WIDTH, WIDTH, EPSILON)
+    flow_disps = np.linspace(0.1, 10, 50) * FLOW_CONT
+
+    volumes = geometry.calc_total_volume(FLOW_CONT, flow_disps, FLOW_GUTTER)
+    expected = [
+        total.calc_total_volume(
+            HEIGHT, WIDTH, WIDTH, EPSILON, FLOW_CONT, flow_disp, FLOW_GUTTER
+        )
+        for flow_disp in flow_disps
+    ]
+
+    assert np.array_equal(volumes, expected)
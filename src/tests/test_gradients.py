@@ -0,0 +1,139 @@
+"""
+Unit tests for the functions in the gradients module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+from typing import Callable
+
+import numpy as np
+import pytest
+
+from t_junction_model import batch, gradients
+
+# pylint: disable=protected-access
+
+# Narrow and wide inlets, and an inlet just wider than the channel
+DESIGNS = {
+    "height": np.array([20e-6, 33e-6, 60e-6, 33e-6]),
+    "width": np.full(4, 100e-6),
+    "inlet_width": np.array([60e-6, 300e-6, 150e-6, 101e-6]),
+    "epsilon": np.array([0.0, 5e-6, 10e-6, 1e-6]),
+    "flow_cont": np.full(4, 3e-9),
+    "flow_disp": np.array([6e-9, 0.3e-9, 30e-9, 3e-9]),
+    "flow_gutter": np.array([0.3e-9, 0.0, 1e-9, 0.1e-9]),
+}
+
+FUNCTIONS: dict[str, Callable[..., np.ndarray]] = {
+    "fill_volume": lambda height, width, inlet_width, **_: batch.calc_fill_volume(
+        height, width, inlet_width
+    ),
+    "alpha": lambda flow_disp, **kwargs: batch._calc_alpha(**kwargs),
+    "squeeze_volume": batch.calc_squeezing_volume,
+    "total_volume": batch.calc_total_volume,
+}
+
+
+# -------------------------------------------------------------------------------------
+def central_difference(
+    function: Callable[..., np.ndarray], inputs: dict[str, np.ndarray], name: str
+) -> np.ndarray:
+    """Central finite difference with a relative step"""
+
+    step = 1e-6 * np.where(inputs[name] == 0, 1e-6, np.abs(inputs[name]))
+    upper = function(**{**inputs, name: inputs[name] + step})
+    lower = function(**{**inputs, name: inputs[name] - step})
+
+    return (upper - lower) / (2 * step)
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_jacobian() -> None:
+    """Values match the batch module, and derivatives finite differences"""
+
+    jacobian = gradients.calc_jacobian(**DESIGNS)
+
+    assert list(jacobian) == list(batch.PREDICTIONS)
+
+    for output, function in FUNCTIONS.items():
+        gradient = jacobian[output]
+        assert gradient.value == pytest.approx(function(**DESIGNS), rel=1e-14)
+        assert list(gradient.partials) == list(batch.PARAMETERS)
+        assert gradient.jacobian().shape == (4, 7)
+
+        for name in batch.PARAMETERS:
+            # Compare sensitivities, d(output) / d(log input)
+            scale = np.abs(gradient.value)
+            assert gradient.partials[name] * DESIGNS[name] / scale == pytest.approx(
+                central_difference(function, DESIGNS, name) * DESIGNS[name] / scale,
+                abs=1e-7,
+            )
+
+
+# -------------------------------------------------------------------------------------
+def test_single_outputs() -> None:
+    """The single-output functions agree with calc_jacobian()"""
+
+    jacobian = gradients.calc_jacobian(**DESIGNS)
+    fill = gradients.calc_fill_volume_gradient(
+        DESIGNS["height"], DESIGNS["width"], DESIGNS["inlet_width"]
+    )
+    alpha = gradients.calc_alpha_gradient(
+        **{name: values for name, values in DESIGNS.items() if name != "flow_disp"}
+    )
+    squeeze = gradients.calc_squeezing_volume_gradient(**DESIGNS)
+    total = gradients.calc_total_volume_gradient(**DESIGNS)
+
+    assert list(fill.partials) == ["height", "width", "inlet_width"]
+    assert "flow_disp" not in alpha.partials
+
+    for output, gradient in [
+        ("fill_volume", fill),
+        ("alpha", alpha),
+        ("squeeze_volume", squeeze),
+        ("total_volume", total),
+    ]:
+        assert np.array_equal(gradient.value, jacobian[output].value)
+        for name, partial in gradient.partials.items():
+            assert np.array_equal(partial, jacobian[output].partials[name])
+
+
+# -------------------------------------------------------------------------------------
+def test_branch() -> None:
+    """Where inlet_width == width, derivatives are those of the narrow formula"""
+
+    gradient = gradients.calc_total_volume_gradient(
+        33e-6, 100e-6, 100e-6, 5e-6, 3e-9, 6e-9, 0.3e-9
+    )
+    inputs = {
+        "height": 33e-6,
+        "width": 100e-6,
+        "inlet_width": 100e-6,
+        "epsilon": 5e-6,
+        "flow_cont": 3e-9,
+        "flow_disp": 6e-9,
+        "flow_gutter": 0.3e-9,
+    }
+    value = batch.calc_total_volume(**inputs)
+
+    step = 1e-12
+    wider = batch.calc_total_volume(**{**inputs, "width": 100e-6 + step})
+    narrower = batch.calc_total_volume(**{**inputs, "inlet_width": 100e-6 - step})
+
+    assert gradient.value == pytest.approx(value, rel=1e-14)
+    assert gradient.partials["width"] == pytest.approx((wider - value) / step, rel=1e-5)
+    assert gradient.partials["inlet_width"] == pytest.approx(
+        (value - narrower) / step, rel=1e-5
+    )
+
+
+# -------------------------------------------------------------------------------------
+def test_scalar() -> None:
+    """Scalar inputs work for both filling formulas"""
+
+    for inlet_width in [100e-6, 300e-6]:
+        gradient = gradients.calc_fill_volume_gradient(33e-6, 100e-6, inlet_width)
+
+        assert gradient.value == pytest.approx(
+            batch.calc_fill_volume(33e-6, 100e-6, inlet_width), rel=1e-14
+        )
+        assert gradient.jacobian().shape == (3,)
@@ -0,0 +1,96 @@
+"""
+Unit tests for the functions in the inverse module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import numpy as np
+import pytest
+
+from t_junction_model import inverse, total
+
+DESIGN = {
+    "height": 33 * 10**-6,
+    "width": 100 * 10**-6,
+    "inlet_width": 100 * 10**-6,
+    "epsilon": 10 * 10**-6,
+    "flow_cont": 3 * 10**-9,
+    "flow_disp": 6 * 10**-9,
+    "flow_gutter": 0.3 * 10**-9,
+}
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_flow_disp() -> None:
+    """Test calc_flow_disp()"""
+
+    flow_disps = np.array([0.1, 1.0, 5.0]) * DESIGN["flow_cont"]
+    known = {name: value for name, value in DESIGN.items() if name != "flow_disp"}
+    targets = [total.calc_total_volume(**known, flow_disp=flow) for flow in flow_disps]
+
+    solution = inverse.calc_flow_disp(targets, **known)
+
+    assert solution.reached.all()
+    assert list(solution.value) == pytest.approx(list(flow_disps))
+
+    # Volumes smaller than the fill volume cannot be reached
+    solution = inverse.calc_flow_disp(0.0, **known)
+
+    assert not solution.reached
+    assert np.isnan(solution.value)
+
+
+# -------------------------------------------------------------------------------------
+def test_solve_for() -> None:
+    """Test solve_for() round trip for each parameter with default bounds"""
+
+    for parameter, values in [
+        ("height", np.array([10.0, 33.0, 60.0]) * 10**-6),
+        ("inlet_width", np.array([50.0, 100.0, 300.0]) * 10**-6),
+        ("epsilon", np.array([0.0, 5.0, 10.0]) * 10**-6),
+        ("flow_disp", np.array([0.3, 3.0, 30.0]) * 10**-9),
+    ]:
+        known = {name: value for name, value in DESIGN.items() if name != parameter}
+        targets = [
+            total.calc_total_volume(**known, **{parameter: value}) for value in values
+        ]
+
+        solution = inverse.solve_for(parameter, targets, known)
+
+        assert solution.reached.all()
+        assert list(solution.value) == pytest.approx(list(values), abs=1e-15)
+
+
+# -------------------------------------------------------------------------------------
+def test_solve_for_bounds() -> None:
+    """Test solve_for() with explicit bounds and unreachable targets"""
+
+    known = {name: value for name, value in DESIGN.items() if name != "flow_cont"}
+    target = total.calc_total_volume(**DESIGN)
+    bounds = (1 * 10**-9, 10 * 10**-9)
+
+    solution = inverse.solve_for(
+        "flow_cont", [target, 100 * target], known, bounds=bounds
+    )
+
+    assert list(solution.reached) == [True, False]
+    assert solution.value[0] == pytest.approx(DESIGN["flow_cont"])
+    assert np.isnan(solution.value[1])
+
+
+# -------------------------------------------------------------------------------------
+def test_solve_for_errors() -> None:
+    """Test solve_for() argument checking"""
+
+    known = {name: value for name, value in DESIGN.items() if name != "height"}
+
+    with pytest.raises(ValueError, match="Unknown parameter"):
+        inverse.solve_for("length", 1.0, known)
+
+    with pytest.raises(ValueError, match="missing: width"):
+        inverse.solve_for(
+            "height", 1.0, {k: v for k, v in known.items() if k != "width"}
+        )
+
+    known = {name: value for name, value in DESIGN.items() if name != "flow_cont"}
+    with pytest.raises(ValueError, match="No default bounds"):
+        inverse.solve_for("flow_cont", 1.0, known)
@@ -10,8 +10,11 @@ import os
 import random
 import shutil
 import string
+import sys
 from subprocess import getstatusoutput
 
+import pyarrow.parquet as pq
+
 PRG = "src/make_figures.py"
 
 
@@ -39,6 +42,35 @@ def test_usage() -> None:
         assert out.lower().startswith("usage")
 
 
+# -------------------------------------------------------------------------------------
+def test_startup() -> None:
+    """Help is printed without importing the plotting libraries"""
+
+    retval, out = getstatusoutput(f"{sys.executable} -X importtime {PRG} -h")
+
+    assert retval == 0
+    imported = {line.split("|")[-1].strip() for line in out.splitlines()}
+    assert not imported & {"numpy", "pandas", "plotnine"}
+
+
+# -------------------------------------------------------------------------------------
+def test_bad_only() -> None:
+    """Dies on an unknown figure name"""
+
+    retval, out = getstatusoutput(f"{PRG} --only fig_3,fig_9")
+    assert retval != 0
+    assert "--only must name figures" in out
+
+
+# -------------------------------------------------------------------------------------
+def test_bad_jobs() -> None:
+    """Dies on a non-positive number of jobs"""
+
+    retval, out = getstatusoutput(f"{PRG} -j 0")
+    assert retval != 0
+    assert "--jobs must be positive" in out
+
+
 # -------------------------------------------------------------------------------------
 def test_runs_okay() -> None:
     """Runs on good input"""
@@ -61,3 +93,144 @@ def test_runs_okay() -> None:
     finally:
         if os.path.isdir(out_dir):
             shutil.rmtree(out_dir)
+
+
+# -------------------------------------------------------------------------------------
+def test_cache() -> None:
+    """Reuses figure data from the cache"""
+
+    out_dir = random_string()
+    cache_file = os.path.join(out_dir, "cache.sqlite")
+
+    try:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+
+        rv, out = getstatusoutput(f"{PRG} -o {out_dir} -c {cache_file} -j 2")
+
+        assert rv == 0
+        assert "Loaded 0 of 5 dataset(s) from cache." in out
+        assert os.path.isfile(cache_file)
+
+        rv, out = getstatusoutput(f"{PRG} -o {out_dir} -c {cache_file} -f")
+
+        assert rv == 0
+        assert "Loaded 5 of 5 dataset(s) from cache." in out
+
+    finally:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+
+
+# -------------------------------------------------------------------------------------
+def test_incremental() -> None:
+    """Only makes missing or out of date figures"""
+
+    out_dir = random_string()
+
+    try:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+
+        rv, out = getstatusoutput(f"{PRG} -o {out_dir}")
+
+        assert rv == 0
+        assert "Making 5 of 5 figure(s)" in out
+        assert os.path.isfile(os.path.join(out_dir, "figures.json"))
+
+        rv, out = getstatusoutput(f"{PRG} -o {out_dir}")
+
+        assert rv == 0
+        assert "All 5 figure(s) are up to date." in out
+
+        os.remove(os.path.join(out_dir, "fig_3.png"))
+        rv, out = getstatusoutput(f"{PRG} -o {out_dir}")
+
+        assert rv == 0
+        assert "Making 1 of 5 figure(s)" in out
+        assert os.path.isfile(os.path.join(out_dir, "fig_3.png"))
+
+        rv, out = getstatusoutput(f"{PRG} -o {out_dir} --force")
+
+        assert rv == 0
+        assert "Making 5 of 5 figure(s)" in out
+
+    finally:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+
+
+# -------------------------------------------------------------------------------------
+def test_only() -> None:
+    """Makes only the selected figures"""
+
+    out_dir = random_string()
+
+    try:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+
+        rv, out = getstatusoutput(f"{PRG} -o {out_dir} --only fig_3,fig_6")
+
+        assert rv == 0
+        assert "Making 2 of 2 figure(s)" in out
+        assert sorted(os.listdir(out_dir)) == [
+            "fig_3.parquet",
+            "fig_3.png",
+            "fig_6.parquet",
+            "fig_6.png",
+            "figures.json",
+        ]
+
+        rv, out = getstatusoutput(f"{PRG} -o {out_dir} --only fig_6 -f")
+
+        assert rv == 0
+        assert "Making 1 of 1 figure(s)" in out
+
+        rv, out = getstatusoutput(f"{PRG} -o {out_dir}")
+
+        assert rv == 0
+        assert "Making 3 of 5 figure(s)" in out
+
+    finally:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+
+
+# -------------------------------------------------------------------------------------
+def test_data_only() -> None:
+    """Saves the data of each figure as Parquet, without plotting"""
+
+    out_dir = random_string()
+    names = ["fig_2a", "fig_2a_incorrect", "fig_2b", "fig_3", "fig_6"]
+
+    try:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+
+        rv, out = getstatusoutput(f"{PRG} -o {out_dir} -d")
+
+        assert rv == 0
+        assert "Making 5 of 5 dataset(s)" in out
+        assert sorted(os.listdir(out_dir)) == sorted(
+            [f"{name}.parquet" for name in names] + ["figures.json"]
+        )
+
+        table = pq.read_table(os.path.join(out_dir, "fig_3.parquet"), memory_map=True)
+        assert table.num_rows > 0
+        assert {"flow_ratio", "vol", "type", "width_ratio"} <= set(table.column_names)
+
+        # Images are still out of date
+        rv, out = getstatusoutput(f"{PRG} -o {out_dir}")
+
+        assert rv == 0
+        assert "Making 5 of 5 figure(s)" in out
+
+        rv, out = getstatusoutput(f"{PRG} -o {out_dir} -d")
+
+        assert rv == 0
+        assert "All 5 dataset(s) are up to date." in out
+
+    finally:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+"""
+Author : Kenneth Schackart <schackartk1@gmail.com>
+Date   : 2023-03-25
+Purpose: Test cache management script
+"""
+
+import os
+import random
+import string
+from pathlib import Path
+from subprocess import getstatusoutput
+
+from t_junction_model.disk_cache import DiskCache
+
+PRG = "src/manage_cache.py"
+
+
+# -------------------------------------------------------------------------------------
+def random_string() -> str:
+    """Generate a random string"""
+
+    return "".join(random.choices(string.ascii_uppercase + string.digits, k=5))
+
+
+# -------------------------------------------------------------------------------------
+def test_exists() -> None:
+    """Program exists"""
+
+    assert os.path.isfile(PRG)
+
+
+# -------------------------------------------------------------------------------------
+def test_usage() -> None:
+    """Usage"""
+
+    for flag in ["-h", "--help"]:
+        retval, out = getstatusoutput(f"{PRG} {flag}")
+        assert retval == 0
+        assert out.lower().startswith("usage")
+
+
+# -------------------------------------------------------------------------------------
+def test_bad_file() -> None:
+    """Dies on missing cache file"""
+
+    bad = random_string()
+    retval, out = getstatusoutput(f"{PRG} info {bad}")
+    assert retval != 0
+    assert f'Cache file "{bad}" does not exist' in out
+
+
+# -------------------------------------------------------------------------------------
+def test_runs_okay(tmp_path: Path) -> None:
+    """Inspects and prunes a cache"""
+
+    path = str(tmp_path / "results.sqlite")
+
+    stale = DiskCache(path, fingerprint="old model")
+    stale.get_or_compute("old_data", {}, lambda: list(range(100)))
+    stale.close()
+
+    current = DiskCache(path)
+    current.get_or_compute("new_data", {}, lambda: list(range(100)))
+    current.close()
+
+    retval, out = getstatusoutput(f"{PRG} info {path}")
+    assert retval == 0
+    assert "Entries: 2 (1 stale)" in out
+
+    retval, out = getstatusoutput(f"{PRG} list {path}")
+    assert retval == 0
+    assert "new_data" in out and "current" in out
+    assert "old_data" in out and "stale" in out
+
+    retval, out = getstatusoutput(f"{PRG} prune {path}")
+    assert retval == 0
+    assert "Removed 1 entries." in out
+
+    retval, out = getstatusoutput(f"{PRG} clear {path}")
+    assert retval == 0
+    assert "Removed 1 entries." in out
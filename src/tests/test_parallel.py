@@ -0,0 +1,35 @@
+"""
+Unit tests for the functions in the parallel module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import os
+
+import pytest
+
+from t_junction_model import parallel
+
+
+# -------------------------------------------------------------------------------------
+def power(base: int, exponent: int) -> tuple[int, int]:
+    """Raise a number to a power, along with the process that did it"""
+
+    return base**exponent, os.getpid()
+
+
+# -------------------------------------------------------------------------------------
+def test_run_tasks() -> None:
+    """Every task is run, in this process with one worker"""
+
+    tasks = [(base, 2) for base in range(10)]
+
+    serial = list(parallel.run_tasks(power, tasks, 1))
+    assert [value for value, _ in serial] == [base**2 for base in range(10)]
+    assert {pid for _, pid in serial} == {os.getpid()}
+
+    pooled = list(parallel.run_tasks(power, tasks, 2))
+    assert sorted(value for value, _ in pooled) == [base**2 for base in range(10)]
+    assert os.getpid() not in {pid for _, pid in pooled}
+
+    with pytest.raises(ValueError, match="workers must be positive"):
+        list(parallel.run_tasks(power, tasks, 0))
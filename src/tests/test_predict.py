@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+
+"""
+Author : Kenneth Schackart <schackartk1@gmail.com>
+Date   : 2023-03-11
+Purpose: Test volume prediction script
+"""
+
+import os
+import random
+import shutil
+import string
+from subprocess import getstatusoutput
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from t_junction_model import total
+
+PRG = "src/predict.py"
+
+
+# -------------------------------------------------------------------------------------
+def random_string() -> str:
+    """Generate a random string"""
+
+    return "".join(random.choices(string.ascii_uppercase + string.digits, k=5))
+
+
+# -------------------------------------------------------------------------------------
+def make_designs(n_rows: int = 25) -> pd.DataFrame:
+    """Random designs with an extra identifier column"""
+
+    rng = np.random.default_rng(0)
+    width = rng.uniform(50, 200, n_rows) * 10**-6
+
+    return pd.DataFrame(
+        {
+            "design": [f"chip_{i}" for i in range(n_rows)],
+            "height": width * rng.uniform(0.05, 1.0, n_rows),
+            "width": width,
+            "inlet_width": width * rng.uniform(0.6, 3.0, n_rows),
+            "epsilon": width * rng.uniform(0.0, 0.1, n_rows),
+            "flow_cont": rng.uniform(1, 5, n_rows) * 10**-9,
+            "flow_disp": rng.uniform(1, 5, n_rows) * 10**-9,
+            "flow_gutter": rng.uniform(0, 0.5, n_rows) * 10**-9,
+        }
+    )
+
+
+# -------------------------------------------------------------------------------------
+def test_exists() -> None:
+    """Program exists"""
+
+    assert os.path.isfile(PRG)
+
+
+# -------------------------------------------------------------------------------------
+def test_usage() -> None:
+    """Usage"""
+
+    for flag in ["-h", "--help"]:
+        retval, out = getstatusoutput(f"{PRG} {flag}")
+        assert retval == 0
+        assert out.lower().startswith("usage")
+
+
+# -------------------------------------------------------------------------------------
+def test_bad_file() -> None:
+    """Dies on missing input file"""
+
+    bad = random_string()
+    retval, out = getstatusoutput(f"{PRG} {bad}")
+    assert retval != 0
+    assert f'Input file "{bad}" does not exist' in out
+
+
+# -------------------------------------------------------------------------------------
+def test_runs_okay() -> None:
+    """Runs on CSV and Parquet input, in any chunk size"""
+
+    out_dir = random_string()
+    designs = make_designs()
+    expected = [
+        total.calc_total_volume(*row)
+        for row in designs.drop(columns="design").itertuples(index=False)
+    ]
+
+    try:
+        os.makedirs(out_dir)
+        designs.to_csv(os.path.join(out_dir, "designs.csv"), index=False)
+        designs.to_parquet(os.path.join(out_dir, "designs.parquet"), index=False)
+
+        for in_file, chunk_size in [("designs.csv", 4), ("designs.parquet", 7)]:
+            outfile = os.path.join(out_dir, "out", f"{in_file}.parquet")
+            retval, out = getstatusoutput(
+                f"{PRG} {os.path.join(out_dir, in_file)} -c {chunk_size} -o {outfile}"
+            )
+
+            assert retval == 0
+            assert "Wrote 25 predictions" in out
+
+            predictions = pd.read_parquet(outfile)
+            assert list(predictions.columns) == list(designs.columns) + [
+                "fill_volume",
+                "alpha",
+                "squeeze_volume",
+                "total_volume",
+            ]
+            assert list(predictions["design"]) == list(designs["design"])
+            assert list(predictions["total_volume"]) == pytest.approx(
+                expected, rel=1e-14
+            )
+
+    finally:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+
+
+# -------------------------------------------------------------------------------------
+def test_empty() -> None:
+    """Writes an empty table for design files without rows"""
+
+    out_dir = random_string()
+    designs = make_designs(0)
+
+    try:
+        os.makedirs(out_dir)
+        designs.to_csv(os.path.join(out_dir, "designs.csv"), index=False)
+        designs.to_parquet(os.path.join(out_dir, "designs.parquet"), index=False)
+
+        for in_file in ["designs.csv", "designs.parquet"]:
+            outfile = os.path.join(out_dir, f"{in_file}.parquet")
+            retval, out = getstatusoutput(
+                f"{PRG} {os.path.join(out_dir, in_file)} -o {outfile}"
+            )
+
+            assert retval == 0
+            assert "Wrote 0 predictions" in out
+
+            predictions = pd.read_parquet(outfile)
+            assert predictions.empty
+            assert list(predictions.columns) == list(designs.columns) + [
+                "fill_volume",
+                "alpha",
+                "squeeze_volume",
+                "total_volume",
+            ]
+
+    finally:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+
+
+# -------------------------------------------------------------------------------------
+def test_missing_columns() -> None:
+    """Dies on design files without the model inputs"""
+
+    out_dir = random_string()
+
+    try:
+        os.makedirs(out_dir)
+        in_file = os.path.join(out_dir, "designs.csv")
+        make_designs().drop(columns=["epsilon", "flow_gutter"]).to_csv(in_file)
+
+        retval, out = getstatusoutput(
+            f"{PRG} {in_file} -o {os.path.join(out_dir, 'out.parquet')}"
+        )
+        assert retval != 0
+        assert "Missing columns: epsilon, flow_gutter" in out
+
+    finally:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
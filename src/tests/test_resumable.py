@@ -0,0 +1,93 @@
+"""
+Unit tests for the functions in the resumable module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from t_junction_model import resumable, sweep
+
+VALUES: dict[str, npt.ArrayLike] = {
+    "height": [10e-6, 33e-6, 60e-6],
+    "width": 100e-6,
+    "inlet_width": [60e-6, 100e-6, 300e-6],
+    "epsilon": [0.0, 10e-6],
+    "flow_cont": 3e-9,
+    "flow_disp": [0.3e-9, 3e-9, 30e-9],
+    "flow_gutter": 0.3e-9,
+}
+
+
+class Interrupted(Exception):
+    """Raised to simulate a sweep being killed"""
+
+
+# -------------------------------------------------------------------------------------
+def test_resume(tmp_path: Path) -> None:
+    """An interrupted sweep only computes the missing chunks when rerun"""
+
+    grid = sweep.SweepGrid(VALUES)
+    out_dir = str(tmp_path)
+
+    def interrupt(n_done: int, _n_points: int, _seconds: float) -> None:
+        if n_done >= 20:
+            raise Interrupted
+
+    with pytest.raises(Interrupted):
+        resumable.run_resumable_sweep(grid, out_dir, 10, 1, interrupt)
+
+    assert resumable.read_journal(out_dir) == {0, 1}
+
+    calls = []
+    result = resumable.run_resumable_sweep(
+        grid, out_dir, 10, 2, lambda *args: calls.append(args)
+    )
+
+    assert result.n_chunks == 6
+    assert result.n_resumed == 2
+    # Chunks may finish in any order on two workers
+    assert len(calls) == 4
+    assert calls[-1][0] == 34
+    assert all(call[1] == 34 for call in calls)
+    assert resumable.read_journal(out_dir) == set(range(6))
+
+    results = resumable.load_results(out_dir)
+    assert isinstance(results, np.memmap)
+    assert np.array_equal(results, sweep.evaluate_shard(grid, 0, 54))
+
+    # Nothing is left to do
+    assert resumable.run_resumable_sweep(grid, out_dir, 10, 1).n_resumed == 6
+
+    # Not mistaken for a sharded sweep
+    with pytest.raises(FileNotFoundError):
+        sweep.load_sweep(out_dir)
+
+
+# -------------------------------------------------------------------------------------
+def test_read_journal(tmp_path: Path) -> None:
+    """Test read_journal() ignores a partly written last line"""
+
+    assert resumable.read_journal(str(tmp_path)) == set()
+
+    (tmp_path / resumable.JOURNAL_FILE).write_text("0\n3\n1\n2", encoding="utf-8")
+
+    assert resumable.read_journal(str(tmp_path)) == {0, 1, 3}
+
+
+# -------------------------------------------------------------------------------------
+def test_different_sweep(tmp_path: Path) -> None:
+    """Refuses to resume a different sweep in the same directory"""
+
+    resumable.run_resumable_sweep(sweep.SweepGrid(VALUES), str(tmp_path), 10, 1)
+
+    with pytest.raises(ValueError, match="holds a different sweep"):
+        resumable.run_resumable_sweep(
+            sweep.SweepGrid({**VALUES, "width": 150e-6}), str(tmp_path), 10, 1
+        )
+
+    with pytest.raises(ValueError, match="holds a different sweep"):
+        resumable.run_resumable_sweep(sweep.SweepGrid(VALUES), str(tmp_path), 20, 1)
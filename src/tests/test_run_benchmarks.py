@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+"""
+Author : Kenneth Schackart <schackartk1@gmail.com>
+Date   : 2023-03-25
+Purpose: Test benchmark script
+"""
+
+import json
+import os
+import random
+import string
+from pathlib import Path
+from subprocess import getstatusoutput
+
+PRG = "src/run_benchmarks.py"
+
+
+# -------------------------------------------------------------------------------------
+def random_string() -> str:
+    """Generate a random string"""
+
+    return "".join(random.choices(string.ascii_uppercase + string.digits, k=5))
+
+
+# -------------------------------------------------------------------------------------
+def test_exists() -> None:
+    """Program exists"""
+
+    assert os.path.isfile(PRG)
+
+
+# -------------------------------------------------------------------------------------
+def test_usage() -> None:
+    """Usage"""
+
+    for flag in ["-h", "--help"]:
+        retval, out = getstatusoutput(f"{PRG} {flag}")
+        assert retval == 0
+        assert out.lower().startswith("usage")
+
+
+# -------------------------------------------------------------------------------------
+def test_bad_history() -> None:
+    """Dies on missing history file"""
+
+    bad = random_string()
+    retval, out = getstatusoutput(f"{PRG} compare -H {bad}")
+    assert retval != 0
+    assert f'History file "{bad}" does not exist' in out
+
+
+# -------------------------------------------------------------------------------------
+def test_bad_sizes() -> None:
+    """Dies on bad batch sizes"""
+
+    for sizes in ["1e3,big", "0"]:
+        retval, out = getstatusoutput(f"{PRG} run -s {sizes}")
+        assert retval != 0
+        assert "--sizes must be" in out
+
+
+# -------------------------------------------------------------------------------------
+def test_runs_okay(tmp_path: Path) -> None:
+    """Records timings and compares them"""
+
+    history = str(tmp_path / "history.jsonl")
+    empty = tmp_path / "empty.jsonl"
+    empty.touch()
+
+    retval, out = getstatusoutput(f"{PRG} compare -H {empty}")
+    assert retval != 0
+    assert "no earlier record" in out
+
+    retval, out = getstatusoutput(f"{PRG} run -H {history} -s 1e3 -m 'batch/*' -r 1")
+    assert retval == 0
+    assert "batch/calc_total_volume/1e+03" in out
+    assert "Saved 2 timing(s)" in out
+
+    retval, out = getstatusoutput(f"{PRG} run -H {history} -m 'figure/fig_6/*' -r 1")
+    assert retval == 0
+    assert "figure/fig_6/data" in out and "figure/fig_6/render" in out
+
+    with open(history, "rt", encoding="utf-8") as fh_in:
+        records = [json.loads(line) for line in fh_in]
+    assert len(records) == 2
+    assert set(records[1]["timings"]) == {"figure/fig_6/data", "figure/fig_6/render"}
+
+    retval, out = getstatusoutput(f"{PRG} run -H {history} -m 'startup/*' -r 1")
+    assert retval == 0
+    assert "startup/make_figures --help" in out
+
+    # No benchmark in common with the previous record
+    retval, out = getstatusoutput(f"{PRG} compare -H {history}")
+    assert retval == 0
+    assert "No benchmark slower by more than 10%." in out
+
+
+# -------------------------------------------------------------------------------------
+def test_compare_slower(tmp_path: Path) -> None:
+    """Fails when a benchmark is slower than its baseline"""
+
+    history = tmp_path / "history.jsonl"
+    records = [
+        {"commit": "aaa", "time": "2023-03-24", "timings": {"a": {"best": 1.0}}},
+        {"commit": "bbb", "time": "2023-03-25", "timings": {"a": {"best": 1.5}}},
+    ]
+    history.write_text("".join(json.dumps(record) + "\n" for record in records))
+
+    retval, out = getstatusoutput(f"{PRG} compare -H {history}")
+    assert retval != 0
+    assert "+50.0%" in out
+    assert "1 of 1 benchmark(s) slower by more than 10%: a" in out
+
+    retval, out = getstatusoutput(f"{PRG} compare -H {history} -t 0.6")
+    assert retval == 0
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+
+"""
+Author : Kenneth Schackart <schackartk1@gmail.com>
+Date   : 2023-03-18
+Purpose: Test parameter sweep script
+"""
+
+import json
+import os
+import random
+import shutil
+import string
+from subprocess import getstatusoutput
+
+PRG = "src/run_sweep.py"
+
+
+# -------------------------------------------------------------------------------------
+def random_string() -> str:
+    """Generate a random string"""
+
+    return "".join(random.choices(string.ascii_uppercase + string.digits, k=5))
+
+
+# -------------------------------------------------------------------------------------
+def test_exists() -> None:
+    """Program exists"""
+
+    assert os.path.isfile(PRG)
+
+
+# -------------------------------------------------------------------------------------
+def test_usage() -> None:
+    """Usage"""
+
+    for flag in ["-h", "--help"]:
+        retval, out = getstatusoutput(f"{PRG} {flag}")
+        assert retval == 0
+        assert out.lower().startswith("usage")
+
+
+# -------------------------------------------------------------------------------------
+def test_bad_values() -> None:
+    """Dies on badly formatted values"""
+
+    retval, out = getstatusoutput(f"{PRG} --height 1:2")
+    assert retval != 0
+    assert 'cannot parse "1:2"' in out
+
+
+# -------------------------------------------------------------------------------------
+def test_runs_okay() -> None:
+    """Runs on good input"""
+
+    out_dir = random_string()
+
+    try:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+
+        retval, out = getstatusoutput(
+            f"{PRG} --height 10e-6:60e-6:5 --flow-disp 1e-9 2e-9 3e-9"
+            f" -s 4 -j 2 -o {out_dir}"
+        )
+
+        assert retval == 0
+        assert "15/15 points" in out
+        assert "points/s" in out
+
+        with open(os.path.join(out_dir, "sweep.json"), encoding="utf-8") as sweep_fh:
+            manifest = json.load(sweep_fh)
+        assert manifest["n_points"] == 15
+        assert manifest["dtype"] == "float64"
+        assert manifest["parameters"]["flow_disp"] == [1e-9, 2e-9, 3e-9]
+        for shard in ["shard_00000.npy", "shard_00003.npy"]:
+            assert shard in manifest["shards"]
+            assert os.path.isfile(os.path.join(out_dir, shard))
+
+    finally:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+
+
+# -------------------------------------------------------------------------------------
+def test_resumable() -> None:
+    """Writes one results file, and skips finished shards when rerun"""
+
+    out_dir = random_string()
+    cmd = (
+        f"{PRG} --height 10e-6:60e-6:5 --flow-disp 1e-9 2e-9 3e-9 -s 4 -r -o {out_dir}"
+    )
+
+    try:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+
+        retval, out = getstatusoutput(cmd)
+
+        assert retval == 0
+        assert "Computed 4 of 4 shard(s)" in out
+        for out_file in ["results.npy", "journal.txt", "resumable.json"]:
+            assert os.path.isfile(os.path.join(out_dir, out_file))
+
+        retval, out = getstatusoutput(cmd)
+
+        assert retval == 0
+        assert "Computed 0 of 4 shard(s)" in out
+
+        retval, out = getstatusoutput(f"{PRG} -r -o {out_dir}")
+
+        assert retval != 0
+        assert "holds a different sweep" in out
+
+    finally:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+
+
+# -------------------------------------------------------------------------------------
+def test_float32() -> None:
+    """Records the precision of single precision sweeps"""
+
+    out_dir = random_string()
+
+    try:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+
+        retval, _ = getstatusoutput(f"{PRG} --height 10e-6:60e-6:5 -f -r -o {out_dir}")
+
+        assert retval == 0
+
+        with open(
+            os.path.join(out_dir, "resumable.json"), encoding="utf-8"
+        ) as sweep_fh:
+            assert json.load(sweep_fh)["dtype"] == "float32"
+
+        retval, out = getstatusoutput(f"{PRG} --height 10e-6:60e-6:5 -r -o {out_dir}")
+
+        assert retval != 0
+        assert "holds a different sweep" in out
+
+    finally:
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
@@ -0,0 +1,86 @@
+"""
+Unit tests for the functions in the sensitivity module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+from math import pi as PI
+
+import numpy as np
+import pytest
+
+from t_junction_model import sensitivity
+
+BOUNDS: dict = {
+    "height": (10e-6, 60e-6),
+    "width": 100e-6,
+    "inlet_width": (60e-6, 300e-6),
+    "epsilon": (0.0, 10e-6),
+    "flow_cont": (1e-9, 5e-9),
+    "flow_disp": (1e-9, 5e-9),
+    "flow_gutter": (0.0, 0.5e-9),
+}
+
+
+# -------------------------------------------------------------------------------------
+def ishigami(height: np.ndarray, width: np.ndarray, inlet_width: np.ndarray, **_):
+    """Ishigami function of the first three inputs, a = 7 and b = 0.1"""
+
+    return (
+        np.sin(height)
+        + 7 * np.sin(width) ** 2
+        + 0.1 * inlet_width**4 * np.sin(height)
+    )
+
+
+# -------------------------------------------------------------------------------------
+def test_ishigami() -> None:
+    """Indices of the Ishigami function match the analytic values"""
+
+    bounds: dict = {name: 0.0 for name in sensitivity.PARAMETERS}
+    bounds.update({"height": (-PI, PI), "width": (-PI, PI), "inlet_width": (-PI, PI)})
+
+    result = sensitivity.calc_sobol_indices(bounds, 2**15, function=ishigami)
+
+    assert result.n_evaluations == 5 * 2**15
+    assert result.variance == pytest.approx(13.845, rel=1e-2)
+    assert list(result.first_order.values()) == pytest.approx(
+        [0.3139, 0.4424, 0.0], abs=1e-2
+    )
+    assert list(result.total.values()) == pytest.approx(
+        [0.5576, 0.4424, 0.2437], abs=1e-2
+    )
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_sobol_indices() -> None:
+    """Indices of the model are consistent, and do not depend on the workers"""
+
+    serial = sensitivity.calc_sobol_indices(BOUNDS, 2**12, chunk_size=2**10)
+    parallel = sensitivity.calc_sobol_indices(
+        BOUNDS, 2**12, chunk_size=2**10, workers=2
+    )
+
+    assert serial == parallel
+    assert list(serial.first_order) == [
+        name for name in sensitivity.PARAMETERS if name != "width"
+    ]
+
+    for name, first_order in serial.first_order.items():
+        assert -0.05 <= first_order <= serial.total[name] + 0.05
+        assert serial.total[name] <= 1.05
+
+
+# -------------------------------------------------------------------------------------
+def test_bad_bounds() -> None:
+    """Dies on missing inputs, bad sample sizes and nothing to vary"""
+
+    with pytest.raises(ValueError, match="Bounds missing for: width"):
+        sensitivity.calc_sobol_indices(
+            {k: v for k, v in BOUNDS.items() if k != "width"}
+        )
+
+    with pytest.raises(ValueError, match="must be a power of 2"):
+        sensitivity.calc_sobol_indices(BOUNDS, 1000)
+
+    with pytest.raises(ValueError, match="No input is varied"):
+        sensitivity.calc_sobol_indices({name: 1.0 for name in sensitivity.PARAMETERS})
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+"""
+Author : Kenneth Schackart <schackartk1@gmail.com>
+Date   : 2023-03-25
+Purpose: Test prediction service script
+"""
+
+import json
+import os
+import signal
+import subprocess
+import urllib.error
+import urllib.request
+from subprocess import getstatusoutput
+
+import pytest
+
+from t_junction_model import total
+
+PRG = "src/serve.py"
+
+DESIGN = {
+    "height": 33e-6,
+    "width": 100e-6,
+    "inlet_width": 100e-6,
+    "epsilon": 10e-6,
+    "flow_cont": 3e-9,
+    "flow_disp": 6e-9,
+    "flow_gutter": 0.3e-9,
+}
+
+
+# -------------------------------------------------------------------------------------
+def test_exists() -> None:
+    """Program exists"""
+
+    assert os.path.isfile(PRG)
+
+
+# -------------------------------------------------------------------------------------
+def test_usage() -> None:
+    """Usage"""
+
+    for flag in ["-h", "--help"]:
+        retval, out = getstatusoutput(f"{PRG} {flag}")
+        assert retval == 0
+        assert out.lower().startswith("usage")
+
+
+# -------------------------------------------------------------------------------------
+def test_bad_args() -> None:
+    """Dies on bad options"""
+
+    for flags, message in [
+        ("-p 70000", "--port must be between 0 and 65535"),
+        ("-w -1", "--window must not be negative"),
+        ("-b 0", "--max-batch must be positive"),
+    ]:
+        retval, out = getstatusoutput(f"{PRG} {flags}")
+        assert retval != 0
+        assert message in out
+
+
+# -------------------------------------------------------------------------------------
+def test_runs_okay() -> None:
+    """Answers predictions and statistics on localhost"""
+
+    with subprocess.Popen(
+        [PRG, "-p", "0"], stdout=subprocess.PIPE, text=True
+    ) as process:
+        try:
+            assert process.stdout is not None
+            url = process.stdout.readline().split()[-1]
+
+            request = urllib.request.Request(
+                f"{url}/predict", data=json.dumps(DESIGN).encode(), method="POST"
+            )
+            with urllib.request.urlopen(request, timeout=10) as response:
+                prediction = json.load(response)
+
+            assert prediction["total_volume"] == pytest.approx(
+                total.calc_total_volume(**DESIGN)
+            )
+
+            with urllib.request.urlopen(f"{url}/stats", timeout=10) as response:
+                assert json.load(response)["n_requests"] == 1
+
+            bad = urllib.request.Request(f"{url}/predict", data=b"{}", method="POST")
+            with pytest.raises(urllib.error.HTTPError, match="400"):
+                with urllib.request.urlopen(bad, timeout=10):
+                    pass
+
+        finally:
+            process.send_signal(signal.SIGINT)
+            process.wait(timeout=10)
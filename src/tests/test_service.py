@@ -0,0 +1,241 @@
+"""
+Unit tests for the functions in the service module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import asyncio
+import json
+from typing import Any
+
+import numpy as np
+import pytest
+
+from t_junction_model import batch, service
+
+DESIGN = {
+    "height": 33e-6,
+    "width": 100e-6,
+    "inlet_width": 100e-6,
+    "epsilon": 10e-6,
+    "flow_cont": 3e-9,
+    "flow_disp": 6e-9,
+    "flow_gutter": 0.3e-9,
+}
+
+FLOW_DISPS = [1e-9 * (i + 1) for i in range(10)]
+
+
+# -------------------------------------------------------------------------------------
+def test_micro_batcher() -> None:
+    """Concurrent requests within a window are evaluated as one batch"""
+
+    async def run() -> list[service.Prediction]:
+        batcher = service.MicroBatcher(window=0.05)
+        return await asyncio.gather(
+            *(batcher.predict({**DESIGN, "flow_disp": flow}) for flow in FLOW_DISPS)
+        )
+
+    predictions = asyncio.run(run())
+    expected = [
+        float(batch.calc_total_volume(**{**DESIGN, "flow_disp": flow}))
+        for flow in FLOW_DISPS
+    ]
+
+    assert [p.reason for p in predictions] == [0] * 10
+    assert [p.values["total_volume"] for p in predictions] == expected
+
+
+# -------------------------------------------------------------------------------------
+def test_max_batch() -> None:
+    """Batches are evaluated early once they hold max_batch requests"""
+
+    stats = service.ServiceStats()
+
+    async def run() -> None:
+        batcher = service.MicroBatcher(window=0.05, max_batch=4, stats=stats)
+        await asyncio.gather(
+            *(batcher.predict({**DESIGN, "flow_disp": flow}) for flow in FLOW_DISPS)
+        )
+
+    asyncio.run(run())
+
+    assert stats.n_requests == 10
+    assert stats.n_batches == 3
+    assert stats.batch_size_histogram() == {"2-3": 1, "4-7": 2}
+    assert all(
+        value is not None and value >= 0
+        for value in stats.latency_percentiles().values()
+    )
+
+
+# -------------------------------------------------------------------------------------
+def test_invalid_request() -> None:
+    """An invalid request does not affect the others in its batch"""
+
+    async def run() -> tuple[service.Prediction, service.Prediction]:
+        batcher = service.MicroBatcher(window=0.01)
+        return await asyncio.gather(
+            batcher.predict(DESIGN),
+            batcher.predict({**DESIGN, "flow_cont": 0.0}),
+        )
+
+    valid, invalid = asyncio.run(run())
+
+    assert valid.reason == 0
+    assert valid.values["total_volume"] == pytest.approx(
+        float(batch.calc_total_volume(**DESIGN))
+    )
+    assert invalid.reason != 0
+    assert np.isnan(invalid.values["total_volume"])
+
+
+# -------------------------------------------------------------------------------------
+def test_model_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    """An error evaluating a batch is raised in every request of the batch"""
+
+    def fail(*_args: Any) -> None:
+        raise FloatingPointError("model failed")
+
+    monkeypatch.setattr(service.validation, "calc_predictions", fail)
+
+    async def run() -> tuple[Any, Any]:
+        batcher = service.MicroBatcher(window=0.01)
+        return await asyncio.wait_for(
+            asyncio.gather(
+                batcher.predict(DESIGN),
+                batcher.predict({**DESIGN, "flow_cont": 0.0}),
+                return_exceptions=True,
+            ),
+            timeout=5,
+        )
+
+    results = asyncio.run(run())
+
+    assert len(results) == 2
+    assert all(isinstance(result, FloatingPointError) for result in results)
+
+
+# -------------------------------------------------------------------------------------
+def test_service_stats() -> None:
+    """Test ServiceStats"""
+
+    stats = service.ServiceStats()
+
+    assert stats.to_dict() == {
+        "n_requests": 0,
+        "n_batches": 0,
+        "latency_ms": {"p50": None, "p90": None, "p99": None},
+        "batch_sizes": {},
+    }
+
+    stats.record_batch([0.001])
+    stats.record_batch([0.002] * 5)
+
+    assert stats.batch_size_histogram() == {"1": 1, "4-7": 1}
+    assert stats.latency_percentiles((0, 100)) == {"p0": 1.0, "p100": 2.0}
+
+
+# -------------------------------------------------------------------------------------
+def test_parse_inputs() -> None:
+    """Test parse_inputs()"""
+
+    assert service.parse_inputs(json.dumps(DESIGN).encode()) == DESIGN
+
+    for body, message in [
+        (b"{", "not valid JSON"),
+        (b"[]", "must be a JSON object"),
+        (b'{"height": 1}', "missing inputs: width"),
+        (json.dumps({**DESIGN, "width": "wide"}).encode(), "must be numbers"),
+    ]:
+        with pytest.raises(ValueError, match=message):
+            service.parse_inputs(body)
+
+
+# -------------------------------------------------------------------------------------
+async def send(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    method: str,
+    path: str,
+    payload: Any = None,
+) -> tuple[int, Any]:
+    """Send one HTTP request on an open connection, returning status and JSON"""
+
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.decode().partition(":")
+        headers[name.lower()] = value.strip()
+
+    return status, json.loads(await reader.readexactly(int(headers["content-length"])))
+
+
+# -------------------------------------------------------------------------------------
+def test_prediction_service() -> None:
+    """Serves predictions and statistics over HTTP on localhost"""
+
+    async def client(port: int, flow_disp: float) -> list[tuple[int, Any]]:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            # Two requests on one kept-alive connection
+            return [
+                await send(
+                    reader, writer, "POST", "/predict", {**DESIGN, "flow_disp": flow}
+                )
+                for flow in (flow_disp, 2 * flow_disp)
+            ]
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    async def run() -> tuple[list[list[tuple[int, Any]]], list[tuple[int, Any]]]:
+        server = service.PredictionService(port=0, window=0.02)
+        await server.start()
+        try:
+            answers = await asyncio.gather(
+                *(client(server.port, flow) for flow in FLOW_DISPS)
+            )
+
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            others = [
+                await send(reader, writer, "GET", "/stats"),
+                await send(reader, writer, "POST", "/predict", {"height": 1}),
+                await send(reader, writer, "POST", "/predict", {**DESIGN, "width": 0}),
+                await send(reader, writer, "GET", "/predict"),
+                await send(reader, writer, "GET", "/nowhere"),
+            ]
+            writer.close()
+            await writer.wait_closed()
+        finally:
+            await server.stop()
+
+        return answers, others
+
+    answers, others = asyncio.run(run())
+
+    for flow, client_answers in zip(FLOW_DISPS, answers):
+        for (status, payload), flow_disp in zip(client_answers, (flow, 2 * flow)):
+            assert status == 200
+            assert payload["total_volume"] == pytest.approx(
+                float(batch.calc_total_volume(**{**DESIGN, "flow_disp": flow_disp}))
+            )
+
+    (stats_status, stats), missing, invalid, wrong_method, not_found = others
+
+    assert stats_status == 200
+    assert stats["n_requests"] == 20
+    assert stats["n_batches"] < 20
+    assert stats["latency_ms"]["p50"] >= 0
+
+    assert missing[0] == 400
+    assert invalid[0] == 422
+    assert "ZERO_DIMENSION" in invalid[1]["reasons"]
+    assert wrong_method[0] == 405
+    assert not_found[0] == 404
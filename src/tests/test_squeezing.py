@@ -63,6 +63,14 @@ def test_calc_nondim_squeeze_volume() -> None:
         height, width, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter
     ) == pytest.approx(expected_nondim_vol)
 
+    # Zero width is caught before it is divided by
+    assert (
+        squeezing.calc_nondim_squeeze_volume(
+            height, 0.0, inlet_width, epsilon, flow_cont, flow_disp, flow_gutter
+        )
+        is None
+    )
+
 
 # -------------------------------------------------------------------------------------
 def test_calc_pinch_radius() -> None:
@@ -0,0 +1,123 @@
+"""
+Unit tests for the functions in the sweep module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import itertools
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from t_junction_model import sweep, total
+
+VALUES: dict[str, npt.ArrayLike] = {
+    "height": [10e-6, 33e-6, 60e-6],
+    "width": 100e-6,
+    "inlet_width": [60e-6, 100e-6, 300e-6],
+    "epsilon": [0.0, 10e-6],
+    "flow_cont": 3e-9,
+    "flow_disp": [0.3e-9, 3e-9, 30e-9],
+    "flow_gutter": 0.3e-9,
+}
+
+
+# -------------------------------------------------------------------------------------
+def test_sweep_grid() -> None:
+    """Test SweepGrid"""
+
+    grid = sweep.SweepGrid(VALUES)
+
+    assert grid.shape == (3, 1, 3, 2, 1, 3, 1)
+    assert grid.n_points == 54
+
+    # Points are numbered in itertools.product() order
+    expected = list(itertools.product(*grid.values.values()))
+    points = grid.points(10, 20)
+    assert list(zip(*points.values())) == expected[10:20]
+
+    with pytest.raises(ValueError, match="missing: width; unexpected: length"):
+        sweep.SweepGrid(
+            {**{k: v for k, v in VALUES.items() if k != "width"}, "length": 1.0}
+        )
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_shard_bounds() -> None:
+    """Test calc_shard_bounds()"""
+
+    assert sweep.calc_shard_bounds(10, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert sweep.calc_shard_bounds(8, 4) == [(0, 4), (4, 8)]
+    assert sweep.calc_shard_bounds(0, 4) == []
+
+    with pytest.raises(ValueError, match="shard_size must be positive"):
+        sweep.calc_shard_bounds(10, 0)
+
+
+# -------------------------------------------------------------------------------------
+def test_evaluate_shard() -> None:
+    """Test evaluate_shard()"""
+
+    grid = sweep.SweepGrid(VALUES)
+    records = sweep.evaluate_shard(grid, 5, 15)
+
+    assert records.dtype == sweep.make_record(np.float64)
+    assert len(records) == 10
+
+    expected = [
+        total.calc_total_volume(*point)
+        for point in itertools.product(*grid.values.values())
+    ]
+    assert list(records["total_volume"]) == pytest.approx(expected[5:15], rel=1e-14)
+    assert list(records["height"]) == list(grid.points(5, 15)["height"])
+
+
+# -------------------------------------------------------------------------------------
+def test_run_sweep(tmp_path: Path) -> None:
+    """Output does not depend on the number of workers"""
+
+    grid = sweep.SweepGrid(VALUES)
+    calls = []
+
+    serial = sweep.run_sweep(
+        grid, str(tmp_path / "serial"), 7, 1, lambda *args: calls.append(args)
+    )
+    parallel = sweep.run_sweep(grid, str(tmp_path / "parallel"), 7, 3)
+
+    assert serial.n_points == 54
+    assert serial.n_shards == 8
+    assert [call[0] for call in calls] == [7, 14, 21, 28, 35, 42, 49, 54]
+    assert all(call[1] == 54 for call in calls)
+
+    for serial_file, parallel_file in zip(serial.files, parallel.files):
+        with open(serial_file, "rb") as serial_fh, open(
+            parallel_file, "rb"
+        ) as parallel_fh:
+            assert serial_fh.read() == parallel_fh.read()
+
+    records = sweep.load_sweep(str(tmp_path / "parallel"))
+    assert np.array_equal(records, sweep.evaluate_shard(grid, 0, 54))
+
+    shards = sweep.load_shards(str(tmp_path / "parallel"))
+    assert all(isinstance(shard, np.memmap) for shard in shards)
+    assert [len(shard) for shard in shards] == [7] * 7 + [5]
+    assert np.array_equal(np.concatenate(shards), records)
+
+
+# -------------------------------------------------------------------------------------
+def test_run_sweep_float32(tmp_path: Path) -> None:
+    """Single precision sweeps store single precision records"""
+
+    grid = sweep.SweepGrid(VALUES, np.float32)
+    sweep.run_sweep(grid, str(tmp_path), 20, 1)
+
+    records = sweep.load_sweep(str(tmp_path))
+    expected = sweep.evaluate_shard(sweep.SweepGrid(VALUES), 0, 54)
+
+    assert records.dtype == sweep.make_record(np.float32)
+    assert records.dtype.itemsize == sweep.make_record(np.float64).itemsize // 2
+    assert np.allclose(records["total_volume"], expected["total_volume"], rtol=1e-5)
+
+    with pytest.raises(ValueError, match="dtype must be float32 or float64"):
+        sweep.SweepGrid(VALUES, np.float16)
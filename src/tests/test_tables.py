@@ -0,0 +1,129 @@
+"""
+Unit tests for the functions in the tables module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from t_junction_model import batch, tables
+
+# pylint: disable=protected-access
+
+# Coarse grid, so the tables are quick to build
+AXES = {
+    "height_ratio": tables.Axis(0.05, 1.0, 20),
+    "inlet_ratio": tables.Axis(0.6, 4.0, 35),
+    "epsilon_ratio": tables.Axis(0.0, 0.1, 5),
+}
+
+
+# -------------------------------------------------------------------------------------
+@pytest.fixture(name="lookup", scope="module")
+def fixture_lookup(tmp_path_factory: pytest.TempPathFactory) -> tables.LookupTables:
+    """Tables built in a temporary directory, then loaded from disk"""
+
+    directory = str(tmp_path_factory.mktemp("tables"))
+    tables.build_tables(directory, AXES, n_check=1000)
+
+    return tables.load_tables(directory)
+
+
+# -------------------------------------------------------------------------------------
+def test_load_tables(lookup: tables.LookupTables) -> None:
+    """Test load_tables()"""
+
+    assert isinstance(lookup.fill_volume, np.memmap)
+    assert isinstance(lookup.alpha, np.memmap)
+    assert lookup.alpha.shape == (20, 35, 5)
+    assert lookup.axes == AXES
+    assert 0 < lookup.max_rel_error["fill_volume"] < 1e-3
+    assert 0 < lookup.max_rel_error["alpha"] < 1e-2
+
+    with pytest.raises(FileNotFoundError, match="build_tables.py"):
+        tables.load_tables("no_such_directory")
+
+
+# -------------------------------------------------------------------------------------
+def test_build_tables_axis_order(lookup: tables.LookupTables, tmp_path: Path) -> None:
+    """The order of the axes dictionary does not change the tables"""
+
+    reordered = tables.build_tables(
+        str(tmp_path), dict(reversed(AXES.items())), n_check=10
+    )
+
+    assert reordered.alpha.shape == (20, 35, 5)
+    assert np.array_equal(reordered.fill_volume, lookup.fill_volume)
+    assert np.array_equal(reordered.alpha, lookup.alpha)
+
+
+# -------------------------------------------------------------------------------------
+def test_interpolate() -> None:
+    """Test _interpolate() reproduces a multilinear function"""
+
+    axes = [tables.Axis(0.0, 1.0, 3), tables.Axis(-1.0, 1.0, 5)]
+    grid_x, grid_y = np.meshgrid(*(tables._axis_values(a) for a in axes), indexing="ij")
+    table = 2 + 3 * grid_x - grid_y + 0.5 * grid_x * grid_y
+
+    points = [np.array([0.0, 0.3, 1.0, 0.75]), np.array([-1.0, 0.1, 1.0, -0.2])]
+    expected = 2 + 3 * points[0] - points[1] + 0.5 * points[0] * points[1]
+
+    assert list(tables._interpolate(table, axes, points)) == pytest.approx(
+        list(expected)
+    )
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_nondim_fill_volume(lookup: tables.LookupTables) -> None:
+    """Test calc_nondim_fill_volume()"""
+
+    rng = np.random.default_rng(1)
+    width = rng.uniform(50, 200, 500) * 10**-6
+    height = width * rng.uniform(0.0, 1.2, 500)
+    inlet_width = width * rng.uniform(0.3, 5.0, 500)
+    height[0] = 0.0
+
+    exact = tables.calc_nondim_fill_volume(height, width, inlet_width, "exact")
+    approx = tables.calc_nondim_fill_volume(height, width, inlet_width, tables=lookup)
+    inside = lookup.contains(height / width, inlet_width / width)
+
+    np.testing.assert_array_equal(
+        exact, batch.calc_nondim_fill_volume(height, width, inlet_width)
+    )
+    assert not inside.all() and inside.any()
+    assert np.isnan(approx[0])
+    assert list(approx[~inside]) == pytest.approx(list(exact[~inside]), nan_ok=True)
+
+    error = np.abs(approx[inside] - exact[inside]) / exact[inside]
+    assert error.max() <= 1.5 * lookup.max_rel_error["fill_volume"]
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_alpha(lookup: tables.LookupTables) -> None:
+    """Test calc_alpha()"""
+
+    rng = np.random.default_rng(2)
+    width = rng.uniform(50, 200, 500) * 10**-6
+    height = width * rng.uniform(0.05, 1.0, 500)
+    inlet_width = width * rng.uniform(0.6, 5.0, 500)
+    epsilon = width * rng.uniform(0.0, 0.1, 500)
+    flow_cont = 3 * 10**-9
+    flow_gutter = flow_cont * rng.uniform(0.0, 0.3, 500)
+    args = (height, width, inlet_width, epsilon, flow_cont, flow_gutter)
+
+    exact = tables.calc_alpha(*args, method="exact")
+    approx = tables.calc_alpha(*args, tables=lookup)
+    inside = lookup.contains(height / width, inlet_width / width, epsilon / width)
+
+    np.testing.assert_array_equal(exact, batch._calc_alpha(*args))
+    assert not inside.all() and inside.any()
+    assert list(approx[~inside]) == pytest.approx(list(exact[~inside]), rel=1e-15)
+
+    # The error measured at build time is a sample, so allow a little headroom
+    error = np.abs(approx[inside] - exact[inside]) / exact[inside]
+    assert error.max() <= 1.5 * lookup.max_rel_error["alpha"]
+
+    with pytest.raises(ValueError, match="Unknown method"):
+        tables.calc_alpha(*args, method="spline", tables=lookup)
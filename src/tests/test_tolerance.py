@@ -0,0 +1,218 @@
+"""
+Unit tests for the functions in the tolerance module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from t_junction_model import batch, tolerance
+
+DESIGNS: dict[str, npt.ArrayLike] = {
+    "height": [20e-6, 33e-6, 60e-6],
+    "width": 100e-6,
+    "inlet_width": [60e-6, 100e-6, 300e-6],
+    "epsilon": 5e-6,
+    "flow_cont": 3e-9,
+    "flow_disp": 6e-9,
+    "flow_gutter": 0.3e-9,
+}
+
+
+# -------------------------------------------------------------------------------------
+def test_streaming_stats() -> None:
+    """Block-wise statistics match those of all samples at once"""
+
+    rng = np.random.default_rng(0)
+    samples = rng.lognormal(0.0, [[0.1], [0.5]], (2, 20_000))
+
+    stats = tolerance.StreamingStats(2)
+    for block in np.array_split(samples, 7, axis=1):
+        stats.update(block)
+
+    assert stats.count.tolist() == [20_000, 20_000]
+    assert stats.mean == pytest.approx(samples.mean(axis=1), rel=1e-12)
+    assert stats.std() == pytest.approx(samples.std(axis=1, ddof=1), rel=1e-10)
+
+    bin_width = (stats.upper - stats.lower) / stats.n_bins
+    for prob in [0.025, 0.5, 0.975]:
+        error = np.abs(stats.quantile(prob) - np.quantile(samples, prob, axis=1))
+        assert np.all(error <= bin_width)
+
+    assert np.array_equal(stats.quantile(0.0), samples.min(axis=1))
+    assert np.array_equal(stats.quantile(1.0), samples.max(axis=1))
+
+    with pytest.raises(ValueError, match="between 0 and 1"):
+        stats.quantile(1.5)
+
+
+# -------------------------------------------------------------------------------------
+def test_streaming_stats_constant() -> None:
+    """Samples without spread have zero deviation and exact quantiles"""
+
+    stats = tolerance.StreamingStats(1)
+    stats.update(np.full((1, 10), 2.0))
+
+    assert stats.std() == pytest.approx([0.0])
+    assert stats.quantile(0.9) == pytest.approx([2.0])
+
+
+# -------------------------------------------------------------------------------------
+def test_streaming_stats_widen() -> None:
+    """The histogram range grows to hold samples outside the first block's"""
+
+    rng = np.random.default_rng(0)
+    samples = rng.normal(1.0, [[0.1], [0.5]], (2, 5_000))
+
+    # Samples furthest from the first block come last
+    order = np.argsort(np.abs(samples - 1.0), axis=1)
+    samples = np.take_along_axis(samples, order, axis=1)
+
+    stats = tolerance.StreamingStats(2)
+    stats.update(np.full((2, 3), 1.0))
+    for block in np.array_split(samples, 1_000, axis=1):
+        stats.update(block)
+
+    everything = np.hstack([np.full((2, 3), 1.0), samples])
+    assert np.all(stats.lower <= everything.min(axis=1))
+    assert np.all(stats.upper >= everything.max(axis=1))
+    assert stats.counts.sum(axis=1).tolist() == [5_003, 5_003]
+
+    bin_width = (stats.upper - stats.lower) / stats.n_bins
+    for prob in [0.025, 0.5, 0.975]:
+        error = np.abs(stats.quantile(prob) - np.quantile(everything, prob, axis=1))
+        assert np.all(error <= bin_width)
+
+    with pytest.raises(ValueError, match="even"):
+        tolerance.StreamingStats(2, n_bins=7)
+
+
+# -------------------------------------------------------------------------------------
+def test_streaming_stats_nonfinite() -> None:
+    """NaN and infinite samples are counted and left out of the statistics"""
+
+    samples = np.array(
+        [[1.0, np.inf, 2.0, 3.0], [np.nan, -np.inf, np.inf, np.nan], [4.0] * 4]
+    )
+
+    stats = tolerance.StreamingStats(3)
+    stats.update(samples[:, :2])
+    stats.update(samples[:, 2:])
+
+    assert stats.count.tolist() == [3, 0, 4]
+    assert stats.n_nonfinite.tolist() == [1, 4, 0]
+    assert stats.mean[[0, 2]] == pytest.approx([2.0, 4.0])
+    assert stats.std()[0] == pytest.approx(1.0)
+    assert np.isnan(stats.std()[1])
+
+    median = stats.quantile(0.5)
+    assert median[[0, 2]] == pytest.approx([2.0, 4.0], abs=3 / stats.n_bins)
+    assert np.isnan(median[1])
+    assert np.all(np.isfinite(stats.lower[[0, 2]]))
+    assert np.all(np.isfinite(stats.upper[[0, 2]]))
+
+
+# -------------------------------------------------------------------------------------
+def test_propagate_tolerances() -> None:
+    """Statistics agree with sampling the batch model directly"""
+
+    result = tolerance.propagate_tolerances(
+        DESIGNS, {"height": 0.03, "width": 0.02}, n_samples=50_000, block_size=7_000
+    )
+
+    rng = np.random.default_rng(1)
+    nominal = dict(zip(DESIGNS, np.broadcast_arrays(*DESIGNS.values())))
+    samples = tolerance.draw_samples(
+        nominal, {"height": 0.03, "width": 0.02}, 200_000, rng
+    )
+    volumes = batch.calc_total_volume(**samples)
+
+    assert result.n_samples == 50_000
+    assert result.mean == pytest.approx(volumes.mean(axis=1), rel=2e-3)
+    assert result.std == pytest.approx(volumes.std(axis=1), rel=3e-2)
+    for prob in [0.025, 0.5, 0.975]:
+        assert result.quantiles[prob] == pytest.approx(
+            np.quantile(volumes, prob, axis=1), rel=3e-3
+        )
+
+
+# -------------------------------------------------------------------------------------
+def test_block_size() -> None:
+    """Quantiles do not depend on the number of samples per block"""
+
+    tolerances = {"height": 0.05, "width": 0.03}
+    results = [
+        tolerance.propagate_tolerances(
+            DESIGNS, tolerances, n_samples=5_000, block_size=block_size
+        )
+        for block_size in [1, 100, 5_000]
+    ]
+
+    for result in results[1:]:
+        for prob in [0.025, 0.5, 0.975]:
+            assert result.quantiles[prob] == pytest.approx(
+                results[0].quantiles[prob], rel=1e-2
+            )
+
+
+# -------------------------------------------------------------------------------------
+def test_nonfinite_volumes() -> None:
+    """Designs near the pinch-off limit keep their finite samples"""
+
+    design = {
+        "height": 100e-6,
+        "width": 100e-6,
+        "inlet_width": 55e-6,
+        "epsilon": 0.0,
+        "flow_cont": 3e-9,
+        "flow_disp": 3e-9,
+        "flow_gutter": 0.3e-9,
+    }
+
+    result = tolerance.propagate_tolerances(
+        design, {"inlet_width": 0.1}, n_samples=2_000, block_size=500
+    )
+
+    assert 0 < result.n_nonfinite[0] < 2_000
+    assert np.isfinite(result.mean[0])
+    assert np.isfinite(result.std[0])
+    assert all(np.isfinite(values[0]) for values in result.quantiles.values())
+
+
+# -------------------------------------------------------------------------------------
+def test_no_tolerance() -> None:
+    """Without tolerances every sample is the nominal volume"""
+
+    result = tolerance.propagate_tolerances(DESIGNS, {}, n_samples=10)
+    nominal = batch.calc_total_volume(**DESIGNS)
+
+    assert result.mean == pytest.approx(nominal, rel=1e-14)
+    assert result.std == pytest.approx(np.zeros(3), abs=1e-25)
+    assert result.quantiles[0.5] == pytest.approx(nominal, rel=1e-14)
+
+
+# -------------------------------------------------------------------------------------
+def test_reproducible() -> None:
+    """Results depend on the seed, but not on the number of workers"""
+
+    args = (DESIGNS, {"height": 0.05, "epsilon": 0.2}, 2_000)
+
+    serial = tolerance.propagate_tolerances(*args, chunk_size=2, workers=1)
+    parallel = tolerance.propagate_tolerances(*args, chunk_size=2, workers=2)
+    reseeded = tolerance.propagate_tolerances(*args, seed=1, chunk_size=2)
+
+    assert np.array_equal(serial.mean, parallel.mean)
+    assert np.array_equal(serial.std, parallel.std)
+    for prob, values in serial.quantiles.items():
+        assert np.array_equal(values, parallel.quantiles[prob])
+
+    assert not np.array_equal(serial.mean, reseeded.mean)
+
+
+# -------------------------------------------------------------------------------------
+def test_bad_tolerances() -> None:
+    """Tolerances of unknown inputs are refused"""
+
+    with pytest.raises(ValueError, match="Unknown tolerance inputs: length"):
+        tolerance.propagate_tolerances(DESIGNS, {"length": 0.1})
@@ -0,0 +1,86 @@
+"""
+Unit tests for the functions in the validation module
+Author: Kenneth Schackart <schackartk1@gmail.com>
+"""
+
+import warnings
+
+import numpy as np
+import pytest
+
+from t_junction_model import batch, validation
+from t_junction_model.validation import Reason
+
+# One valid row followed by rows that are each invalid for one reason
+DESIGNS = {
+    "height": np.array([33e-6, np.nan, 33e-6, 33e-6, 33e-6, 33e-6, 33e-6, 33e-6]),
+    "width": np.full(8, 100e-6),
+    "inlet_width": np.array(
+        [100e-6, 100e-6, 100e-6, 0.0, 100e-6, 100e-6, 100e-6, 10e-6]
+    ),
+    "epsilon": np.array([1e-6, 1e-6, -1e-6, 1e-6, 1e-6, 1e-6, 50e-6, -30e-6]),
+    "flow_cont": np.array([3e-9, 3e-9, 3e-9, 3e-9, 0.0, 3e-9, 3e-9, 3e-9]),
+    "flow_disp": np.full(8, 6e-9),
+    "flow_gutter": np.array([0.0, 0.0, 0.0, 0.0, 0.0, 3e-9, 0.0, 0.0]),
+}
+
+
+# -------------------------------------------------------------------------------------
+def test_validate() -> None:
+    """Each invalid row is flagged with its reasons"""
+
+    reasons = validation.validate(**DESIGNS)
+
+    assert reasons.dtype == np.uint8
+    assert list(reasons) == [
+        0,
+        Reason.NON_FINITE,
+        Reason.NEGATIVE,
+        Reason.ZERO_DIMENSION | Reason.PINCH_ROOT,
+        Reason.ZERO_FLOW,
+        Reason.GUTTER_FLOW,
+        Reason.PINCH_WIDTH,
+        Reason.NEGATIVE | Reason.PINCH_ROOT,
+    ]
+
+    # Scalars and broadcasting
+    assert validation.validate(33e-6, 100e-6, 100e-6, 1e-6, 3e-9, 6e-9, 0.0) == 0
+    assert validation.validate(
+        0.0, [100e-6, 0.0], 100e-6, 0.0, 3e-9, 6e-9, 0.0
+    ).shape == (2,)
+
+
+# -------------------------------------------------------------------------------------
+def test_describe() -> None:
+    """Test describe()"""
+
+    assert not validation.describe(0)
+    assert validation.describe(Reason.NEGATIVE | Reason.PINCH_ROOT) == [
+        "NEGATIVE",
+        "PINCH_ROOT",
+    ]
+
+
+# -------------------------------------------------------------------------------------
+def test_calc_predictions() -> None:
+    """Invalid rows are NaN, without warnings, and valid rows are unchanged"""
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = validation.calc_predictions(**DESIGNS)
+
+    assert list(result.reasons) == list(validation.validate(**DESIGNS))
+
+    expected = batch.calc_predictions(**{k: v[:1] for k, v in DESIGNS.items()})
+    for name, values in result.predictions.items():
+        assert values[0] == pytest.approx(expected[name][0], rel=1e-15)
+        assert np.isnan(values[1:]).all()
+
+    # All valid rows take the same path as the batch model
+    valid = validation.calc_predictions(
+        33e-6, 100e-6, [60e-6, 300e-6], 0, 3e-9, 6e-9, 0
+    )
+    assert not valid.reasons.any()
+    assert list(valid.predictions["total_volume"]) == list(
+        batch.calc_total_volume(33e-6, 100e-6, [60e-6, 300e-6], 0, 3e-9, 6e-9, 0)
+    )